@@ -0,0 +1,70 @@
+"""
+In-process caches behind get_current_user.
+
+Every authenticated request used to verify the JWT and read the user from
+Mongo, including the active calls poll from every console. Decoded tokens
+are cached until they expire and active users for a short TTL, so a console
+polling every few seconds costs one users query per TTL rather than one per
+poll. update_user invalidates the user entry on this worker; other workers
+pick up a deactivation within AUTH_USER_CACHE_TTL seconds.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class TTLCache:
+    """LRU-bounded mapping whose entries expire after ttl_seconds (or an explicit deadline)."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.started = time.monotonic()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """expires_at is a time.monotonic() deadline; it can only shorten the TTL."""
+        deadline = time.monotonic() + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[key] = (deadline, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def invalidate(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "misses_per_second": round(self.misses / elapsed, 3),
+            "invalidations": self.invalidations,
+        }
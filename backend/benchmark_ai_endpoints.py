@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""AI endpoints: throughput and latency at increasing concurrency
+
+Drives process_speech, hold_caller, analyze_plate and generate_report against a
+running server, normally one pointed at fake_openai.py:
+
+    python fake_openai.py --latency lognormal:600,0.4 --errors 429:0.02 &
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=fake uvicorn server:app --port 8000 &
+    python benchmark_ai_endpoints.py [base_url] [--concurrency 1,4,16,64] [--requests 100]
+                                     [--endpoints process_speech,hold_caller,analyze_plate,generate_report]
+
+Every request is unique (CallSid, plate context) so neither the webhook replay
+cache nor the plate analysis cache answers for the model. --endpoints
+analyze_plates adds the ALPR batch endpoint (200 reads per request). Credentials come from
+RMS_USERNAME / RMS_PASSWORD (default admin / admin123). Ends with the LLM
+gateway's per-endpoint stats.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+import httpx
+
+ENDPOINTS = ["process_speech", "hold_caller", "analyze_plate", "generate_report"]
+# Also accepted by --endpoints
+OPTIONAL_ENDPOINTS = ["analyze_plates"]
+
+
+def build_request(endpoint: str, n: int) -> dict:
+    """Keyword arguments for httpx.AsyncClient.post for request n."""
+    call_sid = f"CAbench{uuid.uuid4().hex}"
+    if endpoint == "process_speech":
+        return {"url": "/api/webhooks/process-speech",
+                "data": {"CallSid": call_sid, "SpeechResult": "There's been a car accident at 5th and Main"}}
+    if endpoint == "hold_caller":
+        return {"url": "/api/webhooks/hold-caller",
+                "data": {"CallSid": call_sid, "SpeechResult": "My neighbor's music is really loud"}}
+    if endpoint == "analyze_plate":
+        return {"url": "/api/ai/analyze-plate",
+                "json": {"plate_number": f"BN{n % 10000:04d}", "state": "CA", "context": f"Traffic stop {call_sid}"}}
+    if endpoint == "analyze_plates":
+        # One ALPR batch: 200 reads over a small set of plates, so seeded hits recur
+        return {"url": "/api/ai/analyze-plates",
+                "json": [{"plate_number": plate, "state": "CA", "read_id": f"{call_sid}-{i}", "camera_id": "bench"}
+                         for i, plate in enumerate((["ABC123", "XYZ789"] + [f"BN{k:04d}" for k in range(48)]) * 4)]}
+    if endpoint == "generate_report":
+        return {"url": "/api/ai/generate-report",
+                "json": {"incident_type": "Theft", "date_time": "2025-01-15 14:30", "location": "123 Main St",
+                         "details": "Victim reports bicycle stolen from rack outside library. Lock was cut."}}
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0.0
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            started = time.perf_counter()
+            try:
+                response = await client.post(**build_request(endpoint, n))
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"throughput": total / elapsed, "p50": percentile(latencies, 0.5), "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99), "errors": errors}
+
+
+async def main(base_url: str, endpoints: list, levels: list, total: int):
+    print("=" * 72)
+    print("AI Endpoint Benchmark")
+    print("=" * 72)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120,
+                                 limits=httpx.Limits(max_connections=max(levels))) as client:
+        login = await client.post("/api/auth/login", json={
+            "username": os.environ.get("RMS_USERNAME", "admin"),
+            "password": os.environ.get("RMS_PASSWORD", "admin123"),
+        })
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        for endpoint in endpoints:
+            print(f"\n{endpoint}:")
+            print(f"   {'concurrency':>11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+            for concurrency in levels:
+                r = await run_level(client, endpoint, concurrency, max(total, concurrency))
+                print(f"   {concurrency:>11} {r['throughput']:>8.1f} {r['p50']:>8.0f} {r['p95']:>8.0f} "
+                      f"{r['p99']:>8.0f} {r['errors']:>7}")
+
+        stats = await client.get("/api/admin/llm/stats")
+        if stats.status_code == 200:
+            print("\nLLM gateway:")
+            for endpoint, metrics in stats.json()["endpoints"].items():
+                print(f"   {endpoint}: {metrics}")
+
+    print("\n" + "=" * 72)
+    print("✅ AI endpoint benchmark complete!")
+    print("=" * 72)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_url", nargs="?", default="http://localhost:8000")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and concurrency level")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.endpoints.split(","),
+                     [int(c) for c in args.concurrency.split(",")], args.requests))
@@ -0,0 +1,105 @@
+"""
+Queries behind the active calls board.
+
+Consoles poll the board every few seconds, so it returns a summary of each
+call (no full transcription / description / conversation_history, which grow
+with call length) and the transcript is fetched separately, incrementally by
+turn offset.
+
+Every write to a call stamps it with update_seq, taken from a counter
+document, so pollers can ask for just the calls changed since the last
+sequence they saw instead of comparing ISO updated_at strings.
+"""
+from typing import Any, Dict, List
+
+from pymongo import ReturnDocument
+
+ACTIVE_CALLS_LIMIT = 100
+DESCRIPTION_EXCERPT_CHARS = 280
+
+COUNTERS_COLLECTION = "counters"
+UPDATE_SEQ_COUNTER = "active_calls.update_seq"
+# Writers take a sequence number just before their $set, so concurrent writes
+# can land slightly out of order; delta reads re-scan this many numbers back
+SINCE_OVERLAP = 32
+
+# Fields the board renders as-is
+SUMMARY_FIELDS = [
+    "id", "call_sid", "caller_phone", "incident_type", "location", "priority", "status",
+    "assigned_officer", "assigned_officer_name", "officer_on_scene", "dispatch_audio_url",
+    "recording_url", "created_at", "updated_at", "update_seq",
+]
+
+
+def _lines(field: str) -> Dict[str, Any]:
+    """Transcript string -> array of turns ("" -> [])."""
+    return {"$cond": [
+        {"$gt": [{"$strLenCP": {"$ifNull": [f"${field}", ""]}}, 0]},
+        {"$split": [f"${field}", "\n"]},
+        [],
+    ]}
+
+
+def summary_projection() -> Dict[str, Any]:
+    projection: Dict[str, Any] = {"_id": 0, **{field: 1 for field in SUMMARY_FIELDS}}
+    projection.update({
+        "description_excerpt": {"$substrCP": [{"$ifNull": ["$description", ""]}, 0, DESCRIPTION_EXCERPT_CHARS]},
+        "description_length": {"$strLenCP": {"$ifNull": ["$description", ""]}},
+        "transcript_turns": {"$size": _lines("transcription")},
+        "history_turns": {"$size": {"$ifNull": ["$conversation_history", []]}},
+    })
+    return projection
+
+
+def active_calls_pipeline(match: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Summary of every open call, most urgent first."""
+    return [
+        {"$match": match or {"status": {"$ne": "Closed"}}},
+        {"$sort": {"priority": 1}},
+        {"$limit": ACTIVE_CALLS_LIMIT},
+        {"$project": summary_projection()},
+    ]
+
+
+def transcript_pipeline(call_id: str, offset: int = 0, history_offset: int = 0) -> List[Dict[str, Any]]:
+    """Transcript turns from offset onward (and hold-caller history from history_offset)."""
+    return [
+        {"$match": {"id": call_id}},
+        {"$limit": 1},
+        {"$project": {"_id": 0, "transcription": _lines("transcription"),
+                      "history": {"$ifNull": ["$conversation_history", []]},
+                      "description": 1, "status": 1, "updated_at": 1}},
+        {"$project": {
+            "description": 1, "status": 1, "updated_at": 1,
+            "turn_count": {"$size": "$transcription"},
+            "history_count": {"$size": "$history"},
+            # $slice needs a positive count; the array length is always enough
+            "turns": {"$slice": ["$transcription", offset, {"$max": [{"$size": "$transcription"}, 1]}]},
+            "history": {"$slice": ["$history", history_offset, {"$max": [{"$size": "$history"}, 1]}]},
+        }},
+    ]
+
+
+def changed_since_pipeline(since: int) -> List[Dict[str, Any]]:
+    """Summary of calls written after sequence `since`, including closed ones, oldest change first."""
+    return [
+        {"$match": {"update_seq": {"$gt": max(since - SINCE_OVERLAP, 0)}}},
+        {"$sort": {"update_seq": 1}},
+        {"$limit": ACTIVE_CALLS_LIMIT},
+        {"$project": summary_projection()},
+    ]
+
+
+async def next_update_seq(db) -> int:
+    counter = await db[COUNTERS_COLLECTION].find_one_and_update(
+        {"_id": UPDATE_SEQ_COUNTER},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"]
+
+
+async def current_update_seq(db) -> int:
+    counter = await db[COUNTERS_COLLECTION].find_one({"_id": UPDATE_SEQ_COUNTER})
+    return counter["seq"] if counter else 0
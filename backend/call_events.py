@@ -0,0 +1,190 @@
+"""
+In-process event bus pushing active call changes to dispatcher consoles.
+
+Writers (Twilio webhooks, RealtimeDispatcher, officer endpoints) publish
+small deltas of what they just $set on a call; /ws/calls fans them out to
+every connected console. Every event carries the write's update_seq (the
+durable board sequence, see call_board), so a client can hand the last one
+back (?resume=) after a reconnect, to whichever worker, and get the calls
+changed since then from Mongo; when too many changed it gets a fresh
+snapshot.
+
+With more than one worker, set CALL_EVENTS_SOURCE=change_stream so each
+worker feeds its bus from a MongoDB change stream on active_calls (needs a
+replica set) instead of from its own writes, keeping all consoles
+consistent whichever worker handled the write.
+
+TranscriptHub carries live partial transcripts for a single call straight
+from the RealtimeDispatcher handling it. Nothing is stored: a console that
+connects mid-call gets what is said from then on (the board transcript
+endpoint has the rest), and only consoles on the worker holding the call's
+media stream receive it.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from call_board import DESCRIPTION_EXCERPT_CHARS
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LOCAL = "local"
+SOURCE_CHANGE_STREAM = "change_stream"
+
+SUBSCRIBER_QUEUE_SIZE = 256
+# Transcript deltas arrive every few tens of ms while someone is talking
+TRANSCRIPT_QUEUE_SIZE = 128
+MAX_TRANSCRIPT_SUBSCRIBERS = 16
+
+# Fields that grow with the call - consoles fetch them from /calls/{id}/transcript
+HEAVY_FIELDS = ("transcription", "description", "conversation_history")
+
+
+def board_delta(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip a $set document down to what the board shows."""
+    # Change streams report array appends as dotted paths ("conversation_history.3")
+    heavy = [k for k in fields if k.split(".")[0] in HEAVY_FIELDS]
+    delta = {k: v for k, v in fields.items() if k not in heavy and k != "_id"}
+    if isinstance(fields.get("description"), str):
+        delta["description_excerpt"] = fields["description"][:DESCRIPTION_EXCERPT_CHARS]
+        delta["description_length"] = len(fields["description"])
+    if heavy:
+        delta["transcript_updated"] = True
+    return delta
+
+
+class Subscriber:
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+
+def _offer(subscribers: set, subscriber: Subscriber, event: Dict[str, Any]):
+    """Queue an event for a subscriber, dropping it from the set if it can't keep up."""
+    try:
+        subscriber.queue.put_nowait(event)
+    except asyncio.QueueFull:
+        subscriber.dropped = True
+        subscribers.discard(subscriber)
+        logger.warning("Dropped slow call event subscriber")
+
+
+class CallEventBus:
+    """Fan-out of call deltas, each sequenced by the update_seq of its write."""
+
+    def __init__(self, source: str = SOURCE_LOCAL):
+        self.source = source
+        # Highest update_seq seen; writes land slightly out of order, so not every event raises it
+        self.seq = 0
+        # Events seen by this process - changes on every one, for board ETags
+        self.version = 0
+        self.subscribers: set = set()
+
+    def _emit(self, event_type: str, call_id: Optional[str], call_sid: Optional[str], changes: Dict[str, Any]):
+        self.version += 1
+        seq = changes.get("update_seq") or self.seq
+        self.seq = max(self.seq, seq)
+        event = {
+            "seq": seq,
+            "type": event_type,
+            "call_id": call_id,
+            "call_sid": call_sid,
+            "changes": board_delta(changes),
+            "at": datetime.now(timezone.utc).isoformat()
+        }
+        # A console that can't keep up is disconnected and resyncs from a snapshot
+        for subscriber in list(self.subscribers):
+            _offer(self.subscribers, subscriber, event)
+        return event
+
+    def publish(self, event_type: str, changes: Dict[str, Any], call_id: Optional[str] = None,
+                call_sid: Optional[str] = None):
+        """Publish a change made by this process (ignored when the change stream is the source)."""
+        if self.source != SOURCE_LOCAL:
+            return None
+        return self._emit(event_type, call_id, call_sid, changes)
+
+    def subscribe(self) -> Subscriber:
+        """Register a console. Subscribe before reading the board, so no change falls in between."""
+        subscriber = Subscriber()
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+
+class TranscriptHub:
+    """Per-call fan-out of live transcript events, keyed by CallSid."""
+
+    def __init__(self, max_subscribers: int = MAX_TRANSCRIPT_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self.channels: Dict[str, set] = {}
+
+    def publish(self, call_sid: str, speaker: str, kind: str, text: str, item_id: Optional[str] = None):
+        """kind is "delta" for a partial transcript or "final" for the completed turn."""
+        subscribers = self.channels.get(call_sid)
+        if not subscribers:
+            return
+        event = {"type": f"{speaker}.{kind}", "item_id": item_id, "text": text,
+                 "at": datetime.now(timezone.utc).isoformat()}
+        for subscriber in list(subscribers):
+            _offer(subscribers, subscriber, event)
+
+    def subscribe(self, call_sid: str) -> Optional[Subscriber]:
+        """None when the call already has max_subscribers listeners."""
+        subscribers = self.channels.setdefault(call_sid, set())
+        if len(subscribers) >= self.max_subscribers:
+            return None
+        subscriber = Subscriber(maxsize=TRANSCRIPT_QUEUE_SIZE)
+        subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, call_sid: str, subscriber: Subscriber):
+        subscribers = self.channels.get(call_sid)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.channels[call_sid]
+
+    def end(self, call_sid: str):
+        """Tell listeners the media stream has finished."""
+        for subscriber in list(self.channels.get(call_sid, ())):
+            try:
+                subscriber.queue.put_nowait({"type": "end"})
+            except asyncio.QueueFull:
+                subscriber.dropped = True
+
+
+def _change_event_type(change: Dict[str, Any]) -> str:
+    if change["operationType"] == "insert":
+        return "call.created"
+    if change.get("updateDescription", {}).get("updatedFields", {}).get("status") == "Closed":
+        return "call.closed"
+    return "call.updated"
+
+
+async def watch_active_calls(db, bus: CallEventBus):
+    """Feed the bus from a change stream on active_calls, resuming after errors."""
+    resume_token = None
+    while True:
+        try:
+            async with db.active_calls.watch(
+                [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}],
+                full_document="updateLookup",
+                resume_after=resume_token
+            ) as stream:
+                async for change in stream:
+                    resume_token = change["_id"]
+                    document = change.get("fullDocument") or {}
+                    if change["operationType"] == "update":
+                        changes = change.get("updateDescription", {}).get("updatedFields", {})
+                    else:
+                        changes = document
+                    bus._emit(_change_event_type(change), document.get("id"), document.get("call_sid"), changes)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"active_calls change stream failed, retrying: {e}")
+            await asyncio.sleep(2)
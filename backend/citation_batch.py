@@ -0,0 +1,80 @@
+"""
+Offender resolution for bulk citation sync.
+
+A handheld device syncs dozens of citations at once, often several for
+the same offender. create_citation resolves each offender with its own
+upsert; a batch instead resolves them as a set:
+
+  1. offenders in the batch that share an identity key (normalized DL or
+     name + DOB, see name_search.person_identity_keys) are grouped, so
+     three tickets for one driver make one person, not three;
+  2. every group's keys are looked up with one $in on identity_keys;
+  3. groups with no match are upserted together in one unordered
+     bulk_write, and offenders with nothing to identify them by are
+     inserted as new persons in the same call.
+
+The citations are then inserted with one insert_many and linked with one
+unordered bulk_write of $push updates (see create_citations_bulk).
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from pymongo import InsertOne, UpdateOne
+
+MAX_BULK_CITATIONS = 500
+
+
+def group_by_identity(keys_by_item: Dict[int, List[str]]) -> List[List[int]]:
+    """Items that share any identity key, transitively, in first-seen order (union-find)."""
+    parent: Dict[int, int] = {}
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    owner_of_key: Dict[str, int] = {}
+    for item, keys in keys_by_item.items():
+        parent[item] = item
+        for key in keys:
+            if key in owner_of_key:
+                parent[find(item)] = find(owner_of_key[key])
+            else:
+                owner_of_key[key] = item
+
+    groups: Dict[int, List[int]] = {}
+    for item in keys_by_item:
+        groups.setdefault(find(item), []).append(item)
+    return list(groups.values())
+
+
+def group_keys(group: Iterable[int], keys_by_item: Dict[int, List[str]]) -> List[str]:
+    keys: List[str] = []
+    for item in group:
+        keys.extend(key for key in keys_by_item[item] if key not in keys)
+    return keys
+
+
+def person_upserts(new_groups: List[Tuple[List[str], dict]], anonymous: List[dict],
+                   known: List[Tuple[str, List[str]]]) -> List:
+    """One unordered bulk_write's worth of offender writes.
+
+    new_groups: (identity keys, person document) for groups with no existing
+    person; anonymous: person documents with no identity keys; known:
+    (person id, identity keys) for matched persons, so a DL seen for the first
+    time is recorded on them (as create_citation does).
+    """
+    operations = []
+    for keys, doc in new_groups:
+        doc = {k: v for k, v in doc.items() if k not in ("identity_keys", "citations")}
+        operations.append(UpdateOne(
+            # $elemMatch, not a bare $in - see find_or_create_person
+            {"identity_keys": {"$elemMatch": {"$in": keys}}},
+            {"$setOnInsert": {**doc, "citations": []}, "$addToSet": {"identity_keys": {"$each": keys}}},
+            upsert=True
+        ))
+    operations.extend(InsertOne(doc) for doc in anonymous)
+    operations.extend(
+        UpdateOne({"id": person_id}, {"$addToSet": {"identity_keys": {"$each": keys}}}) for person_id, keys in known
+    )
+    return operations
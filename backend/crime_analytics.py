@@ -0,0 +1,370 @@
+"""
+Deterministic crime analytics behind predict_crime.
+
+Every incident report and closed call is folded into small per-day counters
+in the crime_stats collection: one document per (day, incident type,
+location cluster, hour of week) holding a count. Folding is incremental,
+from a per-source watermark, using vectorized pandas over batches of new
+rows and one unordered bulk $inc per batch. Summaries (counts by type,
+hotspots, hour-of-week profile, per-type trend slope and a 7-day projection)
+are aggregated from crime_stats and materialized in crime_summaries, so
+predict_crime reads one document. The LLM is only asked, optionally, to
+narrate those numbers.
+
+Timestamps are set before the insert, so concurrent writers can land rows
+slightly behind a source's watermark, and several rows can share one
+timestamp. Each fold therefore re-reads FOLD_OVERLAP_SECONDS back from the
+watermark and skips the rows it remembers folding in that window (their
+ids are saved with the watermark). At most FOLD_OVERLAP_MAX_IDS ids are
+kept: when a bulk load puts more than that in the window, the window is
+shortened to the newest timestamps that fit (saved as "after"). A row
+landing further behind than the window is only counted by the next rebuild
+(refresh(full=True)).
+
+Only one process folds at a time: refresh holds a lease document in
+crime_summaries (renewed per batch, expiring after LEASE_SECONDS if its
+holder dies), so the server's background refresh and a rebuild on another
+worker can't both apply the same window and double the counts. A refresh
+that finds the lease taken waits for it, then folds what is left.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+STATS_COLLECTION = "crime_stats"
+SUMMARY_COLLECTION = "crime_summaries"
+WATERMARK_ID = "watermarks"
+LEASE_ID = "refresh_lease"
+LEASE_SECONDS = 120
+LEASE_WAIT_SECONDS = 300
+LEASE_POLL_SECONDS = 0.5
+FOLD_BATCH_SIZE = 10000
+FOLD_OVERLAP_SECONDS = 300
+# Bounds the watermark document however many rows share the overlap window
+FOLD_OVERLAP_MAX_IDS = 5000
+DEFAULT_WINDOW_DAYS = 90
+TOP_HOTSPOTS = 10
+LOCATION_LABEL_CHARS = 80
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Where each source keeps its type / place / time. Calls are only counted once
+# closed (their type and location are filled in during the call), so their
+# watermark follows closed_at.
+SOURCES = {
+    "reports": {
+        "query": {},
+        "watermark_field": "created_at",
+        "fields": ["id", "incident_type", "location", "incident_date", "incident_time", "created_at"],
+    },
+    "active_calls": {
+        "query": {"status": "Closed", "closed_at": {"$exists": True}},
+        "watermark_field": "closed_at",
+        "fields": ["id", "incident_type", "location", "created_at", "closed_at"],
+    },
+}
+
+STREET_SUFFIXES = {
+    r"\bstreet\b": "st", r"\bavenue\b": "ave", r"\broad\b": "rd", r"\bboulevard\b": "blvd",
+    r"\bdrive\b": "dr", r"\blane\b": "ln", r"\bhighway\b": "hwy", r"\bplace\b": "pl", r"\bcourt\b": "ct",
+}
+
+
+def overlap_start(watermark: str) -> str:
+    """Start of the window re-read behind a watermark (ISO timestamps compare as strings)."""
+    try:
+        return (datetime.fromisoformat(watermark) - timedelta(seconds=FOLD_OVERLAP_SECONDS)).isoformat()
+    except ValueError:
+        return watermark
+
+
+def reread_range(mark: Dict[str, Any]) -> Dict[str, str]:
+    """Range of the watermark field re-read on the next fold: the overlap window, or less if it overflowed."""
+    start = overlap_start(mark["at"])
+    if mark.get("after") and mark["after"] >= start:
+        return {"$gt": mark["after"]}
+    return {"$gte": start}
+
+
+def location_keys(locations: pd.Series) -> pd.Series:
+    """Cluster free-text locations: block-level street names without house numbers or units."""
+    keys = (locations.fillna("").astype(str).str.lower()
+            .str.replace("&", " and ", regex=False)
+            .str.replace(r"\b(?:apt|unit|suite|ste|#)\s*\w+", " ", regex=True)
+            .str.replace(r"^\s*\d+[a-z]?\s+", "", regex=True)
+            .str.replace(r"[^a-z0-9 ]", " ", regex=True))
+    for pattern, suffix in STREET_SUFFIXES.items():
+        keys = keys.str.replace(pattern, suffix, regex=True)
+    keys = keys.str.replace(r"\s+", " ", regex=True).str.strip()
+    return keys.where(keys != "", "unknown")
+
+
+def incident_frame(rows: List[Dict[str, Any]], source: str) -> pd.DataFrame:
+    """One row per incident: day, hour_of_week, incident_type, location_key, location_label."""
+    frame = pd.DataFrame(rows, columns=SOURCES[source]["fields"])
+    if source == "reports":
+        # Reported date/time of the incident, falling back to when it was written up
+        when = pd.to_datetime(frame["incident_date"].fillna("") + " " + frame["incident_time"].fillna(""),
+                              errors="coerce", format="mixed")
+        when = when.fillna(pd.to_datetime(frame["created_at"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None))
+    else:
+        when = pd.to_datetime(frame["created_at"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+    labels = frame["location"].fillna("").astype(str).str.strip().str.slice(0, LOCATION_LABEL_CHARS)
+    out = pd.DataFrame({
+        "day": when.dt.strftime("%Y-%m-%d"),
+        "hour_of_week": when.dt.dayofweek * 24 + when.dt.hour,
+        "incident_type": frame["incident_type"].fillna("Unknown").astype(str).str.strip().replace("", "Unknown"),
+        "location_key": location_keys(frame["location"]),
+        "location_label": labels,
+    })
+    return out.dropna(subset=["day", "hour_of_week"])
+
+
+def counter_updates(incidents: pd.DataFrame, source: str) -> List[UpdateOne]:
+    """$inc upserts for one batch, grouped so each counter is written once."""
+    grouped = (incidents.groupby(["day", "incident_type", "location_key", "hour_of_week"], sort=False)
+               .agg(count=("day", "size"), location_label=("location_label", "first"))
+               .reset_index())
+    ops = []
+    for row in grouped.itertuples(index=False):
+        hour_of_week = int(row.hour_of_week)
+        ops.append(UpdateOne(
+            {"_id": f"{source}|{row.day}|{row.incident_type}|{row.location_key}|{hour_of_week}"},
+            {"$inc": {"count": int(row.count)},
+             "$setOnInsert": {"source": source, "day": row.day, "incident_type": row.incident_type,
+                              "location_key": row.location_key, "location_label": row.location_label,
+                              "hour_of_week": hour_of_week}},
+            upsert=True
+        ))
+    return ops
+
+
+def trend(daily: Dict[str, int], start: date, days: int) -> Dict[str, Any]:
+    """Least-squares slope of daily counts over the window, and the next 7 days projected on it."""
+    series = np.zeros(days)
+    for day, count in daily.items():
+        offset = (date.fromisoformat(day) - start).days
+        if 0 <= offset < days:
+            series[offset] += count
+    x = np.arange(days)
+    slope, intercept = np.polyfit(x, series, 1) if days > 1 else (0.0, float(series.sum()))
+    mean = series.mean()
+    projected = sum(max(0.0, intercept + slope * t) for t in range(days, days + 7))
+    # Call it a trend once the window's fitted change is at least a fifth of the mean
+    change = slope * days
+    direction = "stable"
+    if mean and abs(change) >= 0.2 * mean:
+        direction = "increasing" if change > 0 else "decreasing"
+    return {"slope_per_day": round(float(slope), 4), "daily_mean": round(float(mean), 3),
+            "direction": direction, "projected_next_7_days": round(float(projected), 1)}
+
+
+def build_summary(rows: List[Dict[str, Any]], window_days: int, today: date) -> Dict[str, Any]:
+    """Turn grouped crime_stats rows (see summary_pipeline) into the predict_crime payload."""
+    start = today - timedelta(days=window_days - 1)
+    by_type = {r["_id"]: r["count"] for r in rows if r["facet"] == "type"}
+    daily_by_type: Dict[str, Dict[str, int]] = {}
+    for r in rows:
+        if r["facet"] == "type_day":
+            daily_by_type.setdefault(r["_id"]["incident_type"], {})[r["_id"]["day"]] = r["count"]
+    hotspots = [
+        {"location": r["label"], "location_key": r["_id"], "incidents": r["count"],
+         "top_types": sorted(r["types"], key=lambda t: -t["count"])[:3]}
+        for r in sorted((r for r in rows if r["facet"] == "location"), key=lambda r: -r["count"])[:TOP_HOTSPOTS]
+    ]
+    hour_counts = np.zeros(168, dtype=int)
+    for r in rows:
+        if r["facet"] == "hour_of_week" and 0 <= r["_id"] < 168:
+            hour_counts[r["_id"]] = r["count"]
+    peak_hours = [
+        {"day": DAYS[int(how) // 24], "hour": int(how) % 24, "incidents": int(hour_counts[how])}
+        for how in np.argsort(-hour_counts, kind="stable")[:5] if hour_counts[how]
+    ]
+
+    trends = {incident_type: trend(daily, start, window_days) for incident_type, daily in daily_by_type.items()}
+    overall: Dict[str, int] = {}
+    for daily in daily_by_type.values():
+        for day, count in daily.items():
+            overall[day] = overall.get(day, 0) + count
+
+    recommendations = []
+    for spot in hotspots[:3]:
+        when = f" around {peak_hours[0]['day']} {peak_hours[0]['hour']:02d}:00" if peak_hours else ""
+        recommendations.append(f"Increase patrol presence at {spot['location'] or spot['location_key']}{when} "
+                               f"({spot['incidents']} incidents in {window_days} days)")
+    for incident_type, t in sorted(trends.items(), key=lambda item: -item[1]["slope_per_day"]):
+        if t["direction"] == "increasing":
+            recommendations.append(f"{incident_type} incidents are rising ({t['slope_per_day']:+.2f}/day); "
+                                   f"expect about {t['projected_next_7_days']:.0f} next week")
+
+    return {
+        "window_days": window_days,
+        "window_start": start.isoformat(),
+        "total_incidents": int(sum(by_type.values())),
+        "counts_by_type": dict(sorted(by_type.items(), key=lambda item: -item[1])),
+        "trends": {"overall": trend(overall, start, window_days), "by_type": trends},
+        "hotspots": hotspots,
+        "time_patterns": {"peak_hours": peak_hours,
+                          "by_day": {DAYS[d]: int(hour_counts[d * 24:(d + 1) * 24].sum()) for d in range(7)},
+                          "by_hour": [int(hour_counts[h::24].sum()) for h in range(24)]},
+        "predictions": {incident_type: t["projected_next_7_days"] for incident_type, t in trends.items()},
+        "recommendations": recommendations,
+    }
+
+
+def summary_pipeline(window_start: str) -> List[Dict[str, Any]]:
+    """Group crime_stats counters in the window into the facets build_summary needs."""
+    return [
+        {"$match": {"day": {"$gte": window_start}}},
+        {"$facet": {
+            "type": [{"$group": {"_id": "$incident_type", "count": {"$sum": "$count"}}}],
+            "type_day": [{"$group": {"_id": {"incident_type": "$incident_type", "day": "$day"}, "count": {"$sum": "$count"}}}],
+            "location": [
+                {"$group": {"_id": {"location_key": "$location_key", "incident_type": "$incident_type"},
+                            "count": {"$sum": "$count"}, "label": {"$first": "$location_label"}}},
+                {"$group": {"_id": "$_id.location_key", "count": {"$sum": "$count"}, "label": {"$first": "$label"},
+                            "types": {"$push": {"incident_type": "$_id.incident_type", "count": "$count"}}}},
+                {"$sort": {"count": -1}},
+                {"$limit": TOP_HOTSPOTS},
+            ],
+            "hour_of_week": [{"$group": {"_id": "$hour_of_week", "count": {"$sum": "$count"}}}],
+        }},
+    ]
+
+
+class CrimeAnalytics:
+    """Folds new incidents into crime_stats and keeps crime_summaries current."""
+
+    def __init__(self, max_age_seconds: float = 60):
+        self.max_age_seconds = max_age_seconds
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Holder id for the refresh lease
+        self._owner = uuid.uuid4().hex
+
+    async def _take_lease(self, db) -> bool:
+        """Take or renew the refresh lease; False while another process holds it."""
+        now = datetime.now(timezone.utc)
+        try:
+            await db[SUMMARY_COLLECTION].update_one(
+                {"_id": LEASE_ID, "$or": [{"owner": self._owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self._owner, "expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _wait_for_lease(self, db):
+        deadline = time.monotonic() + LEASE_WAIT_SECONDS
+        while not await self._take_lease(db):
+            if time.monotonic() > deadline:
+                raise RuntimeError("Crime analytics refresh is still running in another process")
+            await asyncio.sleep(LEASE_POLL_SECONDS)
+
+    async def _release_lease(self, db):
+        await db[SUMMARY_COLLECTION].delete_one({"_id": LEASE_ID, "owner": self._owner})
+
+    async def _fold_source(self, db, source: str, mark: Any) -> Optional[Dict[str, Any]]:
+        """Fold rows after the source's watermark: {"at": timestamp, "recent": [[timestamp, id], ...], "after"?}."""
+        spec = SOURCES[source]
+        field = spec["watermark_field"]
+        query = dict(spec["query"])
+        if isinstance(mark, str):
+            # Saved before the overlap window: everything up to it is folded, so remember that much
+            window = {**spec["query"], field: {"$gte": overlap_start(mark), "$lte": mark}}
+            mark = {"at": mark, "recent": [[row[field], row.get("id")]
+                                           async for row in db[source].find(window, {"_id": 0, field: 1, "id": 1})]}
+        if mark:
+            query[field] = reread_range(mark)
+        else:
+            mark = {"at": "", "recent": []}
+        folded = {row_id for _, row_id in mark["recent"]}
+        projection = {"_id": 0, **{f: 1 for f in spec["fields"]}}
+        batch = []
+        async for row in db[source].find(query, projection).sort(field, 1).batch_size(FOLD_BATCH_SIZE):
+            if row.get("id") in folded:
+                continue
+            batch.append(row)
+            if len(batch) >= FOLD_BATCH_SIZE:
+                mark = await self._fold_batch(db, source, batch, field, mark)
+                batch = []
+        if batch:
+            mark = await self._fold_batch(db, source, batch, field, mark)
+        return mark
+
+    async def _fold_batch(self, db, source: str, batch: List[Dict[str, Any]], field: str,
+                          mark: Dict[str, Any]) -> Dict[str, Any]:
+        # A holder that stalled past its lease must not fold alongside the next one
+        if not await self._take_lease(db):
+            raise RuntimeError("Crime analytics refresh lease was lost")
+        ops = counter_updates(incident_frame(batch, source), source)
+        if ops:
+            await db[STATS_COLLECTION].bulk_write(ops, ordered=False)
+        at = max(mark["at"], batch[-1][field])
+        start = overlap_start(at)
+        after = mark.get("after") if (mark.get("after") or "") >= start else None
+        recent = mark["recent"] + [[row[field], row.get("id")] for row in batch]
+        recent = [entry for entry in recent if entry[0] >= start]
+        if len(recent) > FOLD_OVERLAP_MAX_IDS:
+            # Too many to remember: only re-read after the newest timestamp that doesn't fit
+            recent.sort(key=lambda entry: entry[0])
+            after = recent[-FOLD_OVERLAP_MAX_IDS - 1][0]
+            recent = [entry for entry in recent if entry[0] > after]
+        mark = {"at": at, "recent": recent}
+        if after:
+            mark["after"] = after
+        # Saved per batch so an interrupted fold resumes instead of double counting
+        await db[SUMMARY_COLLECTION].update_one({"_id": WATERMARK_ID}, {"$set": {source: mark}}, upsert=True)
+        return mark
+
+    async def refresh(self, db, window_days: int = DEFAULT_WINDOW_DAYS, full: bool = False) -> Dict[str, Any]:
+        """Fold anything new, then rematerialize the summary for window_days."""
+        async with self._lock:
+            await self._wait_for_lease(db)
+            try:
+                if full:
+                    await db[STATS_COLLECTION].delete_many({})
+                    await db[SUMMARY_COLLECTION].delete_many({"_id": {"$ne": LEASE_ID}})
+                watermarks = await db[SUMMARY_COLLECTION].find_one({"_id": WATERMARK_ID}) or {}
+                started = time.perf_counter()
+                for source in SOURCES:
+                    await self._fold_source(db, source, watermarks.get(source))
+
+                today = datetime.now(timezone.utc).date()
+                window_start = (today - timedelta(days=window_days - 1)).isoformat()
+                facets = (await db[STATS_COLLECTION].aggregate(summary_pipeline(window_start)).to_list(1))[0]
+                rows = [{**row, "facet": facet} for facet, facet_rows in facets.items() for row in facet_rows]
+                summary = build_summary(rows, window_days, today)
+                summary["computed_at"] = datetime.now(timezone.utc).isoformat()
+                summary["refresh_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                await db[SUMMARY_COLLECTION].replace_one({"_id": f"window:{window_days}"}, summary, upsert=True)
+                return summary
+            finally:
+                await self._release_lease(db)
+
+    async def _background_refresh(self, db, window_days: int):
+        try:
+            await self.refresh(db, window_days)
+        except Exception as e:
+            logger.error(f"Crime analytics refresh failed: {e}")
+
+    async def summary(self, db, window_days: int = DEFAULT_WINDOW_DAYS) -> Dict[str, Any]:
+        """The materialized summary; stale ones are returned as-is and refreshed in the background."""
+        summary = await db[SUMMARY_COLLECTION].find_one({"_id": f"window:{window_days}"}, {"_id": 0})
+        if summary is None:
+            return await self.refresh(db, window_days)
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(summary["computed_at"])
+        if (age.total_seconds() > self.max_age_seconds
+                and (self._refresh_task is None or self._refresh_task.done())):
+            self._refresh_task = asyncio.create_task(self._background_refresh(db, window_days))
+        return summary
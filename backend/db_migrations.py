@@ -0,0 +1,321 @@
+"""
+Versioned schema migrations and index bootstrap for the RMS database.
+
+Every index here is matched to a query in server.py (see EXPLAIN_QUERIES).
+Indexes are named explicitly so create_indexes is a no-op when they already
+exist, which makes bootstrap_database safe to run on every startup. Data
+migrations are applied once, in version order, and recorded in the
+schema_migrations collection.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from call_board import COUNTERS_COLLECTION, UPDATE_SEQ_COUNTER
+from name_search import person_identity_keys, person_name_keys
+from plate_search import vehicle_plate_keys
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_COLLECTION = "schema_migrations"
+BACKFILL_BATCH_SIZE = 1000
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # get_current_user on every authenticated request
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # login / create_user
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+        IndexModel([("badge_number", ASCENDING)], name="badge_number_unique", unique=True),
+    ],
+    "active_calls": [
+        # attach / on-scene / close / recording lookups by id
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # webhooks look calls up by CallSid several times per turn (not unique:
+        # the Gather fallback redirects back to /webhooks/voice)
+        IndexModel([("call_sid", ASCENDING)], name="call_sid"),
+        # get_active_calls: status != Closed, sorted by priority (sort before range)
+        IndexModel([("priority", ASCENDING), ("status", ASCENDING)], name="priority_status"),
+        # get_active_calls?since=: calls written after a board sequence number
+        IndexModel([("update_seq", ASCENDING)], name="update_seq"),
+        # crime analytics folds closed calls in closed_at order from a watermark
+        IndexModel([("closed_at", ASCENDING)], name="closed_at", sparse=True),
+        # get_call_recordings: recording_url exists, keyset on (created_at, id)
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING), ("recording_url", ASCENDING)], name="created_at_id_recording_url"),
+    ],
+    "persons": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # search_person by DL
+        IndexModel([("drivers_license", ASCENDING)], name="drivers_license"),
+        # find_or_create_person: atomic upsert on normalized DL / name+DOB keys.
+        # Sparse so persons with nothing to identify them by don't collide
+        IndexModel([("identity_keys", ASCENDING)], name="identity_keys_unique", unique=True, sparse=True),
+        # search_person: prefix range on normalized names, and sounds-like codes
+        IndexModel([("last_name_key", ASCENDING), ("first_name_key", ASCENDING)], name="last_first_key"),
+        IndexModel([("last_name_phonetic", ASCENDING), ("first_name_phonetic", ASCENDING)], name="last_first_phonetic"),
+        # search_person without a last name: first name only, or DOB only
+        IndexModel([("first_name_key", ASCENDING), ("last_name_key", ASCENDING)], name="first_last_key"),
+        IndexModel([("first_name_phonetic", ASCENDING), ("last_name_key", ASCENDING)], name="first_phonetic_last_key"),
+        IndexModel([("dob", ASCENDING), ("last_name_key", ASCENDING), ("first_name_key", ASCENDING)], name="dob_last_first_key"),
+    ],
+    "vehicles": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # analyze_plate exact lookup (analyze_plates: $in on plate_normalized)
+        IndexModel([("plate_number", ASCENDING)], name="plate_number"),
+        IndexModel([("vin", ASCENDING)], name="vin"),
+        # search_vehicle: position/bigram tokens (multikey) for partial plates
+        IndexModel([("plate_tokens", ASCENDING), ("plate_length", ASCENDING)], name="plate_tokens_length"),
+        IndexModel([("plate_normalized", ASCENDING)], name="plate_normalized"),
+    ],
+    "citations": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # get_citations: keyset pagination on (created_at, id)
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel([("person_id", ASCENDING)], name="person_id"),
+        # create_citations_bulk: idempotent resend. Partial so citations without one don't collide
+        IndexModel([("client_id", ASCENDING)], name="client_id_unique", unique=True,
+                   partialFilterExpression={"client_id": {"$type": "string"}}),
+    ],
+    "reports": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # get_reports / predict_crime: keyset pagination on (created_at, id)
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    ],
+    "report_drafts": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "crime_stats": [
+        # predict_crime summary: counters inside the analysis window
+        IndexModel([("day", ASCENDING)], name="day"),
+    ],
+}
+
+# Representative query shapes from server.py and the index each must use.
+# Each entry: (collection, filter, sort, expected index name)
+EXPLAIN_QUERIES = [
+    ("users", {"id": "x"}, None, "id_unique"),
+    ("users", {"username": "x"}, None, "username_unique"),
+    ("active_calls", {"call_sid": "x"}, None, "call_sid"),
+    ("active_calls", {"status": {"$ne": "Closed"}}, [("priority", 1)], "priority_status"),
+    ("active_calls", {"update_seq": {"$gt": 0}}, [("update_seq", 1)], "update_seq"),
+    ("active_calls", {"recording_url": {"$exists": True, "$ne": None}}, [("created_at", -1), ("id", -1)], "created_at_id_recording_url"),
+    ("persons", {"drivers_license": "x"}, None, "drivers_license"),
+    ("persons", {"identity_keys": {"$elemMatch": {"$in": ["dl:X", "name:x|x|x"]}}}, None, "identity_keys_unique"),
+    ("persons", {"last_name_key": {"$gte": "smi", "$lt": "smi\x7f"}}, None, "last_first_key"),
+    ("persons", {"last_name_phonetic": "SM0"}, None, "last_first_phonetic"),
+    ("persons", {"first_name_key": {"$gte": "jo", "$lt": "jo\x7f"}}, [("last_name_key", 1), ("first_name_key", 1), ("id", 1)],
+     "first_last_key"),
+    ("persons", {"first_name_phonetic": "JN"}, None, "first_phonetic_last_key"),
+    ("persons", {"dob": "1985-03-04"}, [("last_name_key", 1), ("first_name_key", 1), ("id", 1)], "dob_last_first_key"),
+    ("persons", {"last_name_key": {"$in": ["doe"]}, "first_name_key": {"$in": ["john"]}, "warrants.0": {"$exists": True}},
+     None, "last_first_key"),
+    ("vehicles", {"plate_number": "x"}, None, "plate_number"),
+    ("vehicles", {"plate_normalized": {"$in": ["ABC123", "XYZ789"]}}, None, "plate_normalized"),
+    ("vehicles", {"plate_normalized": "ABC123", "state": "CA"}, None, "plate_normalized"),
+    ("vehicles", {"plate_length": 5, "plate_tokens": {"$all": ["0:7", "1:K", "4:3"]}}, None, "plate_tokens_length"),
+    ("citations", {"client_id": {"$in": ["a", "b"], "$type": "string"}}, None, "client_id_unique"),
+    ("citations", {"$or": [{"created_at": {"$lt": "x"}}, {"created_at": "x", "id": {"$lt": "x"}}]},
+     [("created_at", -1), ("id", -1)], "created_at_id"),
+    ("reports", {}, [("created_at", -1), ("id", -1)], "created_at_id"),
+]
+
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """Create every declared index. Safe to call repeatedly."""
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # Usually duplicate data blocking a unique index - log it rather than
+            # refusing to start the whole app
+            logger.error(f"Index creation failed on {collection}: {e}")
+    return created
+
+
+async def _migration_001_baseline_indexes(db):
+    await ensure_indexes(db)
+
+
+async def _bulk_update(collection, operations: List[UpdateOne]):
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+
+
+async def _migration_002_person_name_keys(db):
+    """Backfill normalized and phonetic name keys on existing persons."""
+    operations = []
+    async for person in db.persons.find({"last_name_key": {"$exists": False}}, {"_id": 1, "first_name": 1, "last_name": 1}):
+        keys = person_name_keys(person.get("first_name"), person.get("last_name"))
+        operations.append(UpdateOne({"_id": person["_id"]}, {"$set": keys}))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            await _bulk_update(db.persons, operations)
+            operations = []
+    await _bulk_update(db.persons, operations)
+
+
+async def _migration_003_vehicle_plate_keys(db):
+    """Backfill normalized plate, lookalike skeleton and search tokens on existing vehicles."""
+    operations = []
+    async for vehicle in db.vehicles.find({"plate_tokens": {"$exists": False}}, {"_id": 1, "plate_number": 1}):
+        operations.append(UpdateOne({"_id": vehicle["_id"]}, {"$set": vehicle_plate_keys(vehicle.get("plate_number"))}))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            await _bulk_update(db.vehicles, operations)
+            operations = []
+    await _bulk_update(db.vehicles, operations)
+
+
+async def _migration_004_person_identity_keys(db):
+    """Backfill identity keys. Existing duplicate persons can't share a key, so only one keeps it."""
+    operations = []
+    async for person in db.persons.find(
+        {"identity_keys": {"$exists": False}},
+        {"_id": 1, "drivers_license": 1, "first_name": 1, "last_name": 1, "dob": 1}
+    ):
+        keys = person_identity_keys(person.get("drivers_license"), person.get("first_name"),
+                                    person.get("last_name"), person.get("dob"))
+        # One update per key so a duplicate on one key doesn't block the other
+        operations.extend(UpdateOne({"_id": person["_id"]}, {"$addToSet": {"identity_keys": key}}) for key in keys)
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            await _bulk_update_ignoring_duplicates(db.persons, operations)
+            operations = []
+    await _bulk_update_ignoring_duplicates(db.persons, operations)
+
+    # Superseded by identity_keys_unique
+    if "dob_last_first" in await db.persons.index_information():
+        await db.persons.drop_index("dob_last_first")
+
+
+async def _bulk_update_ignoring_duplicates(collection, operations: List[UpdateOne]):
+    try:
+        await _bulk_update(collection, operations)
+    except BulkWriteError as e:
+        other_errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != 11000]
+        if other_errors:
+            raise
+        logger.warning(f"Skipped {len(e.details['writeErrors'])} duplicate identity keys on {collection.name}")
+
+
+async def _migration_005_keyset_indexes(db):
+    """Drop the single-key created_at indexes superseded by (created_at, id) keyset indexes."""
+    for collection, index in (("citations", "created_at"), ("reports", "created_at"),
+                              ("active_calls", "created_at_recording_url")):
+        if index in await db[collection].index_information():
+            await db[collection].drop_index(index)
+
+
+async def _migration_006_leading_h_phonetic_keys(db):
+    """Recompute phonetic keys of names starting with H, which metaphone used to drop."""
+    operations = []
+    async for person in db.persons.find(
+        {"$or": [{"first_name_key": {"$gte": "h", "$lt": "i"}}, {"last_name_key": {"$gte": "h", "$lt": "i"}}]},
+        {"_id": 1, "first_name": 1, "last_name": 1}
+    ):
+        keys = person_name_keys(person.get("first_name"), person.get("last_name"))
+        operations.append(UpdateOne({"_id": person["_id"]}, {"$set": keys}))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            await _bulk_update(db.persons, operations)
+            operations = []
+    await _bulk_update(db.persons, operations)
+
+
+async def _migration_007_call_update_seq(db):
+    """Stamp calls written before update_seq with fresh sequence numbers, so ?since= returns them once."""
+    missing = await db.active_calls.count_documents({"update_seq": {"$exists": False}})
+    if not missing:
+        return
+    # Reserve a block of numbers above everything handed out so far
+    counter = await db[COUNTERS_COLLECTION].find_one_and_update(
+        {"_id": UPDATE_SEQ_COUNTER}, {"$inc": {"seq": missing}}, upsert=True, return_document=ReturnDocument.AFTER
+    )
+    seq = counter["seq"] - missing
+    operations = []
+    async for call in db.active_calls.find({"update_seq": {"$exists": False}}, {"_id": 1}).sort("created_at", ASCENDING):
+        seq += 1
+        if seq > counter["seq"]:
+            break  # written meanwhile by an old process; its next write stamps it
+        operations.append(UpdateOne({"_id": call["_id"], "update_seq": {"$exists": False}}, {"$set": {"update_seq": seq}}))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            await _bulk_update(db.active_calls, operations)
+            operations = []
+    await _bulk_update(db.active_calls, operations)
+
+
+# (version, description, coroutine) - append only, never renumber
+MIGRATIONS = [
+    (1, "Baseline indexes for server.py queries", _migration_001_baseline_indexes),
+    (2, "Normalized and phonetic person name keys", _migration_002_person_name_keys),
+    (3, "Normalized plate search tokens", _migration_003_vehicle_plate_keys),
+    (4, "Person identity keys for atomic find-or-create", _migration_004_person_identity_keys),
+    (5, "Keyset pagination indexes", _migration_005_keyset_indexes),
+    (6, "Phonetic keys for names with a leading H", _migration_006_leading_h_phonetic_keys),
+    (7, "Board sequence numbers for calls written before update_seq", _migration_007_call_update_seq),
+]
+
+
+async def run_migrations(db) -> List[int]:
+    """Apply pending migrations in version order and return the versions applied."""
+    applied = {doc["version"] async for doc in db[MIGRATIONS_COLLECTION].find({}, {"version": 1})}
+    ran = []
+    for version, description, migration in MIGRATIONS:
+        if version in applied:
+            continue
+        logger.info(f"Applying migration {version}: {description}")
+        await migration(db)
+        await db[MIGRATIONS_COLLECTION].update_one(
+            {"version": version},
+            {"$set": {
+                "version": version,
+                "description": description,
+                "applied_at": datetime.now(timezone.utc).isoformat()
+            }},
+            upsert=True
+        )
+        ran.append(version)
+    return ran
+
+
+async def bootstrap_database(db) -> List[int]:
+    """Run pending migrations, then make sure the current index set exists."""
+    ran = await run_migrations(db)
+    await ensure_indexes(db)
+    return ran
+
+
+def _find_index_names(plan: Dict[str, Any]) -> List[str]:
+    names = []
+    if plan.get("stage") == "IXSCAN":
+        names.append(plan.get("indexName"))
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            names.extend(_find_index_names(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        names.extend(_find_index_names(child))
+    return names
+
+
+async def explain_index_usage(db, collection: str, query: Dict[str, Any], sort=None) -> List[str]:
+    """Return the index names used by the winning plan (empty means collection scan)."""
+    cursor = db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.explain()
+    return _find_index_names(explanation["queryPlanner"]["winningPlan"])
+
+
+async def verify_indexes(db) -> List[Dict[str, Any]]:
+    """Explain every query in EXPLAIN_QUERIES and report whether it hits its index."""
+    results = []
+    for collection, query, sort, expected in EXPLAIN_QUERIES:
+        used = await explain_index_usage(db, collection, query, sort)
+        results.append({
+            "collection": collection,
+            "query": query,
+            "expected_index": expected,
+            "used_indexes": used,
+            "ok": expected in used
+        })
+    return results
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API, for load testing.
+
+None of the AI endpoints or the Gather webhooks can be exercised without a
+live key, and a live key makes load tests slow, costly and rate limited.
+This server answers POST /v1/chat/completions (buffered and streamed) with
+canned content after a configurable latency, and can inject errors, so the
+app and the LLM gateway can be benchmarked offline. Point the app at it
+with:
+
+    OPENAI_BASE_URL=http://localhost:8100/v1 OPENAI_API_KEY=fake uvicorn server:app
+
+Usage:
+    python fake_openai.py [--port 8100] [--latency lognormal:600,0.4]
+                          [--errors 429:0.02,500:0.01,timeout:0.005]
+                          [--token-interval-ms 15] [--responses canned.json] [--seed N]
+
+Latency is the time to the first token: fixed:MS, uniform:LO_MS,HI_MS or
+lognormal:MEDIAN_MS,SIGMA. Errors are STATUS:RATE pairs; "timeout" never
+answers, so the client's deadline fires. --responses is a JSON list of
+{"match": "substring of the prompt", "content": "..."} tried before the
+built-in defaults (DEFAULT_RESPONSES); the first match wins. GET /stats
+returns request counts by outcome.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Vehicles narrated per analyze_plates call (plate_batch.MAX_NARRATED_PER_BATCH)
+PLATE_BATCH_REFS = 20
+# Matched against the concatenated messages, first match wins
+DEFAULT_RESPONSES = [
+    {"match": "Analyze this call", "content": json.dumps({
+        "incident_type": "Traffic", "location": "5th Street and Main", "priority": 2,
+        "dispatcher_response": "Okay, I understand. Is anyone injured?", "is_complete": False})},
+    {"match": "having a real conversation", "content": "Got it. Is anyone hurt, and are you somewhere safe?"},
+    # analyze_plates (batch) answers by vehicle ref; refs past the batch are ignored
+    {"match": "keyed by each vehicle's ref", "content": json.dumps({str(ref): {
+        "risk_level": "Medium", "concerns": ["Hit on record"], "recommendations": ["Confirm the hit with dispatch"],
+        "notes": "Flagged by plate reader"} for ref in range(PLATE_BATCH_REFS)})},
+    {"match": "Analyze this license plate", "content": json.dumps({
+        "risk_level": "Low", "concerns": [], "recommendations": ["Standard traffic stop procedures"],
+        "notes": "No flags on record"})},
+    {"match": "police incident report", "content": (
+        "On the reported date and time, the reporting officer responded to the listed location regarding the "
+        "incident described. The officer made contact with the reporting party, who stated the events as "
+        "summarized in the brief details. The scene was documented and no further action was required at the "
+        "time of this report. This report is submitted for review.")},
+    {"match": "suspect description", "content": "[]"},
+    {"match": "patrol briefing", "content": "Incident volume is stable. Focus patrols on the listed hot spots."},
+]
+FALLBACK_CONTENT = "OK"
+TIMEOUT_HANG_SECONDS = 3600
+CHARS_PER_TOKEN = 4
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """A sampler returning seconds for fixed:MS, uniform:LO,HI or lognormal:MEDIAN,SIGMA."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Bad latency spec: {spec}")
+
+
+def parse_errors(spec: str) -> List[Tuple[str, float]]:
+    """[("429", 0.02), ("timeout", 0.005), ...] from "429:0.02,timeout:0.005"."""
+    errors = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        outcome, _, rate = part.partition(":")
+        if outcome != "timeout" and not outcome.isdigit():
+            raise ValueError(f"Bad error spec: {part}")
+        errors.append((outcome, float(rate)))
+    return errors
+
+
+def _tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    parts = []
+    for message in body.get("messages", []):
+        content = message.get("content")
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+
+def create_app(latency: str = "lognormal:600,0.4", errors: str = "", token_interval_ms: float = 15,
+               responses: Optional[List[Dict[str, str]]] = None, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI()
+    sample_latency = parse_latency(latency)
+    injected = parse_errors(errors)
+    canned = (responses or []) + DEFAULT_RESPONSES
+    rng = random.Random(seed)
+    outcomes: Counter = Counter()
+
+    def pick_outcome() -> str:
+        roll = rng.random()
+        for outcome, rate in injected:
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "ok"
+
+    def error_response(status: int) -> JSONResponse:
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        headers = {"retry-after": "1"} if status == 429 else None
+        return JSONResponse(status_code=status, headers=headers,
+                            content={"error": {"message": f"Injected {status}", "type": kind, "code": kind}})
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        outcome = pick_outcome()
+        outcomes[outcome] += 1
+        await asyncio.sleep(sample_latency(rng))
+        if outcome == "timeout":
+            await asyncio.sleep(TIMEOUT_HANG_SECONDS)
+        if outcome != "ok":
+            return error_response(int(outcome))
+
+        prompt = _prompt_text(body)
+        content = next((r["content"] for r in canned if r["match"] in prompt), FALLBACK_CONTENT)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o-mini")
+        usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(content),
+                 "total_tokens": _tokens(prompt) + _tokens(content)}
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> str:
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            yield chunk({"role": "assistant", "content": ""})
+            pieces = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+            for piece in pieces:
+                yield chunk({"content": piece})
+                await asyncio.sleep(token_interval_ms / 1000)
+            yield chunk({}, "stop")
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": sum(outcomes.values()), "outcomes": dict(outcomes)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="lognormal:600,0.4")
+    parser.add_argument("--errors", default="")
+    parser.add_argument("--token-interval-ms", type=float, default=15)
+    parser.add_argument("--responses", help="JSON file of {match, content} objects")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses) as f:
+            responses = json.load(f)
+    app = create_app(args.latency, args.errors, args.token_interval_ms, responses, args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,248 @@
-# Violation codes with automatic fine amounts
-VIOLATION_FINES = {
-    # Traffic Violations
-    'VC-22350': 238.00,  # Speeding - Basic Speed Law
-    'VC-21453': 490.00,  # Failure to Stop at Red Light
-    'VC-22454': 238.00,  # Failure to Stop at Stop Sign
-    'VC-23152': 1800.00, # DUI - Driving Under the Influence
-    'VC-12500': 234.00,  # Driving Without Valid License
-    'VC-16028': 900.00,  # No Proof of Insurance
-    'VC-22349': 367.00,  # Exceeding Maximum Speed Limit
-    'VC-21658': 238.00,  # Unsafe Lane Change
-    'VC-22107': 238.00,  # Unsafe Turn or Stop
-    'VC-23103': 490.00,  # Reckless Driving
-    'VC-27360': 162.00,  # Seat Belt Violation
-    'VC-23123': 162.00,  # Cell Phone While Driving
-    
-    # Criminal Violations
-    'PC-459': 0.00,      # Burglary (court determines)
-    'PC-487': 0.00,      # Grand Theft (court determines)
-    'PC-484': 500.00,    # Petty Theft
-    'PC-242': 1000.00,   # Battery
-    'PC-415': 400.00,    # Disturbing the Peace
-    'PC-148': 1000.00,   # Resisting Arrest
-    'PC-243': 2000.00,   # Battery on Peace Officer
-    'PC-594': 1000.00,   # Vandalism
-}
-
-def get_fine_amount(violation_code: str) -> float:
-    """Get automatic fine amount for violation code."""
-    return VIOLATION_FINES.get(violation_code, 0.00)
+"""
+Violation catalog with effective-dated fines.
+
+Fines used to be a hard-coded dict: changing one meant a redeploy, there
+was no record of the fine in effect on a past citation date (which is what
+a court dispute is about), and an unknown code silently became $0.
+
+The catalog now lives in a versioned data file (violation_catalog.json by
+default, VIOLATION_CATALOG_PATH to override). Each violation has a list of
+fines, each effective from a date until the next one starts:
+
+    {"version": "2025-07-01",
+     "violations": [{"code": "VC-22350", "description": "...", "category": "Traffic",
+                     "fines": [{"effective_from": "2000-01-01", "amount": 238.0},
+                               {"effective_from": "2025-07-01", "amount": 250.0}]}]}
+
+It is loaded into an immutable CatalogIndex keyed by (code, effective
+date). ViolationCatalog.reload() builds and validates a complete new index
+before swapping one reference, so readers never take a lock and never see
+a half-loaded catalog; a bad file leaves the current one in place. Unknown
+codes, and dates before a code's first fine, raise instead of pricing at
+$0. Court-determined violations are priced at 0.0 explicitly.
+
+ViolationCatalog.publish() replaces the file through the API. A new
+catalog must carry a new version and keep every fine already in effect
+(start date, amount, court_determined), so past citations still price as
+they were issued; fines can only be added from tomorrow on. The file it
+replaces is kept as violation_catalog_history/<version>.json beside it.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent / "violation_catalog.json"
+
+
+class UnknownViolationCode(ValueError):
+    """No such code, or no fine in effect for it on the date asked about."""
+
+
+class FineEntry(NamedTuple):
+    code: str
+    description: str
+    category: str
+    amount: float
+    effective_from: str
+    effective_to: Optional[str]  # exclusive; None while current
+    court_determined: bool
+
+
+def normalize_code(code: Optional[str]) -> str:
+    """Uppercase, trimmed, spaces as dashes ("vc 22350" -> "VC-22350")."""
+    return "-".join((code or "").upper().split())
+
+
+def as_date(value: Union[str, date, datetime, None]) -> str:
+    """ISO date for a citation date_time ("2025-01-15T14:30", a date, a datetime); today if empty."""
+    if value is None or value == "":
+        return date.today().isoformat()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return date.fromisoformat(value.strip()[:10]).isoformat()
+
+
+class CatalogIndex:
+    """One catalog version. Never modified after construction."""
+
+    __slots__ = ("version", "source", "loaded_at", "_starts", "_entries")
+
+    def __init__(self, data: Dict[str, Any], source: str = ""):
+        if not data.get("version"):
+            raise ValueError("Catalog has no version")
+        starts: Dict[str, Tuple[str, ...]] = {}
+        entries: Dict[str, Tuple[FineEntry, ...]] = {}
+        for violation in data.get("violations", []):
+            code = normalize_code(violation.get("code"))
+            if not code:
+                raise ValueError(f"Violation without a code: {violation}")
+            if code in entries:
+                raise ValueError(f"Duplicate violation code {code}")
+            fines = sorted(violation.get("fines") or [], key=lambda fine: fine["effective_from"])
+            if not fines:
+                raise ValueError(f"{code} has no fines")
+            dates = [as_date(fine["effective_from"]) for fine in fines]
+            if len(set(dates)) != len(dates):
+                raise ValueError(f"{code} has two fines effective on the same date")
+            schedule = []
+            for i, fine in enumerate(fines):
+                amount = float(fine["amount"])
+                if amount < 0:
+                    raise ValueError(f"{code} has a negative fine")
+                schedule.append(FineEntry(code, violation.get("description", ""), violation.get("category", ""),
+                                          amount, dates[i], dates[i + 1] if i + 1 < len(dates) else None,
+                                          bool(violation.get("court_determined"))))
+            starts[code] = tuple(dates)
+            entries[code] = tuple(schedule)
+        self.version = str(data["version"])
+        self.source = source
+        self.loaded_at = time.time()
+        self._starts = starts
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, code: str) -> bool:
+        return normalize_code(code) in self._entries
+
+    def codes(self) -> List[str]:
+        return sorted(self._entries)
+
+    def lookup(self, code: str, on_date: Union[str, date, datetime, None] = None) -> FineEntry:
+        """The fine for code in effect on on_date (default today)."""
+        key = normalize_code(code)
+        starts = self._starts.get(key)
+        if starts is None:
+            raise UnknownViolationCode(f"Unknown violation code: {code}")
+        day = as_date(on_date)
+        position = bisect_right(starts, day) - 1
+        if position < 0:
+            raise UnknownViolationCode(f"No fine for {key} in effect on {day} (first effective {starts[0]})")
+        return self._entries[key][position]
+
+    def history(self, code: str) -> Tuple[FineEntry, ...]:
+        entries = self._entries.get(normalize_code(code))
+        if entries is None:
+            raise UnknownViolationCode(f"Unknown violation code: {code}")
+        return entries
+
+    def current(self, on_date: Union[str, date, datetime, None] = None) -> List[FineEntry]:
+        """Every code's fine in effect on on_date, skipping codes not yet in effect."""
+        day = as_date(on_date)
+        return [self._entries[code][i - 1] for code, starts in sorted(self._starts.items())
+                if (i := bisect_right(starts, day)) > 0]
+
+    def fines(self, items: Iterable[Tuple[str, Union[str, date, datetime, None]]]) -> List[Dict[str, Any]]:
+        """Price many (code, date) pairs; per-item results in order, errors included."""
+        results = []
+        for position, (code, on_date) in enumerate(items):
+            try:
+                entry = self.lookup(code, on_date)
+                results.append({"index": position, "status": "ok", "violation_code": entry.code,
+                                "fine_amount": entry.amount, "effective_from": entry.effective_from,
+                                "court_determined": entry.court_determined})
+            except (UnknownViolationCode, ValueError) as e:
+                results.append({"index": position, "status": "error", "violation_code": code, "detail": str(e)})
+        return results
+
+
+def check_successor(current: CatalogIndex, fresh: CatalogIndex, today: Union[str, date, None] = None) -> None:
+    """Raise ValueError unless fresh can replace current: a new version that keeps every fine
+    in effect on or before today unchanged."""
+    if fresh.version == current.version:
+        raise ValueError(f"Catalog version {fresh.version} is already live; publish a new version")
+    day = as_date(today)
+    problems = []
+    for code in current.codes():
+        in_effect = [entry for entry in current.history(code) if entry.effective_from <= day]
+        if not in_effect:
+            continue
+        if code not in fresh:
+            problems.append(f"{code} removed (in effect since {in_effect[0].effective_from})")
+            continue
+        replacement = [entry for entry in fresh.history(code) if entry.effective_from <= day]
+        if [(e.effective_from, e.amount, e.court_determined) for e in replacement] != \
+                [(e.effective_from, e.amount, e.court_determined) for e in in_effect]:
+            problems.append(f"{code} fines on or before {day} changed")
+    if problems:
+        raise ValueError("Fines already in effect can't be changed: " + "; ".join(problems))
+
+
+class ViolationCatalog:
+    """Holds the live CatalogIndex; reload() swaps in a new one atomically."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_CATALOG_PATH):
+        self.path = Path(path)
+        self.history_dir = self.path.parent / f"{self.path.stem}_history"
+        self.reloads = 0
+        self._mtime: Optional[float] = None
+        self.index = self._read()
+
+    def _read(self) -> CatalogIndex:
+        # Remembered even if the file is bad, so a broken edit is reported once, not every poll
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path) as f:
+            return CatalogIndex(json.load(f), source=str(self.path))
+
+    def reload(self) -> CatalogIndex:
+        """Load the file again; on any error the current index stays live and the error is raised."""
+        fresh = self._read()
+        self.index = fresh
+        self.reloads += 1
+        logger.info(f"Violation catalog {fresh.version} loaded: {len(fresh)} codes")
+        return fresh
+
+    def archive_path(self, version: str) -> Path:
+        return self.history_dir / f"{re.sub(r'[^A-Za-z0-9._-]', '_', version)}.json"
+
+    def publish(self, data: Dict[str, Any], today: Union[str, date, None] = None) -> CatalogIndex:
+        """Replace the catalog file with data (see check_successor) and load it; the replaced file is archived."""
+        fresh = CatalogIndex(data, source=str(self.path))
+        # Checked against the file, which another worker may have published since our last poll
+        current = self.reload()
+        check_successor(current, fresh, today)
+        if self.archive_path(fresh.version).exists():
+            raise ValueError(f"Catalog version {fresh.version} was published before; publish a new version")
+        self.history_dir.mkdir(exist_ok=True)
+        shutil.copy2(self.path, self.archive_path(current.version))
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(data, indent=2))
+        os.replace(temp_path, self.path)
+        return self.reload()
+
+    def reload_if_changed(self) -> bool:
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            self.reload()
+            return True
+        except Exception as e:
+            logger.error(f"Violation catalog reload from {self.path} failed: {e}")
+            return False
+
+    def fine(self, code: str, on_date: Union[str, date, datetime, None] = None) -> FineEntry:
+        return self.index.lookup(code, on_date)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.index.version, "codes": len(self.index), "source": self.index.source,
+                "loaded_at": self.index.loaded_at, "reloads": self.reloads}
+
+
+catalog = ViolationCatalog(os.environ.get("VIOLATION_CATALOG_PATH") or DEFAULT_CATALOG_PATH)
+
+
+def get_fine_amount(violation_code: str, on_date: Union[str, date, datetime, None] = None) -> float:
+    """Fine for violation_code in effect on on_date (default today). Raises UnknownViolationCode."""
+    return catalog.fine(violation_code, on_date).amount
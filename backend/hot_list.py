@@ -0,0 +1,359 @@
+"""
+In-memory hot list of wanted vehicles and persons with warrants.
+
+Almost every plate or person lookup is a negative, yet each one used to be
+a Mongo round trip. The hot list holds every positive:
+
+  - vehicles with flags or a registration problem, keyed by normalized plate
+  - persons with warrants, keyed by id, normalized DL / name + DOB identity
+    keys, and first + last name (to match a vehicle's registered owner)
+
+in two layers. A Bloom filter answers the common "definitely not" without
+touching the dict; an exact dict of positives says what the hit is, and
+also weeds out the filter's false positives. Writes made by this worker
+are applied immediately (upsert_vehicle / upsert_person); writes from
+other workers are picked up by a periodic rebuild, which is also what
+clears the bits of removed entries (a Bloom filter can't delete). The
+filter and the positives are snapshotted to disk after each rebuild, so a
+restart serves from the snapshot while the first rebuild runs. Hashing the
+keys into a new filter and writing the snapshot run in threads, and this
+worker's writes made while a rebuild is reading Mongo are replayed onto
+the new list before it replaces the old one.
+
+Memory (test_hot_list.py, 1% false positive rate, 10M entries): the
+filter is 9.6 bits per entry, 11.4 MiB with 7 probes, measured false
+positive rate 1.00%, ~5 us per negative lookup, ~55 s to build. The
+positives dict costs ~370 bytes per entry in CPython, ~3.5 GiB at 10M. In
+CPython a dict miss is cheaper than the filter's hashing, so the filter
+earns its place by size: past a few million positives, keep the filter
+in memory and leave the positives in Mongo, which then only sees lookups
+the filter can't rule out.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from name_search import person_identity_keys, normalize_name
+from plate_batch import REGISTRATION_PROBLEMS, owner_name_key
+from plate_search import normalize_plate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 0.01
+LOAD_BATCH_SIZE = 5000
+# Rebuild early once this share of the filter's keys have been removed
+MAX_STALE_FRACTION = 0.1
+SNAPSHOT_VERSION = 1
+
+VEHICLE_PROJECTION = {"_id": 0, "id": 1, "plate_number": 1, "state": 1, "flags": 1, "registration_status": 1}
+PERSON_PROJECTION = {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "dob": 1, "drivers_license": 1, "warrants": 1}
+
+
+class BloomFilter:
+    """Bit array with k probes per key from double hashing one 128-bit blake2b digest."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        bits = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_bits = max(64, (bits + 7) // 8 * 8)
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        # A bytearray indexes faster than a numpy array one probe at a time;
+        # add_many works on a numpy view of the same buffer
+        self.bits = bytearray(self.num_bits // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def add_many(self, keys: Iterable[str]):
+        positions = np.fromiter((p for key in keys for p in self._positions(key)), dtype=np.uint64)
+        np.bitwise_or.at(np.frombuffer(self.bits, dtype=np.uint8), positions >> np.uint64(3),
+                         (np.uint64(1) << (positions & np.uint64(7))).astype(np.uint8))
+        self.count += len(positions) // self.num_hashes
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def expected_error_rate(self) -> float:
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+def vehicle_entries(vehicle: Dict[str, Any]) -> Tuple[List[str], Optional[str]]:
+    """Hot list keys for a vehicle and what the hit is, or ([], None) when it has none."""
+    problems = []
+    status = (vehicle.get("registration_status") or "").strip().upper()
+    if status in REGISTRATION_PROBLEMS:
+        problems.append(status)
+    problems.extend(flag for flag in (str(f).strip().upper() for f in vehicle.get("flags") or []) if flag not in problems)
+    plate = normalize_plate(vehicle.get("plate_number"))
+    if not problems or not plate:
+        return [], None
+    return [f"plate:{plate}"], ",".join(problems)
+
+
+def person_entries(person: Dict[str, Any]) -> Tuple[List[str], Optional[str]]:
+    """Hot list keys for a person with warrants and what the hit is, or ([], None)."""
+    warrants = person.get("warrants") or []
+    if not warrants:
+        return [], None
+    keys = [f"person:{person['id']}"]
+    keys.extend(person_identity_keys(person.get("drivers_license"), person.get("first_name"),
+                                     person.get("last_name"), person.get("dob")))
+    first, last = normalize_name(person.get("first_name")), normalize_name(person.get("last_name"))
+    if first and last:
+        keys.append(f"owner:{first}|{last}")
+    return keys, f"{len(warrants)} warrant(s)"
+
+
+class HotList:
+    """Bloom filter over the positives' keys in front of an exact dict of them."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE,
+                 snapshot_path: Optional[str] = None, refresh_seconds: float = 300):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.snapshot_path = snapshot_path
+        self.refresh_seconds = refresh_seconds
+        self.filter = BloomFilter(capacity, error_rate)
+        # key -> {source: hit}, source being "vehicle:<id>" or "person:<id>"
+        self.entries: Dict[str, Dict[str, str]] = {}
+        # source -> (keys, hit); values are never mutated, so a shallow copy is a consistent snapshot
+        self._sources: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+        self.stale = 0
+        self.loaded_at: Optional[float] = None
+        # Why the last rebuild failed, until one succeeds
+        self.last_error: Optional[str] = None
+        self.lookups = 0
+        self.filter_negatives = 0
+        self.false_positives = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # (source, keys, hit) applied while a rebuild runs, replayed onto its result
+        self._writes_during_build: Optional[List[Tuple[str, List[str], Optional[str]]]] = None
+
+    @property
+    def loaded(self) -> bool:
+        """False until the first build or snapshot; before that a miss means "don't know"."""
+        return self.loaded_at is not None
+
+    def check(self, key: str) -> Optional[Dict[str, str]]:
+        """{source: hit} for key, or None. Only meaningful once loaded (see ready)."""
+        self.lookups += 1
+        if key not in self.filter:
+            self.filter_negatives += 1
+            return None
+        hits = self.entries.get(key)
+        if hits is None:
+            self.false_positives += 1
+        return hits
+
+    def check_plate(self, plate: Optional[str]) -> Optional[Dict[str, str]]:
+        return self.check(f"plate:{normalize_plate(plate)}")
+
+    def check_owner(self, registered_owner: Optional[str]) -> Optional[Dict[str, str]]:
+        key = owner_name_key(registered_owner)
+        return self.check(f"owner:{key[0]}|{key[1]}") if key else None
+
+    def check_person(self, person_id: Optional[str] = None, drivers_license: Optional[str] = None,
+                     first_name: Optional[str] = None, last_name: Optional[str] = None,
+                     dob: Optional[str] = None) -> Optional[Dict[str, str]]:
+        keys = [f"person:{person_id}"] if person_id else []
+        keys.extend(person_identity_keys(drivers_license, first_name, last_name, dob))
+        hits: Dict[str, str] = {}
+        for key in keys:
+            hits.update(self.check(key) or {})
+        return hits or None
+
+    def _replace(self, source: str, keys: List[str], hit: Optional[str]):
+        old_keys, _ = self._sources.pop(source, ((), None))
+        for key in old_keys:
+            sources = self.entries.get(key)
+            if sources is not None:
+                sources.pop(source, None)
+                if not sources:
+                    del self.entries[key]
+                    self.stale += 1
+        if hit:
+            self._sources[source] = (tuple(keys), hit)
+            for key in keys:
+                if key not in self.entries:
+                    self.entries[key] = {}
+                    self.filter.add(key)
+                self.entries[key][source] = hit
+
+    def _apply(self, source: str, keys: List[str], hit: Optional[str]):
+        if self._writes_during_build is not None:
+            self._writes_during_build.append((source, keys, hit))
+        if self.loaded_at is not None:
+            self._replace(source, keys, hit)
+
+    def upsert_vehicle(self, vehicle: Dict[str, Any]):
+        """Apply a vehicle write made by this worker (only recorded for the build until the first load)."""
+        self._apply(f"vehicle:{vehicle['id']}", *vehicle_entries(vehicle))
+
+    def upsert_person(self, person: Dict[str, Any]):
+        """Apply a person write made by this worker (only recorded for the build until the first load)."""
+        self._apply(f"person:{person['id']}", *person_entries(person))
+
+    @classmethod
+    def _from_sources(cls, sources: Dict[str, Tuple[Tuple[str, ...], str]], capacity: int, error_rate: float,
+                      **kwargs) -> "HotList":
+        entries: Dict[str, Dict[str, str]] = {}
+        for source, (keys, hit) in sources.items():
+            for key in keys:
+                entries.setdefault(key, {})[source] = hit
+        # Headroom for this worker's own writes until the next rebuild
+        hot_list = cls(max(capacity, 2 * len(entries)), error_rate, **kwargs)
+        hot_list.filter.add_many(entries)
+        hot_list.entries = entries
+        hot_list._sources = sources
+        return hot_list
+
+    async def build(self, db) -> "HotList":
+        sources: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+        registration_problem = {"$regex": f"^({'|'.join(REGISTRATION_PROBLEMS)})$", "$options": "i"}
+        vehicle_query = {"$or": [{"flags.0": {"$exists": True}}, {"registration_status": registration_problem}]}
+        async for vehicle in db.vehicles.find(vehicle_query, VEHICLE_PROJECTION).batch_size(LOAD_BATCH_SIZE):
+            keys, hit = vehicle_entries(vehicle)
+            if hit:
+                sources[f"vehicle:{vehicle['id']}"] = (tuple(keys), hit)
+        async for person in db.persons.find({"warrants.0": {"$exists": True}}, PERSON_PROJECTION).batch_size(LOAD_BATCH_SIZE):
+            keys, hit = person_entries(person)
+            if hit:
+                sources[f"person:{person['id']}"] = (tuple(keys), hit)
+        # Hashing every key into the filter takes seconds at millions of keys - keep it off the event loop
+        fresh = await asyncio.to_thread(self._from_sources, sources, self.capacity, self.error_rate,
+                                        snapshot_path=self.snapshot_path, refresh_seconds=self.refresh_seconds)
+        fresh.loaded_at = time.time()
+        return fresh
+
+    def snapshot_state(self) -> Tuple[bytes, Dict[str, Any]]:
+        """Copy of the filter bits and positives for write_snapshot; take it on the event loop."""
+        return bytes(self.filter.bits), {
+            "version": SNAPSHOT_VERSION, "capacity": self.filter.capacity, "error_rate": self.error_rate,
+            "count": self.filter.count, "loaded_at": self.loaded_at, "sources": dict(self._sources),
+        }
+
+    @staticmethod
+    def write_snapshot(path: str, state: Tuple[bytes, Dict[str, Any]]):
+        """Write a snapshot_state() copy to path atomically; safe to run in a thread."""
+        bits, meta = state
+        meta = {**meta, "sources": {source: [list(keys), hit] for source, (keys, hit) in meta["sources"].items() if keys}}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, bits=np.frombuffer(bits, dtype=np.uint8), meta=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8))
+        os.replace(temp_path, path)
+
+    def save_snapshot(self):
+        """Write the filter and positives to snapshot_path atomically."""
+        if self.snapshot_path:
+            self.write_snapshot(self.snapshot_path, self.snapshot_state())
+
+    def load_snapshot(self) -> bool:
+        """Serve from the last snapshot until the first rebuild finishes. False if there is none."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path) as snapshot:
+                meta = json.loads(snapshot["meta"].tobytes())
+                bits = bytearray(snapshot["bits"].tobytes())
+            if meta.get("version") != SNAPSHOT_VERSION:
+                return False
+            sources = {source: (tuple(keys), hit) for source, (keys, hit) in meta["sources"].items()}
+            entries: Dict[str, Dict[str, str]] = {}
+            for source, (keys, hit) in sources.items():
+                for key in keys:
+                    entries.setdefault(key, {})[source] = hit
+            self.filter = BloomFilter(meta["capacity"], meta["error_rate"])
+            self.filter.bits = bits
+            self.filter.count = meta["count"]
+            self.entries = entries
+            self._sources = sources
+            self.stale = 0
+            self.loaded_at = meta["loaded_at"]
+        except Exception as e:
+            logger.error(f"Hot list snapshot {self.snapshot_path} unreadable: {e}")
+            return False
+        logger.info(f"Hot list loaded from snapshot: {len(self.entries)} keys")
+        return True
+
+    def _adopt(self, fresh: "HotList"):
+        self.filter = fresh.filter
+        self.entries = fresh.entries
+        self._sources = fresh._sources
+        self.stale = fresh.stale
+        self.loaded_at = fresh.loaded_at
+
+    async def _rebuild(self, db):
+        try:
+            self._writes_during_build = []
+            try:
+                fresh = await self.build(db)
+                # Writes the build's reads may have missed; replayed and adopted without yielding
+                for source, keys, hit in self._writes_during_build:
+                    fresh._replace(source, keys, hit)
+            finally:
+                self._writes_during_build = None
+            self._adopt(fresh)
+            if self.snapshot_path:
+                await asyncio.to_thread(self.write_snapshot, self.snapshot_path, self.snapshot_state())
+            self.last_error = None
+            logger.info(f"Hot list rebuilt: {len(self.entries)} keys")
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Hot list rebuild failed: {e}")
+
+    async def ready(self, db) -> "HotList":
+        """Load on first use; rebuild in the background when old or when removals have staled the filter."""
+        if self.loaded_at is None:
+            async with self._lock:
+                if self.loaded_at is None:
+                    await self._rebuild(db)
+        elif ((time.time() - self.loaded_at > self.refresh_seconds
+               or self.stale > MAX_STALE_FRACTION * max(self.filter.count, 1))
+              and (self._refresh_task is None or self._refresh_task.done())):
+            self._refresh_task = asyncio.create_task(self._rebuild(db))
+        return self
+
+    def refresh(self, db):
+        """Rebuild in the background now, e.g. after a bulk import (no-op until the first load)."""
+        if self.loaded_at is not None and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._rebuild(db))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self.entries),
+            "sources": len(self._sources),
+            "filter_bytes": self.filter.nbytes,
+            "filter_hashes": self.filter.num_hashes,
+            "filter_capacity": self.filter.capacity,
+            "expected_false_positive_rate": round(self.filter.expected_error_rate(), 6),
+            "stale_keys": self.stale,
+            "lookups": self.lookups,
+            "filter_negatives": self.filter_negatives,
+            "false_positives": self.false_positives,
+            "loaded_at": self.loaded_at,
+            "last_error": self.last_error,
+        }
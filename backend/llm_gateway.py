@@ -0,0 +1,213 @@
+"""
+Single path to the OpenAI chat completions API.
+
+Every AI call names its endpoint and a priority class. Each class has its
+own concurrency limit and deadline, so a burst of back-office work (report
+writing, suspect matching) can never take the upstream capacity that live
+911 call turns need. Transient failures (rate limits, timeouts, connection
+errors, 5xx) are retried with jittered exponential backoff, honouring
+Retry-After, but only while the retry can still finish inside the call's
+deadline. Tokens, latency, queueing and retries are recorded per endpoint.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_LIVE = "live"                # caller is on the line
+PRIORITY_INTERACTIVE = "interactive"  # officer waiting on screen
+PRIORITY_BACKGROUND = "background"    # analytics, batch work
+
+DEFAULT_LIMITS = {PRIORITY_LIVE: 32, PRIORITY_INTERACTIVE: 8, PRIORITY_BACKGROUND: 2}
+DEFAULT_DEADLINES = {PRIORITY_LIVE: 8.0, PRIORITY_INTERACTIVE: 60.0, PRIORITY_BACKGROUND: 120.0}
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 8.0
+# Don't start an attempt with less time than this left
+MIN_ATTEMPT_SECONDS = 1.0
+LATENCY_SAMPLES = 500
+
+RETRYABLE = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class LLMUnavailable(RuntimeError):
+    """No answer within the deadline (queue wait, retries exhausted, or no API key)."""
+
+
+class EndpointMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+        self.queue_ms: deque = deque(maxlen=LATENCY_SAMPLES)
+
+    def record_usage(self, usage):
+        if usage is not None:
+            self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+            self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+
+    @staticmethod
+    def _percentile(samples, fraction: float) -> Optional[float]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms_p50": self._percentile(self.latencies_ms, 0.5),
+            "latency_ms_p95": self._percentile(self.latencies_ms, 0.95),
+            "queue_ms_p95": self._percentile(self.queue_ms, 0.95),
+        }
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class GatewayStream:
+    """A streamed completion that holds its concurrency slot until exhausted or closed."""
+
+    def __init__(self, gateway: "LLMGateway", upstream, endpoint: str, priority: str, started: float):
+        self._gateway = gateway
+        self._upstream = upstream
+        self._endpoint = endpoint
+        self._priority = priority
+        self._started = started
+        self._released = False
+
+    async def __aiter__(self):
+        metrics = self._gateway.metrics(self._endpoint)
+        try:
+            async for chunk in self._upstream:
+                metrics.record_usage(getattr(chunk, "usage", None))
+                yield chunk
+            metrics.latencies_ms.append((time.perf_counter() - self._started) * 1000)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            self._release()
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._gateway._release(self._priority)
+
+    async def close(self):
+        try:
+            await self._upstream.close()
+        finally:
+            self._release()
+
+
+class LLMGateway:
+    def __init__(self, client, limits: Optional[Dict[str, int]] = None,
+                 deadlines: Optional[Dict[str, float]] = None, max_attempts: int = MAX_ATTEMPTS):
+        self.client = client
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+        self.max_attempts = max_attempts
+        self._slots = {priority: asyncio.Semaphore(limit) for priority, limit in self.limits.items()}
+        self._in_flight = {priority: 0 for priority in self.limits}
+        self._metrics: Dict[str, EndpointMetrics] = {}
+
+    def _release(self, priority: str):
+        self._in_flight[priority] -= 1
+        self._slots[priority].release()
+
+    def metrics(self, endpoint: str) -> EndpointMetrics:
+        if endpoint not in self._metrics:
+            self._metrics[endpoint] = EndpointMetrics()
+        return self._metrics[endpoint]
+
+    async def _call(self, endpoint: str, priority: str, deadline: Optional[float], stream: bool, kwargs: Dict[str, Any]):
+        if self.client is None:
+            raise LLMUnavailable("OPENAI_API_KEY not configured")
+        if priority not in self._slots:
+            raise ValueError(f"Unknown priority class: {priority}")
+        metrics = self.metrics(endpoint)
+        metrics.calls += 1
+        started = time.perf_counter()
+        expires = started + (deadline or self.deadlines[priority])
+
+        try:
+            await asyncio.wait_for(self._slots[priority].acquire(), timeout=expires - time.perf_counter())
+        except asyncio.TimeoutError:
+            metrics.errors += 1
+            raise LLMUnavailable(f"{endpoint}: no {priority} capacity before the deadline")
+        metrics.queue_ms.append((time.perf_counter() - started) * 1000)
+
+        # A stream keeps the slot (and its in-flight count) until it is exhausted or closed
+        handed_off = False
+        self._in_flight[priority] += 1
+        try:
+            attempt = 0
+            while True:
+                attempt += 1
+                remaining = expires - time.perf_counter()
+                try:
+                    response = await self.client.chat.completions.create(timeout=remaining, stream=stream, **kwargs)
+                except RETRYABLE as e:
+                    backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+                    backoff = max(backoff, _retry_after(e) or 0)
+                    remaining = expires - time.perf_counter()
+                    if attempt >= self.max_attempts or remaining - backoff < MIN_ATTEMPT_SECONDS:
+                        metrics.errors += 1
+                        raise LLMUnavailable(f"{endpoint}: {type(e).__name__} after {attempt} attempt(s)") from e
+                    metrics.retries += 1
+                    logger.warning(f"LLM {endpoint} {type(e).__name__}, retrying in {backoff:.2f}s")
+                    await asyncio.sleep(backoff)
+                    continue
+                except Exception:
+                    metrics.errors += 1
+                    raise
+
+                if stream:
+                    handed_off = True
+                    return GatewayStream(self, response, endpoint, priority, started)
+                metrics.record_usage(getattr(response, "usage", None))
+                metrics.latencies_ms.append((time.perf_counter() - started) * 1000)
+                return response
+        finally:
+            if not handed_off:
+                self._release(priority)
+
+    async def chat(self, endpoint: str, priority: str = PRIORITY_INTERACTIVE, deadline: Optional[float] = None, **kwargs):
+        """chat.completions.create(**kwargs) under the class's concurrency limit and deadline."""
+        return await self._call(endpoint, priority, deadline, False, kwargs)
+
+    async def stream_chat(self, endpoint: str, priority: str = PRIORITY_INTERACTIVE,
+                          deadline: Optional[float] = None, **kwargs) -> GatewayStream:
+        """Streamed completion; retries only until the stream opens. Iterate it or close() it."""
+        kwargs.setdefault("stream_options", {"include_usage": True})
+        return await self._call(endpoint, priority, deadline, True, kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "classes": {
+                priority: {"limit": self.limits[priority], "in_flight": self._in_flight[priority],
+                           "deadline_seconds": self.deadlines[priority]}
+                for priority in self.limits
+            },
+            "endpoints": {endpoint: metrics.snapshot() for endpoint, metrics in sorted(self._metrics.items())},
+        }
@@ -0,0 +1,277 @@
+"""
+Normalized and phonetic name keys for person search.
+
+Names are stored alongside a casefolded, punctuation-free key (for exact and
+prefix-range lookups that can use an index) and a Metaphone code (so that
+"Jon Smyth" still finds "John Smith"). Keys are computed when a PersonRecord
+is built, so every write path gets them for free.
+"""
+import asyncio
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+VOWELS = set("AEIOU")
+FRONT_VOWELS = set("EIY")
+# H after these is part of a digraph (CH, SH, PH, TH, GH)
+SILENCING_H = set("CSPTG")
+# Upper bound for prefix ranges: every normalized key is [a-z0-9]
+PREFIX_RANGE_END = "\x7f"
+
+# Ranking weights for search_person
+SCORE_EXACT = 100
+SCORE_PREFIX = 60
+SCORE_PHONETIC = 40
+# Order within one match_score, backed by the last_first_key index
+PERSON_SEARCH_SORT = [("last_name_key", 1), ("first_name_key", 1), ("id", 1)]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Casefold, strip accents and drop everything but letters and digits ("O'Brien-Núñez" -> "obriennunez")."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(ch for ch in decomposed.casefold() if ch.isascii() and ch.isalnum())
+
+
+def metaphone(name: Optional[str]) -> str:
+    """Original Metaphone code for a name, e.g. metaphone("Knight") == "NT"."""
+    word = "".join(ch for ch in normalize_name(name).upper() if ch.isalpha())
+    if not word:
+        return ""
+
+    # Initial-letter exceptions
+    if word[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        word = word[1:]
+    elif word[0] == "X":
+        word = "S" + word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+
+    code = []
+    length = len(word)
+    for i, ch in enumerate(word):
+        prev = word[i - 1] if i > 0 else ""
+        nxt = word[i + 1] if i + 1 < length else ""
+        after = word[i + 2] if i + 2 < length else ""
+
+        # Doubled letters sound once, except C (e.g. "McCall" -> K K)
+        if ch == prev and ch != "C":
+            continue
+
+        if ch in VOWELS:
+            if i == 0:
+                code.append(ch)
+        elif ch == "B":
+            if not (prev == "M" and i == length - 1):
+                code.append("B")
+        elif ch == "C":
+            if nxt == "I" and after == "A":
+                code.append("X")
+            elif nxt == "H":
+                code.append("K" if prev == "S" else "X")
+            elif nxt in FRONT_VOWELS:
+                if prev != "S":
+                    code.append("S")
+            else:
+                code.append("K")
+        elif ch == "D":
+            code.append("J" if nxt == "G" and after in FRONT_VOWELS else "T")
+        elif ch == "G":
+            if nxt == "H" and not (i + 2 >= length or after in VOWELS):
+                continue
+            if nxt == "N" and (i + 2 == length or word[i + 2:] == "ED"):
+                continue
+            if prev == "D" and nxt in FRONT_VOWELS:
+                continue
+            code.append("J" if nxt in FRONT_VOWELS and prev != "G" else "K")
+        elif ch == "H":
+            if prev in SILENCING_H:
+                continue
+            if prev in VOWELS and nxt not in VOWELS:
+                continue
+            code.append("H")
+        elif ch == "K":
+            if prev != "C":
+                code.append("K")
+        elif ch == "P":
+            code.append("F" if nxt == "H" else "P")
+        elif ch == "Q":
+            code.append("K")
+        elif ch == "S":
+            if nxt == "H" or (nxt == "I" and after in ("O", "A")):
+                code.append("X")
+            else:
+                code.append("S")
+        elif ch == "T":
+            if nxt == "I" and after in ("O", "A"):
+                code.append("X")
+            elif nxt == "H":
+                code.append("0")
+            elif not (nxt == "C" and after == "H"):
+                code.append("T")
+        elif ch == "V":
+            code.append("F")
+        elif ch in "WY":
+            if nxt in VOWELS:
+                code.append(ch)
+        elif ch == "X":
+            code.append("KS")
+        elif ch == "Z":
+            code.append("S")
+        else:
+            # F, J, L, M, N, R
+            code.append(ch)
+
+    return "".join(code)
+
+
+def person_name_keys(first_name: Optional[str], last_name: Optional[str]) -> Dict[str, str]:
+    """Search keys stored on every person record."""
+    return {
+        "first_name_key": normalize_name(first_name),
+        "last_name_key": normalize_name(last_name),
+        "first_name_phonetic": metaphone(first_name),
+        "last_name_phonetic": metaphone(last_name),
+    }
+
+
+def normalize_dl(dl: Optional[str]) -> str:
+    """Uppercase, letters and digits only ("d123-4567" -> "D1234567")."""
+    if not dl:
+        return ""
+    return "".join(ch for ch in dl.upper() if ch.isascii() and ch.isalnum())
+
+
+def person_identity_keys(drivers_license: Optional[str], first_name: Optional[str],
+                         last_name: Optional[str], dob: Optional[str]) -> List[str]:
+    """Keys that identify one real person: normalized DL, and normalized name + DOB.
+
+    Backed by a unique multikey index, so resolving an offender is a single
+    atomic upsert instead of find-then-insert.
+    """
+    keys = []
+    dl = normalize_dl(drivers_license)
+    if dl:
+        keys.append(f"dl:{dl}")
+    last, first = normalize_name(last_name), normalize_name(first_name)
+    if last and dob:
+        keys.append(f"name:{last}|{first}|{dob.strip()}")
+    return keys
+
+
+def _name_clause(field: str, value: str) -> Dict[str, Any]:
+    """Prefix-range OR phonetic match on one name part; both branches are indexed."""
+    key = normalize_name(value)
+    clauses = [{f"{field}_key": {"$gte": key, "$lt": key + PREFIX_RANGE_END}}]
+    phonetic = metaphone(value)
+    if phonetic:
+        clauses.append({f"{field}_phonetic": phonetic})
+    return {"$or": clauses}
+
+
+def build_person_query(first_name: Optional[str] = None, last_name: Optional[str] = None,
+                       dob: Optional[str] = None, dl: Optional[str] = None) -> Dict[str, Any]:
+    """Mongo filter for search_person using only index-friendly predicates."""
+    query: Dict[str, Any] = {}
+    name_clauses = [
+        _name_clause(field, value)
+        for field, value in (("last_name", last_name), ("first_name", first_name))
+        if normalize_name(value)
+    ]
+    if len(name_clauses) == 1:
+        query.update(name_clauses[0])
+    elif name_clauses:
+        query["$and"] = name_clauses
+    if dob:
+        query["dob"] = dob
+    if dl:
+        query["drivers_license"] = dl
+    return query
+
+
+def _name_levels(field: str, value: str) -> List[Tuple[int, Dict[str, Any]]]:
+    """Disjoint filters for exact, prefix-only and sounds-like-only matches on one name part."""
+    key = normalize_name(value)
+    prefix = {"$gte": key, "$lt": key + PREFIX_RANGE_END}
+    levels = [(SCORE_EXACT, {f"{field}_key": key}),
+              (SCORE_PREFIX, {f"{field}_key": {**prefix, "$ne": key}})]
+    phonetic = metaphone(value)
+    if phonetic:
+        levels.append((SCORE_PHONETIC, {f"{field}_phonetic": phonetic, "$nor": [{f"{field}_key": prefix}]}))
+    return levels
+
+
+def person_search_tiers(first_name: Optional[str] = None, last_name: Optional[str] = None,
+                        dob: Optional[str] = None, dl: Optional[str] = None) -> List[Tuple[int, Dict[str, Any]]]:
+    """(match_score, filter) for every score build_person_query can match, best first.
+
+    The filters are disjoint and together match what build_person_query does,
+    so search_person can count each one and page through them in score order
+    instead of ranking an arbitrary slice of the candidates.
+    """
+    tiers: List[Tuple[int, List[Dict[str, Any]]]] = [(0, [])]
+    for weight, field, value in ((2, "last_name", last_name), (1, "first_name", first_name)):
+        if normalize_name(value):
+            tiers = [(score + weight * level_score, clauses + [clause])
+                     for score, clauses in tiers for level_score, clause in _name_levels(field, value)]
+    extra = {}
+    if dob:
+        extra["dob"] = dob
+    if dl:
+        extra["drivers_license"] = dl
+
+    by_score: Dict[int, List[Dict[str, Any]]] = {}
+    for score, clauses in tiers:
+        clauses = clauses + ([extra] if extra else [])
+        query = {"$and": clauses} if len(clauses) > 1 else (clauses[0] if clauses else {})
+        by_score.setdefault(score, []).append(query)
+    return [(score, queries[0] if len(queries) == 1 else {"$or": queries})
+            for score, queries in sorted(by_score.items(), reverse=True)]
+
+
+async def search_person_page(persons, first_name: Optional[str] = None, last_name: Optional[str] = None,
+                             dob: Optional[str] = None, dl: Optional[str] = None,
+                             start: int = 0, end: int = 100) -> Tuple[List[Dict[str, Any]], int]:
+    """Rows start:end of the search in score order, and the total number of matches.
+
+    Counts every tier, then reads only the tiers that overlap the page, each
+    one sorted by PERSON_SEARCH_SORT from its index.
+    """
+    tiers = person_search_tiers(first_name, last_name, dob, dl)
+    counts = await asyncio.gather(*(persons.count_documents(query) for _, query in tiers))
+    results: List[Dict[str, Any]] = []
+    offset = 0
+    for (_, query), count in zip(tiers, counts):
+        if offset < end and offset + count > start:
+            skip = max(start - offset, 0)
+            cursor = persons.find(query, {"_id": 0}).sort(PERSON_SEARCH_SORT)
+            results.extend(await cursor.skip(skip).limit(min(end, offset + count) - offset - skip).to_list(None))
+        offset += count
+    return results, offset
+
+
+def _field_score(record: Dict[str, Any], field: str, value: Optional[str]) -> int:
+    key = normalize_name(value)
+    if not key:
+        return 0
+    stored = record.get(f"{field}_key") or normalize_name(record.get(field))
+    if stored == key:
+        return SCORE_EXACT
+    if stored.startswith(key):
+        return SCORE_PREFIX
+    stored_phonetic = record.get(f"{field}_phonetic") or metaphone(record.get(field))
+    if stored_phonetic and stored_phonetic == metaphone(value):
+        return SCORE_PHONETIC
+    return 0
+
+
+def rank_persons(records: List[Dict[str, Any]], first_name: Optional[str] = None,
+                 last_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Order records best match first (exact > prefix > sounds-like; last name weighs double)."""
+    def score(record):
+        return 2 * _field_score(record, "last_name", last_name) + _field_score(record, "first_name", first_name)
+
+    for record in records:
+        record["match_score"] = score(record)
+    return sorted(records, key=lambda r: (-r["match_score"], r.get("last_name_key") or normalize_name(r.get("last_name")),
+                                          r.get("first_name_key") or normalize_name(r.get("first_name")), r.get("id", "")))
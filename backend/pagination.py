@@ -0,0 +1,87 @@
+"""
+Keyset pagination over (created_at, id), newest first.
+
+Continuation tokens are opaque base64url-encoded JSON of the last row's sort
+key, so a page query is an index range seek rather than a growing skip().
+Large pages can be streamed straight from the Motor cursor as a JSON
+envelope instead of being materialized with to_list().
+"""
+import base64
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+SORT = [("created_at", -1), ("id", -1)]
+# Always projected: the cursor is built from them
+KEY_FIELDS = ("created_at", "id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: Dict[str, Any]) -> str:
+    raw = json.dumps([doc["created_at"], doc["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> List[str]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return [str(created_at), str(doc_id)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    return min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+
+
+def keyset_query(base_query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict base_query to rows strictly after the cursor in SORT order."""
+    if not cursor:
+        return base_query
+    created_at, doc_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [base_query, after]} if base_query else after
+
+
+def build_projection(fields: Optional[str], exclude: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Projection from a comma-separated field list (the sort keys are always included)."""
+    if not fields:
+        return {"_id": 0, **(exclude or {})}
+    wanted = {f.strip() for f in fields.split(",") if f.strip()} | set(KEY_FIELDS)
+    wanted -= set(exclude or {})
+    return {"_id": 0, **{f: 1 for f in sorted(wanted)}}
+
+
+async def fetch_page(collection, query: Dict[str, Any], projection: Dict[str, int],
+                     cursor: Optional[str], limit: int):
+    """Buffered page: (docs, next_cursor). next_cursor is None on the last page."""
+    docs = await collection.find(keyset_query(query, cursor), projection).sort(SORT).limit(limit + 1).to_list(limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
+
+
+async def stream_page(collection, query: Dict[str, Any], projection: Dict[str, int],
+                      cursor: Optional[str], limit: int) -> AsyncIterator[bytes]:
+    """Stream {"items": [...], "next_cursor": ...} one document at a time."""
+    yield b'{"items":['
+    last = None
+    count = 0
+    async for doc in collection.find(keyset_query(query, cursor), projection).sort(SORT).limit(limit):
+        if count:
+            yield b","
+        yield json.dumps(doc, default=str).encode()
+        last = doc
+        count += 1
+    # A full page may have more behind it; the next request simply returns empty if not
+    next_cursor = encode_cursor(last) if last and count == limit else None
+    yield b'],"next_cursor":' + json.dumps(next_cursor).encode() + b"}"
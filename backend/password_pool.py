@@ -0,0 +1,72 @@
+"""
+Bounded worker pool for bcrypt.
+
+A bcrypt hash or verify is tens to hundreds of milliseconds of CPU. Run on
+the event loop, a shift-change login burst stalls every webhook and media
+relay on the worker. Hashing runs on a small thread pool instead (bcrypt
+releases the GIL), and work beyond max_pending is refused with PoolBusy
+rather than queueing without limit, so the route can answer 503 quickly.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+
+class PoolBusy(RuntimeError):
+    pass
+
+
+class PasswordPool:
+    def __init__(self, pwd_context, max_workers: int = None, max_pending: int = None):
+        self.pwd_context = pwd_context
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or self.max_workers * 16
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolBusy(f"{self.pending} password operations already queued")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.pwd_context.verify, password, hashed)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash in parallel, a pool's width at a time, leaving queue room for logins."""
+        hashes = []
+        for start in range(0, len(passwords), self.max_workers):
+            batch = [asyncio.ensure_future(self.hash(p)) for p in passwords[start:start + self.max_workers]]
+            try:
+                hashes.extend(await asyncio.gather(*batch))
+            except BaseException:
+                # One was rejected (or we were cancelled): don't leave the rest queued on the pool
+                for task in batch:
+                    task.cancel()
+                await asyncio.gather(*batch, return_exceptions=True)
+                raise
+        return hashes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
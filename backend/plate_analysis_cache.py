@@ -0,0 +1,61 @@
+"""
+Result cache for analyze_plate.
+
+Officers re-run the same plate many times during a stop and across shifts.
+A result is reusable as long as the plate, state, officer context and the
+vehicle record it was based on are the same, so the cache key carries a
+hash of the vehicle document: any change to the record yields a new key and
+the stale analysis is simply never looked up again. Writers can also call
+invalidate_plate() to drop a plate's entries at once. Entries expire after
+a TTL and the cache is LRU-bounded (see auth_cache.TTLCache).
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional, Set
+
+from auth_cache import TTLCache
+from plate_search import normalize_plate
+
+NO_RECORD = "none"
+
+
+def vehicle_version(vehicle: Optional[Dict[str, Any]]) -> str:
+    if not vehicle:
+        return NO_RECORD
+    canonical = json.dumps(vehicle, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def context_hash(context: Optional[str]) -> str:
+    text = " ".join((context or "").lower().split())
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class PlateAnalysisCache:
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 10000):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._keys_by_plate: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def key(plate: str, state: str, context: str, vehicle: Optional[Dict[str, Any]]) -> str:
+        return "|".join([normalize_plate(plate), (state or "").strip().upper(), context_hash(context), vehicle_version(vehicle)])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, analysis: Dict[str, Any]):
+        self._cache.set(key, analysis)
+        self._keys_by_plate.setdefault(key.split("|", 1)[0], set()).add(key)
+        if len(self._keys_by_plate) > self._cache.max_entries:
+            # Forget plates whose entries have all expired or been evicted
+            self._keys_by_plate = {
+                plate: live for plate, keys in self._keys_by_plate.items()
+                if (live := {k for k in keys if k in self._cache})
+            }
+
+    def invalidate_plate(self, plate: str):
+        for key in self._keys_by_plate.pop(normalize_plate(plate), ()):
+            self._cache.invalidate(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "plates": len(self._keys_by_plate)}
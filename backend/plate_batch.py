@@ -0,0 +1,147 @@
+"""
+Batch plate checks for ALPR feeds.
+
+A plate reader produces hundreds of reads a minute, almost all of them for
+vehicles with nothing on record. Checking them one analyze_plate request at
+a time meant one find_one and one LLM call per read. A batch instead:
+
+  1. dedupes the reads by normalized plate and state,
+  2. loads every vehicle with one $in query on plate_normalized,
+  3. loads the registered owners that have warrants with one $in query on
+     the indexed name keys,
+  4. flags hits locally (vehicle flags, registration problems, owner
+     warrants), and
+  5. asks the model, in a single call, to narrate only the vehicles whose
+     hits call for more than a flag (see needs_narrative).
+
+A registered owner is matched to persons by first and last name, so a
+common name finds namesakes. Only a namesake whose address matches the
+vehicle's owner_address is an owner_warrant hit; namesakes at another (or
+no) address are reported together as a possible_owner_warrant, which is
+not narrated.
+
+The functions here are pure; the endpoint in server.py does the I/O.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from name_search import normalize_name
+from plate_search import normalize_plate
+
+MAX_BATCH_READS = 1000
+# Vehicles narrated by one batch call; the rest keep their local flags only
+MAX_NARRATED_PER_BATCH = 20
+
+# registration_status values (and flags) that are a hit but not worth a narrative
+REGISTRATION_PROBLEMS = {"EXPIRED", "SUSPENDED", "REVOKED", "CANCELLED", "UNREGISTERED"}
+
+HIT_FLAG = "flag"
+HIT_REGISTRATION = "registration"
+HIT_OWNER_WARRANT = "owner_warrant"
+HIT_POSSIBLE_OWNER_WARRANT = "possible_owner_warrant"
+# Hits the model isn't asked about
+NOT_NARRATED = {HIT_REGISTRATION, HIT_POSSIBLE_OWNER_WARRANT}
+
+OWNER_WARRANT_PROJECTION = {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "dob": 1, "address": 1,
+                            "first_name_key": 1, "last_name_key": 1, "warrants": 1}
+
+ADDRESS_ABBREVIATIONS = {
+    "street": "st", "avenue": "ave", "road": "rd", "boulevard": "blvd", "drive": "dr", "lane": "ln",
+    "court": "ct", "place": "pl", "highway": "hwy", "apartment": "apt", "suite": "ste",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+}
+
+
+def read_key(plate_number: Optional[str], state: Optional[str]) -> Tuple[str, str]:
+    return normalize_plate(plate_number), (state or "").strip().upper()
+
+
+def owner_name_key(registered_owner: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(first_name_key, last_name_key) for "First [Middle] Last" or "Last, First [Middle]"."""
+    if not registered_owner:
+        return None
+    if "," in registered_owner:
+        last, _, rest = registered_owner.partition(",")
+        first = rest.split()[0] if rest.split() else ""
+    else:
+        parts = registered_owner.split()
+        if len(parts) < 2:
+            return None
+        first, last = parts[0], parts[-1]
+    first_key, last_key = normalize_name(first), normalize_name(last)
+    return (first_key, last_key) if first_key and last_key else None
+
+
+def address_key(address: Optional[str]) -> str:
+    """Street line of an address, casefolded with common words abbreviated ("123 Main Street, Fresno" -> "123 main st")."""
+    street = (address or "").split(",")[0]
+    return " ".join(ADDRESS_ABBREVIATIONS.get(word, word) for word in re.findall(r"[a-z0-9]+", street.casefold()))
+
+
+def group_owners(persons: Iterable[Dict[str, Any]]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """Persons with warrants by (first_name_key, last_name_key); namesakes are all kept."""
+    owners: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for person in persons:
+        owners.setdefault((person["first_name_key"], person["last_name_key"]), []).append(person)
+    return owners
+
+
+def owner_warrant_query(vehicles: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Persons with warrants who might own one of vehicles (last_first_key index); None if no owners."""
+    keys = {key for key in map(owner_name_key, (v.get("registered_owner") for v in vehicles)) if key}
+    if not keys:
+        return None
+    return {
+        "last_name_key": {"$in": sorted({last for _, last in keys})},
+        "first_name_key": {"$in": sorted({first for first, _ in keys})},
+        "warrants.0": {"$exists": True},
+    }
+
+
+def pick_vehicle(candidates: List[Dict[str, Any]], state: str) -> Optional[Dict[str, Any]]:
+    """The record for the read's state, else the only record; same plate in two other states is no match."""
+    if state:
+        for vehicle in candidates:
+            if (vehicle.get("state") or "").upper() == state:
+                return vehicle
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def vehicle_hits(vehicle: Optional[Dict[str, Any]],
+                 owners: Dict[Tuple[str, str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Local hit flags for a vehicle; owners is group_owners() of the persons with warrants."""
+    if not vehicle:
+        return []
+    hits = []
+    status = (vehicle.get("registration_status") or "").strip().upper()
+    if status in REGISTRATION_PROBLEMS:
+        hits.append({"type": HIT_REGISTRATION, "detail": status})
+    for flag in vehicle.get("flags") or []:
+        flag = str(flag).strip().upper()
+        if flag in REGISTRATION_PROBLEMS:
+            if flag != status:
+                hits.append({"type": HIT_REGISTRATION, "detail": flag})
+        else:
+            hits.append({"type": HIT_FLAG, "detail": flag})
+    namesakes = owners.get(owner_name_key(vehicle.get("registered_owner"))) or []
+    address = address_key(vehicle.get("owner_address"))
+    confirmed = [person for person in namesakes if address and address_key(person.get("address")) == address]
+    for owner in confirmed:
+        hits.append({"type": HIT_OWNER_WARRANT, "detail": f"{len(owner['warrants'])} warrant(s)",
+                     "person_id": owner["id"], "warrants": owner["warrants"]})
+    if namesakes and not confirmed:
+        hits.append({"type": HIT_POSSIBLE_OWNER_WARRANT,
+                     "detail": f"name match only: {len(namesakes)} person(s) with warrants",
+                     "person_ids": [person["id"] for person in namesakes]})
+    return hits
+
+
+def needs_narrative(hits: List[Dict[str, Any]]) -> bool:
+    """Registration problems speak for themselves and a name-only owner match is too weak to assess;
+    flags and address-confirmed owner warrants get an LLM assessment."""
+    return any(hit["type"] not in NOT_NARRATED for hit in hits)
+
+
+def hit_signature(hits: List[Dict[str, Any]]) -> str:
+    """Stable description of the hits, part of the analysis cache key."""
+    return "alpr:" + ",".join(sorted(f"{hit['type']}={hit['detail']}" for hit in hits))
@@ -0,0 +1,169 @@
+"""
+Partial-plate search for vehicles.
+
+Plates are normalized on write (uppercase, no spaces or dashes) and indexed
+as a set of position-aware tokens over a "skeleton" where lookalike
+characters collapse together (O->0, I->1, B->8, ...), so a witness's
+"starts with 7K, ends in 3" becomes the pattern 7K*3 and 7K??3 and "7KO13"
+both resolve through a multikey index instead of a collection scan:
+
+    "0:7"  - character 7 at position 0 from the start
+    "-1:3" - character 3 at the last position
+    "b:K0" - bigram K0 somewhere in the plate
+
+The anchored regex on the skeleton that confirms a candidate runs in the
+same query, so everything the index returns is a real match; matches are
+ranked by how many characters matched exactly. A pattern needs at least two
+known characters, two of them side by side unless anchored to the start or
+end, so that it always narrows through the index.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# Characters witnesses and OCR confuse; each maps to one canonical character
+LOOKALIKES = str.maketrans({
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "B": "8",
+    "S": "5",
+    "Z": "2",
+})
+
+SINGLE_WILDCARD = "?"
+ANY_WILDCARD = "*"
+MIN_KNOWN_CHARACTERS = 2
+
+# What rank_vehicles reads; search_vehicle scores every match on these before loading the best
+PLATE_RANK_PROJECTION = {"_id": 0, "id": 1, "plate_number": 1, "plate_normalized": 1, "plate_skeleton": 1}
+
+# Ranking weights for search_vehicle
+SCORE_EXACT_PLATE = 1000
+SCORE_EXACT_CHAR = 10
+SCORE_LOOKALIKE_CHAR = 5
+
+
+def normalize_plate(plate: Optional[str]) -> str:
+    """Uppercase and keep only letters and digits ("7k-o 13" -> "7KO13")."""
+    if not plate:
+        return ""
+    return "".join(ch for ch in plate.upper() if ch.isascii() and ch.isalnum())
+
+
+def plate_skeleton(plate: Optional[str]) -> str:
+    """Normalized plate with lookalike characters collapsed ("7KO13" -> "7K013")."""
+    return normalize_plate(plate).translate(LOOKALIKES)
+
+
+def plate_tokens(plate: Optional[str]) -> List[str]:
+    """Position-from-start, position-from-end and bigram tokens for the multikey index."""
+    skeleton = plate_skeleton(plate)
+    tokens = set()
+    for i, ch in enumerate(skeleton):
+        tokens.add(f"{i}:{ch}")
+        tokens.add(f"{i - len(skeleton)}:{ch}")
+    for i in range(len(skeleton) - 1):
+        tokens.add(f"b:{skeleton[i:i + 2]}")
+    return sorted(tokens)
+
+
+def vehicle_plate_keys(plate: Optional[str]) -> Dict[str, Any]:
+    """Search keys stored on every vehicle record."""
+    skeleton = plate_skeleton(plate)
+    return {
+        "plate_normalized": normalize_plate(plate),
+        "plate_skeleton": skeleton,
+        "plate_length": len(skeleton),
+        "plate_tokens": plate_tokens(plate),
+    }
+
+
+def normalize_pattern(pattern: str) -> str:
+    """Uppercase, drop separators, keep ? and * wildcards; collapse repeated *."""
+    kept = "".join(ch for ch in pattern.upper() if (ch.isascii() and ch.isalnum()) or ch in "?*")
+    return re.sub(r"\*+", "*", kept)
+
+
+def is_pattern(plate: str) -> bool:
+    return SINGLE_WILDCARD in plate or ANY_WILDCARD in plate
+
+
+def _pattern_skeleton(pattern: str) -> str:
+    """Normalized pattern with lookalikes collapsed; no wildcards means "contains"."""
+    pattern = normalize_pattern(pattern)
+    if not is_pattern(pattern):
+        pattern = f"*{pattern}*"
+    return pattern.translate(LOOKALIKES)
+
+
+def _pattern_regex_body(skeleton: str, capture: bool = False) -> str:
+    """Anchored regex for a pattern skeleton; capture puts each known character in its own group."""
+    known = "({})" if capture else "{}"
+    body = "".join(
+        "." if ch == SINGLE_WILDCARD else ".*" if ch == ANY_WILDCARD else known.format(re.escape(ch))
+        for ch in skeleton
+    )
+    return f"^{body}$"
+
+
+def build_plate_query(pattern: str) -> Dict[str, Any]:
+    """Mongo filter matching a plate pattern through the token index.
+
+    A pattern without wildcards is treated as "contains", like the old regex
+    search. Raises ValueError for a pattern too broad to narrow by index.
+    """
+    skeleton = _pattern_skeleton(pattern)
+    segments = skeleton.split(ANY_WILDCARD)
+    tokens = set()
+    query: Dict[str, Any] = {}
+
+    if len(segments) == 1:
+        # Fixed length: every known character has an exact position
+        query["plate_length"] = len(skeleton)
+        tokens.update(f"{i}:{ch}" for i, ch in enumerate(skeleton) if ch != SINGLE_WILDCARD)
+    else:
+        head, middle, tail = segments[0], segments[1:-1], segments[-1]
+        tokens.update(f"{i}:{ch}" for i, ch in enumerate(head) if ch != SINGLE_WILDCARD)
+        tokens.update(f"{i - len(tail)}:{ch}" for i, ch in enumerate(tail) if ch != SINGLE_WILDCARD)
+        for segment in middle:
+            tokens.update(
+                f"b:{segment[i:i + 2]}" for i in range(len(segment) - 1)
+                if SINGLE_WILDCARD not in segment[i:i + 2]
+            )
+        min_length = len(skeleton) - skeleton.count(ANY_WILDCARD)
+        if min_length:
+            query["plate_length"] = {"$gte": min_length}
+
+    known = sum(1 for ch in skeleton if ch not in (SINGLE_WILDCARD, ANY_WILDCARD))
+    if known < MIN_KNOWN_CHARACTERS or not tokens:
+        raise ValueError(f"Plate pattern too broad: give at least {MIN_KNOWN_CHARACTERS} characters, "
+                         "side by side or at a known position")
+    query["plate_tokens"] = {"$all": sorted(tokens)}
+    query["plate_skeleton"] = {"$regex": _pattern_regex_body(skeleton)}
+    return query
+
+
+def _pattern_regex(pattern: str) -> "re.Pattern":
+    """Regex over a skeleton whose groups are where the pattern's known characters landed."""
+    return re.compile(_pattern_regex_body(_pattern_skeleton(pattern), capture=True))
+
+
+def rank_vehicles(records: List[Dict[str, Any]], pattern: str) -> List[Dict[str, Any]]:
+    """Drop false-positive candidates and order by closeness to what the witness said."""
+    regex = _pattern_regex(pattern)
+    wanted = normalize_pattern(pattern)
+    known = [ch for ch in wanted if ch not in (SINGLE_WILDCARD, ANY_WILDCARD)]
+    matches = []
+    for record in records:
+        skeleton = record.get("plate_skeleton") or plate_skeleton(record.get("plate_number"))
+        match = regex.match(skeleton)
+        if not match:
+            continue
+        plate = record.get("plate_normalized") or normalize_plate(record.get("plate_number"))
+        score = SCORE_EXACT_PLATE if plate == wanted else 0
+        # Reward characters the witness gave that are verbatim where they gave them, not a lookalike.
+        # The skeleton is the plate character for character, so group positions index the plate
+        score += sum(SCORE_EXACT_CHAR if plate[match.start(group)] == ch else SCORE_LOOKALIKE_CHAR
+                     for group, ch in enumerate(known, start=1))
+        record["match_score"] = score
+        matches.append(record)
+    return sorted(matches, key=lambda r: (-r["match_score"], r.get("plate_number", "")))
@@ -0,0 +1,159 @@
+"""
+Token-budgeted prompts for the data-heavy AI endpoints.
+
+match_suspect and predict_crime used to paste whole documents into the
+prompt with json.dumps(..., indent=2): indentation, ids, timestamps, empty
+lists and internal fields all cost input tokens (and time to first token)
+and a large candidate list could overflow the context. Data is now
+serialized compactly - only the fields the model needs, no whitespace, no
+empty values - and fitted to a token budget counted with tiktoken. When a
+prompt is over budget the least valuable fields go first, then the lowest
+ranked records, so what the model loses is what it needed least.
+
+Token counts use the model's tiktoken encoding. tiktoken downloads the BPE
+file on first use, so encodings are loaded once at startup in a worker
+thread (load_encodings) and never on the event loop; on hosts without
+internet access pre-populate TIKTOKEN_CACHE_DIR. Until an encoding is
+loaded, or if it cannot be, the count falls back to an estimate of
+CHARS_PER_TOKEN characters per token.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+
+
+ENCODING_LOAD_TIMEOUT_SECONDS = 30
+
+# model -> tiktoken encoding, filled by load_encodings
+_encodings: Dict[str, Any] = {}
+
+
+def _load_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+async def load_encodings(models: Iterable[str], timeout: float = ENCODING_LOAD_TIMEOUT_SECONDS):
+    """Load the encodings for models off the event loop; a model that fails keeps the estimate."""
+    for model in models:
+        try:
+            _encodings[model] = await asyncio.wait_for(asyncio.to_thread(_load_encoding, model), timeout)
+        except Exception as e:
+            logger.warning(f"tiktoken encoding for {model} unavailable ({e!r}); estimating prompt tokens")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    encoding = _encodings.get(model)
+    if encoding is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def compact(value: Any) -> Any:
+    """value with None, empty strings, empty lists and empty dicts removed at every level."""
+    if isinstance(value, dict):
+        items = ((key, compact(item)) for key, item in value.items())
+        return {key: item for key, item in items if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [item for item in map(compact, value) if item not in (None, "", [], {})]
+    return value
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(compact(value), separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _drop_path(value: Any, path: Sequence[str]):
+    """Delete a dotted path in place; a list along the way applies the rest of the path to each item."""
+    if isinstance(value, list):
+        for item in value:
+            _drop_path(item, path)
+    elif isinstance(value, dict) and path and path[0] in value:
+        if len(path) == 1:
+            del value[path[0]]
+        else:
+            _drop_path(value[path[0]], path[1:])
+
+
+def _render(template: str, placeholder: str, data: str) -> str:
+    return template.replace(placeholder, data)
+
+
+def fit_records(template: str, placeholder: str, records: List[Dict[str, Any]], fields: Sequence[str],
+                budget: int, model: str = "gpt-4o", keep_fields: int = 1) -> Tuple[str, Dict[str, Any]]:
+    """Fill placeholder in template with as much of records as fits in budget tokens.
+
+    records are best first and fields most valuable first. While the prompt is
+    over budget the last remaining field is dropped from every record, down to
+    keep_fields; after that the last record is dropped. Returns the prompt and
+    its stats (see _stats).
+    """
+    started = time.perf_counter()
+    projected = [compact({field: record.get(field) for field in fields}) for record in records]
+    active = list(fields)
+    dropped: List[str] = []
+    kept = len(projected)
+    while True:
+        prompt = _render(template, placeholder, compact_json(projected[:kept]))
+        tokens = count_tokens(prompt, model)
+        if tokens <= budget or kept == 0:
+            break
+        if len(active) > keep_fields:
+            field = active.pop()
+            dropped.append(field)
+            for record in projected:
+                record.pop(field, None)
+        else:
+            kept -= 1
+    stats = _stats(tokens, budget, started, dropped)
+    stats.update({"records_in": len(records), "records_kept": kept})
+    return prompt, stats
+
+
+def fit_document(template: str, placeholder: str, document: Dict[str, Any], fields: Sequence[str],
+                 drop_order: Sequence[str], budget: int, model: str = "gpt-4o") -> Tuple[str, Dict[str, Any]]:
+    """Fill placeholder in template with document's fields, dropping drop_order paths until it fits.
+
+    drop_order lists dotted paths, least valuable first (see _drop_path). If the
+    prompt is still over budget with all of them gone it is returned as is and
+    the stats say so.
+    """
+    started = time.perf_counter()
+    projected = compact({field: document.get(field) for field in fields})
+    dropped: List[str] = []
+    pending = list(drop_order)
+    while True:
+        prompt = _render(template, placeholder, compact_json(projected))
+        tokens = count_tokens(prompt, model)
+        if tokens <= budget or not pending:
+            break
+        path = pending.pop(0)
+        _drop_path(projected, path.split("."))
+        dropped.append(path)
+    stats = _stats(tokens, budget, started, dropped)
+    if tokens > budget:
+        logger.warning(f"Prompt is {tokens} tokens, over its {budget} token budget")
+    return prompt, stats
+
+
+def _stats(tokens: int, budget: int, started: float, dropped: List[str]) -> Dict[str, Any]:
+    return {
+        "tokens": tokens,
+        "budget": budget,
+        "within_budget": tokens <= budget,
+        "dropped_fields": dropped,
+        "build_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
@@ -10,6 +10,7 @@ import websockets
 from fastapi import WebSocket
 from datetime import datetime, timezone
 import logging
+from call_board import next_update_seq
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +20,11 @@ OPENAI_REALTIME_URL = "wss://api.openai.com/v1/realtime?model=gpt-realtime"
 class RealtimeDispatcher:
     """Handles real-time voice conversation between caller and OpenAI"""
     
-    def __init__(self, call_sid: str, db, stream_sid: str):
+    def __init__(self, call_sid: str, db, stream_sid: str, events=None, transcripts=None):
         self.call_sid = call_sid
         self.db = db
+        self.events = events  # CallEventBus feeding /ws/calls
+        self.transcripts = transcripts  # TranscriptHub feeding /ws/calls/{id}/transcript
         self.openai_ws = None
         self.stream_sid = stream_sid  # Set immediately from constructor
         self.conversation_history = []
@@ -30,6 +33,18 @@ class RealtimeDispatcher:
         self.has_incident_type = False
         self.should_dispatch = False
         
+    async def update_call(self, fields: dict):
+        """$set fields on this call and publish the change to dispatcher consoles"""
+        fields = {**fields, "update_seq": await next_update_seq(self.db)}
+        await self.db.active_calls.update_one({"call_sid": self.call_sid}, {"$set": fields})
+        if self.events:
+            self.events.publish("call.updated", fields, call_sid=self.call_sid)
+        
+    def stream_transcript(self, speaker: str, kind: str, text: str, item_id: str = None):
+        """Push a live transcript fragment to consoles watching this call (not stored)"""
+        if self.transcripts and text:
+            self.transcripts.publish(self.call_sid, speaker, kind, text, item_id)
+        
     async def connect_to_openai(self):
         """Connect to OpenAI Realtime API"""
         try:
@@ -191,6 +206,7 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
                     transcript_delta = data.get('delta', '')
                     if transcript_delta:
                         logger.info(f"Call {self.call_sid} - AI speaking: {transcript_delta}")
+                        self.stream_transcript("dispatcher", "delta", transcript_delta, data.get('item_id'))
                 
                 elif event_type == 'response.audio.delta':
                     # Stream audio back to Twilio
@@ -216,6 +232,11 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
                     if transcript:
                         self.conversation_history.append(f"Dispatcher: {transcript}")
                         logger.info(f"Call {self.call_sid} - AI said: {transcript}")
+                        self.stream_transcript("dispatcher", "final", transcript, data.get('item_id'))
+                
+                elif event_type == 'conversation.item.input_audio_transcription.delta':
+                    # Partial caller transcript (whole-utterance with whisper-1)
+                    self.stream_transcript("caller", "delta", data.get('delta', ''), data.get('item_id'))
                         
                 elif event_type == 'conversation.item.input_audio_transcription.completed':
                     # Log what caller said
@@ -223,18 +244,16 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
                     if transcript:
                         self.conversation_history.append(f"Caller: {transcript}")
                         logger.info(f"Call {self.call_sid} - Caller said: {transcript}")
+                        self.stream_transcript("caller", "final", transcript, data.get('item_id'))
                         
                         # Extract incident info
                         await self.extract_incident_info(transcript)
                         
                         # Update database
-                        await self.db.active_calls.update_one(
-                            {"call_sid": self.call_sid},
-                            {"$set": {
-                                "transcription": "\n".join(self.conversation_history),
-                                "updated_at": datetime.now(timezone.utc).isoformat()
-                            }}
-                        )
+                        await self.update_call({
+                            "transcription": "\n".join(self.conversation_history),
+                            "updated_at": datetime.now(timezone.utc).isoformat()
+                        })
                     
                 elif event_type == 'response.done':
                     # Check if we should dispatch
@@ -269,10 +288,7 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
             logger.info(f"Call {self.call_sid} - Location detected")
             
             # Update database with location hint
-            await self.db.active_calls.update_one(
-                {"call_sid": self.call_sid},
-                {"$set": {"location": transcript}}
-            )
+            await self.update_call({"location": transcript})
         
         # Detect incident type keywords
         incident_keywords = {
@@ -295,10 +311,7 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
                 logger.info(f"Call {self.call_sid} - Incident type detected: {incident_type}")
                 
                 # Update database with incident type
-                await self.db.active_calls.update_one(
-                    {"call_sid": self.call_sid},
-                    {"$set": {"incident_type": incident_type}}
-                )
+                await self.update_call({"incident_type": incident_type})
                 break
     
     async def check_dispatch_conditions(self) -> bool:
@@ -326,13 +339,10 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
             location = call.get('location', 'Unknown location')
             
             # Update call status to Active
-            await self.db.active_calls.update_one(
-                {"call_sid": self.call_sid},
-                {"$set": {
-                    "status": "Active",
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }}
-            )
+            await self.update_call({
+                "status": "Active",
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            })
             
             logger.info(f"Call {self.call_sid} - Dispatch completed: {incident_type} at {location}")
             
@@ -352,6 +362,8 @@ Keep responses conversational (15-30 words). Show emotion and empathy.""",
             import traceback
             traceback.print_exc()
         finally:
+            if self.transcripts:
+                self.transcripts.end(self.call_sid)
             if self.openai_ws:
                 try:
                     await self.openai_ws.close()
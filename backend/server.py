@@ -1,13 +1,15 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Form, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Form, File, UploadFile, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
@@ -17,10 +19,35 @@ from openai import AsyncOpenAI
 from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse, Gather, Say, Record, Play, Connect, Stream
 import json
-from fine_codes import get_fine_amount
+from fine_codes import catalog as violation_catalog, UnknownViolationCode
 from elevenlabs_helper import generate_voice_audio_sync
 import hashlib
 from realtime_dispatcher import RealtimeDispatcher
+from auth_cache import TTLCache
+from password_pool import PasswordPool, PoolBusy
+from webhook_idempotency import WebhookIdempotencyCache, webhook_fingerprint
+from db_migrations import bootstrap_database
+from name_search import person_name_keys, person_identity_keys, rank_persons, search_person_page
+from plate_search import vehicle_plate_keys, build_plate_query, rank_vehicles, normalize_plate, PLATE_RANK_PROJECTION
+from plate_analysis_cache import PlateAnalysisCache
+from call_board import (active_calls_pipeline, changed_since_pipeline, transcript_pipeline,
+                        next_update_seq, current_update_seq, ACTIVE_CALLS_LIMIT)
+from call_events import CallEventBus, TranscriptHub, SOURCE_LOCAL, SOURCE_CHANGE_STREAM, watch_active_calls
+from suspect_matcher import SuspectMatcher, parse_description, DEFAULT_TOP_K
+from crime_analytics import CrimeAnalytics, DEFAULT_WINDOW_DAYS
+from prompt_budget import compact_json, fit_document, fit_records, load_encodings
+from plate_batch import (read_key, owner_warrant_query, group_owners, pick_vehicle, vehicle_hits, needs_narrative,
+                         hit_signature, MAX_BATCH_READS, MAX_NARRATED_PER_BATCH, OWNER_WARRANT_PROJECTION, HIT_OWNER_WARRANT)
+from hot_list import HotList
+from citation_batch import group_by_identity, group_keys, person_upserts, MAX_BULK_CITATIONS
+from record_import import (ImportKind, detect_format, new_job, person_operation, run_import, vehicle_operation,
+                           FORMATS, JOBS_COLLECTION, STATUS_COMPLETED)
+import synthetic_data
+from llm_gateway import LLMGateway, DEFAULT_LIMITS, PRIORITY_LIVE, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from pagination import InvalidCursor, build_projection, clamp_page_size, decode_cursor, fetch_page, stream_page
+import asyncio
+import shutil
+import time
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -36,6 +63,12 @@ db = client[os.environ['DB_NAME']]
 
 # Security
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt off the event loop, with a bounded queue
+password_pool = PasswordPool(
+    pwd_context,
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '0')) or None,
+    max_pending=int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '0')) or None
+)
 security = HTTPBearer()
 SECRET_KEY = os.environ.get('JWT_SECRET', 'rms-secret-key-change-in-production')
 ALGORITHM = "HS256"
@@ -49,9 +82,56 @@ TWILIO_PHONE_NUMBER = os.environ.get('TWILIO_PHONE_NUMBER')
 ELEVENLABS_API_KEY = os.environ.get('ELEVENLABS_API_KEY')
 
 # Initialize clients
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Retries are done by the gateway, deadline-aware, so the client's own are off.
+# OPENAI_BASE_URL points it elsewhere, e.g. at fake_openai.py for load tests
+openai_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY, base_url=os.environ.get('OPENAI_BASE_URL') or None, max_retries=0
+) if OPENAI_API_KEY else None
+llm = LLMGateway(
+    openai_client,
+    limits={
+        PRIORITY_LIVE: int(os.environ.get('LLM_LIVE_CONCURRENCY', DEFAULT_LIMITS[PRIORITY_LIVE])),
+        PRIORITY_INTERACTIVE: int(os.environ.get('LLM_INTERACTIVE_CONCURRENCY', DEFAULT_LIMITS[PRIORITY_INTERACTIVE])),
+        PRIORITY_BACKGROUND: int(os.environ.get('LLM_BACKGROUND_CONCURRENCY', DEFAULT_LIMITS[PRIORITY_BACKGROUND])),
+    }
+)
 twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN) if TWILIO_ACCOUNT_SID else None
 
+# Vectorized pre-filter in front of the match_suspect LLM call
+suspect_matcher = SuspectMatcher(refresh_seconds=float(os.environ.get('SUSPECT_INDEX_REFRESH_SECONDS', '600')))
+# analyze_plate results, keyed by plate / state / context / vehicle record version
+plate_analysis_cache = PlateAnalysisCache(
+    ttl_seconds=float(os.environ.get('PLATE_ANALYSIS_CACHE_TTL', '3600')),
+    max_entries=int(os.environ.get('PLATE_ANALYSIS_CACHE_SIZE', '10000'))
+)
+# Wanted vehicles and warrants, answered from memory (see hot_list)
+hot_list = HotList(
+    capacity=int(os.environ.get('HOT_LIST_CAPACITY', '1000000')),
+    snapshot_path=os.environ.get('HOT_LIST_SNAPSHOT', str(ROOT_DIR / 'hot_list.npz')),
+    refresh_seconds=float(os.environ.get('HOT_LIST_REFRESH_SECONDS', '300'))
+)
+VIOLATION_CATALOG_POLL_SECONDS = float(os.environ.get('VIOLATION_CATALOG_POLL_SECONDS', '30'))
+# Materialized statistics behind predict_crime
+crime_analytics = CrimeAnalytics(max_age_seconds=float(os.environ.get('CRIME_SUMMARY_MAX_AGE', '60')))
+# Input token budgets for the data-heavy prompts (see prompt_budget)
+MATCH_SUSPECT_PROMPT_BUDGET = int(os.environ.get('MATCH_SUSPECT_PROMPT_BUDGET', '6000'))
+PREDICT_CRIME_PROMPT_BUDGET = int(os.environ.get('PREDICT_CRIME_PROMPT_BUDGET', '3000'))
+ALPR_PROMPT_BUDGET = int(os.environ.get('ALPR_PROMPT_BUDGET', '6000'))
+# Models those prompts are fitted for; their tiktoken encodings are loaded at startup
+PROMPT_BUDGET_MODELS = ("gpt-4o", "gpt-4o-mini")
+# Decoded JWTs (until expiry) and active users (briefly) for get_current_user
+token_cache = TTLCache(ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+user_cache = TTLCache(ttl_seconds=float(os.environ.get('AUTH_USER_CACHE_TTL', '30')))
+# Replays TwiML for webhooks Twilio retries after a timeout
+webhook_cache = WebhookIdempotencyCache(ttl_seconds=int(os.environ.get('WEBHOOK_IDEMPOTENCY_TTL', '300')))
+
+# Pushes active call changes to /ws/calls consoles
+call_events = CallEventBus(source=os.environ.get('CALL_EVENTS_SOURCE', SOURCE_LOCAL))
+# Live partial transcripts from RealtimeDispatcher, per call
+transcript_hub = TranscriptHub()
+# Distinguishes board ETags across processes (each bus counts its events from 0)
+BOARD_EPOCH = uuid.uuid4().hex[:8]
+
 # Create the main app
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
@@ -112,9 +192,24 @@ class PersonRecord(BaseModel):
     priors: List[Dict] = []
     citations: List[str] = []  # Citation IDs
     notes: Optional[str] = None
+    # Search keys - derived from the name, see name_search.py
+    first_name_key: Optional[str] = None
+    last_name_key: Optional[str] = None
+    first_name_phonetic: Optional[str] = None
+    last_name_phonetic: Optional[str] = None
+    # Normalized DL / name+DOB, unique across persons. Kept out of model_dump so
+    # the sparse unique index never sees an empty array - see person_document()
+    identity_keys: List[str] = Field(default=[], exclude=True)
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
+    @model_validator(mode="after")
+    def compute_search_keys(self):
+        for field, value in person_name_keys(self.first_name, self.last_name).items():
+            setattr(self, field, value)
+        self.identity_keys = person_identity_keys(self.drivers_license, self.first_name, self.last_name, self.dob)
+        return self
+
 class VehicleRecord(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -131,8 +226,27 @@ class VehicleRecord(BaseModel):
     registration_status: Optional[str] = None
     flags: List[str] = []
     notes: Optional[str] = None
+    # Search keys - derived from the plate, see plate_search.py
+    plate_normalized: Optional[str] = None
+    plate_skeleton: Optional[str] = None
+    plate_length: Optional[int] = None
+    plate_tokens: List[str] = []
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
+    @model_validator(mode="after")
+    def compute_search_keys(self):
+        for field, value in vehicle_plate_keys(self.plate_number).items():
+            setattr(self, field, value)
+        return self
+
+class PlateRead(BaseModel):
+    """One plate reader hit, as sent to /ai/analyze-plates."""
+    plate_number: str
+    state: Optional[str] = None
+    read_id: Optional[str] = None
+    camera_id: Optional[str] = None
+    read_at: Optional[str] = None
+
 class ActiveCall(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -147,6 +261,7 @@ class ActiveCall(BaseModel):
     transcription: Optional[str] = None
     recording_url: Optional[str] = None  # Twilio recording URL
     recording_duration: Optional[int] = None  # Duration in seconds
+    update_seq: int = 0  # Board sequence of the last write (see call_board)
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -166,6 +281,8 @@ class Citation(BaseModel):
     location: str
     date_time: str
     fine_amount: float = 0.00  # Auto-generated
+    fine_catalog_version: Optional[str] = None  # Violation catalog that priced it
+    client_id: Optional[str] = None  # Device-assigned; a resent citation is recognized by it
     court_date: Optional[str] = None
     officer_badge: str
     officer_name: str
@@ -192,11 +309,17 @@ class IncidentReport(BaseModel):
     updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 # Helper functions
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    try:
+        return await password_pool.verify(plain_password, hashed_password)
+    except PoolBusy:
+        raise HTTPException(status_code=503, detail="Authentication busy, retry shortly", headers={"Retry-After": "1"})
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    try:
+        return await password_pool.hash(password)
+    except PoolBusy:
+        raise HTTPException(status_code=503, detail="Password hashing busy, retry shortly", headers={"Retry-After": "1"})
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -206,18 +329,39 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
+    return await user_from_token(credentials.credentials)
+
+async def user_from_token(token: str) -> User:
+    """Resolve a bearer token to an active user (shared by HTTP and WebSocket auth)."""
+    user_id = token_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Invalid authentication")
+        user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid authentication")
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
-        if user is None or not user.get('active', False):
+        # Cached no longer than the token itself is valid
+        remaining = payload["exp"] - datetime.now(timezone.utc).timestamp() if "exp" in payload else None
+        token_cache.set(token, user_id, time.monotonic() + remaining if remaining is not None else None)
+    
+    user = user_cache.get(user_id)
+    if user is None:
+        doc = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
+        if doc is None or not doc.get('active', False):
             raise HTTPException(status_code=401, detail="User not found or inactive")
-        return User(**{k: v for k, v in user.items() if k != 'password_hash'})
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid authentication")
+        user = User(**doc)
+        user_cache.set(user_id, user)
+    return user
+
+async def update_call(match: dict, fields: dict, event_type: str = "call.updated"):
+    """$set fields on an active call and push the change to /ws/calls consoles."""
+    fields = {**fields, "update_seq": await next_update_seq(db)}
+    result = await db.active_calls.update_one(match, {"$set": fields})
+    if result.matched_count:
+        call_events.publish(event_type, fields, call_id=match.get("id"), call_sid=match.get("call_sid"))
+    return result
 
 async def start_recording_async(call_sid: str, host: str):
     """Start recording after a short delay to ensure call is connected"""
@@ -235,50 +379,124 @@ async def start_recording_async(call_sid: str, host: str):
     except Exception as e:
         logger.error(f"Failed to start recording for call {call_sid}: {e}")
 
-async def find_or_create_person(citation_data: dict) -> str:
-    """Find existing person or create new one from citation data."""
-    # Try to find by driver's license first
-    person = None
-    if citation_data.get('offender_dl'):
-        person = await db.persons.find_one({"drivers_license": citation_data['offender_dl']}, {"_id": 0})
-    
-    # Try to find by name and DOB
-    if not person and citation_data.get('offender_name') and citation_data.get('offender_dob'):
-        names = citation_data['offender_name'].split(',')
-        last_name = names[0].strip() if names else ""
-        first_name = names[1].strip() if len(names) > 1 else ""
-        
-        person = await db.persons.find_one({
-            "last_name": {"$regex": f"^{last_name}$", "$options": "i"},
-            "first_name": {"$regex": f"^{first_name}$", "$options": "i"},
-            "dob": citation_data['offender_dob']
-        }, {"_id": 0})
-    
-    if person:
-        return person['id']
-    
-    # Create new person record
-    names = citation_data['offender_name'].split(',')
-    last_name = names[0].strip() if names else citation_data['offender_name']
+def person_document(person: PersonRecord) -> dict:
+    """Mongo document for a person, including identity keys when there are any."""
+    doc = person.model_dump()
+    if person.identity_keys:
+        doc['identity_keys'] = person.identity_keys
+    return doc
+
+def split_offender_name(offender_name: str):
+    """Citations record names as "Last, First"."""
+    names = offender_name.split(',')
+    last_name = names[0].strip() if names else offender_name
     first_name = names[1].strip() if len(names) > 1 else ""
+    return first_name, last_name
+
+# An upsert that hits a duplicate key links to the holder; retried if the holder vanished meanwhile
+IDENTITY_UPSERT_ATTEMPTS = 3
+
+async def find_or_create_person(citation_data: dict) -> str:
+    """Find existing person or create new one from citation data.
     
+    One atomic upsert on the unique identity_keys index (normalized DL and/or
+    name + DOB), so concurrent citations can't create duplicate persons. The
+    caller links the citation once it is stored.
+    """
+    first_name, last_name = split_offender_name(citation_data['offender_name'])
     new_person = PersonRecord(
         first_name=first_name,
         last_name=last_name,
-        dob=citation_data.get('offender_dob', ''),
+        dob=citation_data.get('offender_dob') or '',
         drivers_license=citation_data.get('offender_dl'),
-        address=citation_data.get('offender_address'),
-        citations=[]
+        address=citation_data.get('offender_address')
     )
     
-    await db.persons.insert_one(new_person.model_dump())
-    return new_person.id
+    # Nothing to identify them by - always a new record
+    if not new_person.identity_keys:
+        await db.persons.insert_one(new_person.model_dump())
+        suspect_matcher.upsert(new_person.model_dump())
+        return new_person.id
+    
+    # $elemMatch rather than a bare $in: a single-value $in would be copied into
+    # the inserted document as a scalar and clash with $addToSet
+    identity_filter = {"identity_keys": {"$elemMatch": {"$in": new_person.identity_keys}}}
+    update = {
+        "$setOnInsert": new_person.model_dump(),
+        # Also records a DL learned later for a person first seen by name + DOB
+        "$addToSet": {"identity_keys": {"$each": new_person.identity_keys}}
+    }
+    
+    person = None
+    for _ in range(IDENTITY_UPSERT_ATTEMPTS):
+        try:
+            person = await db.persons.find_one_and_update(
+                identity_filter,
+                update,
+                projection={"_id": 0, "id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race to a concurrent citation, or the keys are already split
+            # across two persons (DL on one, name + DOB on another)
+            person = await link_by_identity_key(new_person.identity_keys)
+        if person:
+            break
+    else:
+        raise RuntimeError(f"Could not resolve offender by {new_person.identity_keys}")
+    if person['id'] == new_person.id:
+        suspect_matcher.upsert(new_person.model_dump())
+    return person['id']
+
+async def link_by_identity_key(keys: List[str]) -> Optional[dict]:
+    """Person holding the preferred identity key (DL first).
+
+    The other keys are recorded only if no other person holds them; None if
+    nobody holds any of the keys any more.
+    """
+    for key in keys:
+        try:
+            person = await db.persons.find_one_and_update(
+                {"identity_keys": key}, {"$addToSet": {"identity_keys": {"$each": keys}}},
+                projection={"_id": 0, "id": 1}, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            person = await db.persons.find_one({"identity_keys": key}, {"_id": 0, "id": 1})
+        if person:
+            return person
+    return None
+
+async def keyset_page(response: Response, collection, query: dict, cursor: Optional[str],
+                      limit: Optional[int], fields: Optional[str], stream: bool, exclude: Optional[dict] = None):
+    """Newest-first page of a collection, continued with an opaque cursor.
+    
+    Buffered pages are a JSON array with the continuation token in X-Next-Cursor.
+    With stream=true the page is streamed from the Motor cursor as
+    {"items": [...], "next_cursor": ...} instead of being held in memory.
+    """
+    limit = clamp_page_size(limit)
+    projection = build_projection(fields, exclude)
+    try:
+        # Decode up front so a bad cursor is a 400 rather than a broken stream
+        if cursor:
+            decode_cursor(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if stream:
+        return StreamingResponse(stream_page(collection, query, projection, cursor, limit), media_type="application/json")
+    
+    docs, next_cursor = await fetch_page(collection, query, projection, cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return docs
 
 # Auth routes
 @api_router.post("/auth/login", response_model=Token)
 async def login(credentials: UserLogin):
     user = await db.users.find_one({"username": credentials.username}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    if not user or not await verify_password(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user.get('active', False):
@@ -303,7 +521,7 @@ async def create_user(user_data: UserCreate, current_user: User = Depends(get_cu
     if existing_badge:
         raise HTTPException(status_code=400, detail="Badge number already exists")
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     user = User(
         badge_number=user_data.badge_number,
         username=user_data.username,
@@ -319,6 +537,64 @@ async def create_user(user_data: UserCreate, current_user: User = Depends(get_cu
     
     return user
 
+MAX_BULK_USERS = 1000
+
+@api_router.post("/admin/users/bulk")
+async def create_users_bulk(users_data: List[UserCreate], current_user: User = Depends(get_current_user)):
+    """Provision many accounts at once, hashing passwords in parallel on the password pool.
+    
+    Returns per-item results in request order: {"index", "status": "created" | "error",
+    "user" | "detail"}. Rows clashing on username or badge number (with each other or
+    existing users) are reported and skipped; the rest are created.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if len(users_data) > MAX_BULK_USERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_USERS} users per request")
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(users_data)
+    existing = await db.users.find(
+        {"$or": [{"username": {"$in": [u.username for u in users_data]}},
+                 {"badge_number": {"$in": [u.badge_number for u in users_data]}}]},
+        {"_id": 0, "username": 1, "badge_number": 1}
+    ).to_list(None)
+    usernames = {u["username"] for u in existing}
+    badges = {u["badge_number"] for u in existing}
+    
+    accepted = []
+    for index, user_data in enumerate(users_data):
+        if user_data.username in usernames:
+            results[index] = {"index": index, "status": "error", "detail": "Username already exists"}
+        elif user_data.badge_number in badges:
+            results[index] = {"index": index, "status": "error", "detail": "Badge number already exists"}
+        else:
+            usernames.add(user_data.username)
+            badges.add(user_data.badge_number)
+            accepted.append(index)
+    
+    try:
+        hashes = await password_pool.hash_many([users_data[i].password for i in accepted])
+    except PoolBusy:
+        raise HTTPException(status_code=503, detail="Password hashing busy, retry shortly", headers={"Retry-After": "1"})
+    
+    docs = []
+    for index, hashed_password in zip(accepted, hashes):
+        user = User(**users_data[index].model_dump(exclude={"password"}))
+        docs.append({**user.model_dump(), "password_hash": hashed_password})
+        results[index] = {"index": index, "status": "created", "user": user.model_dump()}
+    
+    if docs:
+        try:
+            await db.users.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Lost a race with another create on a unique key
+            for error in e.details.get("writeErrors", []):
+                index = accepted[error["index"]]
+                results[index] = {"index": index, "status": "error", "detail": "Username or badge number already exists"}
+    
+    created = sum(1 for r in results if r["status"] == "created")
+    return {"created": created, "failed": len(results) - created, "results": results}
+
 @api_router.get("/admin/users", response_model=List[User])
 async def get_users(current_user: User = Depends(get_current_user)):
     if current_user.role != 'admin':
@@ -333,24 +609,58 @@ async def update_user(user_id: str, active: bool, current_user: User = Depends(g
         raise HTTPException(status_code=403, detail="Admin access required")
     
     await db.users.update_one({"id": user_id}, {"$set": {"active": active}})
+    user_cache.invalidate(user_id)
     return {"message": "User updated"}
 
+@api_router.get("/admin/auth-cache/stats")
+async def get_auth_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit rates of the auth caches; user misses_per_second is the remaining Mongo auth query rate."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return {"tokens": token_cache.stats(), "users": user_cache.stats(), "password_pool": password_pool.stats()}
+
+@api_router.get("/admin/llm/stats")
+async def get_llm_stats(current_user: User = Depends(get_current_user)):
+    """Per-class concurrency and per-endpoint token / latency / retry counts from the LLM gateway."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return llm.stats()
+
+@api_router.get("/admin/plate-analysis-cache/stats")
+async def get_plate_analysis_cache_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return plate_analysis_cache.stats()
+
+@api_router.get("/admin/hot-list/stats")
+async def get_hot_list_stats(current_user: User = Depends(get_current_user)):
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    return hot_list.stats()
+
 # Twilio Webhook Endpoints (under /api prefix for Kubernetes routing)
 @api_router.post("/webhooks/voice")
 async def handle_incoming_call(
     request: Request,
     From: str = Form(...),
     CallSid: str = Form(...),
-    To: str = Form(...)
+    To: str = Form(...),
+    turn: int = 0
 ):
     """OpenAI Realtime API with fallback to ElevenLabs"""
     # Create active call record
     active_call = ActiveCall(
         call_sid=CallSid,
         caller_phone=From,
-        status="Processing"
+        status="Processing",
+        update_seq=await next_update_seq(db)
     )
     await db.active_calls.insert_one(active_call.model_dump())
+    call_events.publish("call.created", active_call.model_dump(), call_id=active_call.id, call_sid=CallSid)
     
     response = VoiceResponse()
     
@@ -393,7 +703,7 @@ async def handle_incoming_call(
         input='speech',
         timeout=4,
         speech_timeout=2,
-        action='/api/webhooks/process-speech',
+        action=f'/api/webhooks/process-speech?turn={turn}',
         method='POST',
         language='en-US',
         hints='police, fire, medical, emergency, accident, robbery, assault, shooting, heart attack, unconscious, help, bleeding',
@@ -419,7 +729,7 @@ async def handle_incoming_call(
     else:
         response.say(fallback, voice='Polly.Joanna')
     
-    response.redirect('/api/webhooks/voice', method='POST')
+    response.redirect(f'/api/webhooks/voice?turn={turn + 1}', method='POST')
     
     return Response(content=str(response), media_type="application/xml")
 
@@ -427,9 +737,15 @@ async def handle_incoming_call(
 async def process_speech(
     CallSid: str = Form(...),
     SpeechResult: str = Form(None),
-    Confidence: float = Form(None)
+    Confidence: float = Form(None),
+    turn: int = 0
 ):
     """HYBRID: ElevenLabs for realism + smart caching for speed."""
+    key = webhook_fingerprint("process-speech", CallSid, SpeechResult, turn)
+    twiml = await webhook_cache.run(key, lambda: _process_speech_twiml(CallSid, SpeechResult, turn))
+    return Response(content=twiml, media_type="application/xml")
+
+async def _process_speech_twiml(CallSid: str, SpeechResult: Optional[str], turn: int) -> str:
     response = VoiceResponse()
     
     if not SpeechResult:
@@ -439,8 +755,8 @@ async def process_speech(
             response.play(audio_url)
         else:
             response.say("I didn't catch that. What's your emergency?", voice='Polly.Joanna')
-        response.redirect('/api/webhooks/voice', method='POST')
-        return Response(content=str(response), media_type="application/xml")
+        response.redirect(f'/api/webhooks/voice?turn={turn + 1}', method='POST')
+        return str(response)
     
     try:
         # Get current call data
@@ -477,7 +793,8 @@ Example responses:
 - "Got it. Is anyone injured?"
 - "Okay, help is on the way. Stay with me."'''
         
-        ai_response_obj = await openai_client.chat.completions.create(
+        ai_response_obj = await llm.chat(
+            "process_speech", PRIORITY_LIVE,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a calm, professional 911 dispatcher. Speak naturally like a real human."},
@@ -507,9 +824,9 @@ Example responses:
         # Update call
         updated_transcript = f"{conversation_history}\nCaller: {SpeechResult}" if conversation_history else f"Caller: {SpeechResult}"
         
-        await db.active_calls.update_one(
+        await update_call(
             {"call_sid": CallSid},
-            {"$set": {
+            {
                 "incident_type": details.get("incident_type", "Other"),
                 "location": details.get("location", "unknown"),
                 "description": updated_transcript,
@@ -517,7 +834,7 @@ Example responses:
                 "transcription": updated_transcript,
                 "status": "Active" if details.get("is_complete") else "Processing",
                 "updated_at": datetime.now(timezone.utc).isoformat()
-            }}
+            }
         )
         
         # DISPATCH or CONTINUE with ElevenLabs
@@ -529,14 +846,14 @@ Example responses:
                 response.play(audio_url)
             else:
                 response.say(dispatch_msg, voice='Polly.Joanna')
-            response.redirect('/api/webhooks/hold-caller', method='POST')
+            response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
         else:
             # Continue with ElevenLabs for realistic conversation
             gather = Gather(
                 input='speech',
                 timeout=4,
                 speech_timeout=2,
-                action='/api/webhooks/process-speech',
+                action=f'/api/webhooks/process-speech?turn={turn + 1}',
                 method='POST',
                 language='en-US',
                 speech_model='phone_call'
@@ -559,7 +876,7 @@ Example responses:
                 response.play(fallback_url)
             else:
                 response.say(fallback_msg, voice='Polly.Joanna')
-            response.redirect('/api/webhooks/process-speech', method='POST')
+            response.redirect(f'/api/webhooks/process-speech?turn={turn + 1}', method='POST')
         
     except Exception as e:
         logger.error(f"Speech processing error: {e}")
@@ -570,9 +887,9 @@ Example responses:
             response.play(audio_url)
         else:
             response.say(error_msg, voice='Polly.Joanna')
-        response.redirect('/api/webhooks/hold-caller', method='POST')
+        response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
     
-    return Response(content=str(response), media_type="application/xml")
+    return str(response)
 
 @api_router.post("/webhooks/recording-status")
 async def recording_status_callback(
@@ -586,14 +903,14 @@ async def recording_status_callback(
         logger.info(f"Recording completed for call {CallSid}: {RecordingUrl}")
         
         # Update the call record with recording URL
-        await db.active_calls.update_one(
+        await update_call(
             {"call_sid": CallSid},
-            {"$set": {
+            {
                 "recording_url": RecordingUrl,
                 "recording_duration": int(RecordingDuration) if RecordingDuration else None,
                 "recording_sid": RecordingSid,
                 "updated_at": datetime.now(timezone.utc).isoformat()
-            }}
+            }
         )
         
         logger.info(f"Updated call {CallSid} with recording URL")
@@ -603,20 +920,20 @@ async def recording_status_callback(
         return {"status": "error", "message": str(e)}
 
 @api_router.post("/webhooks/get-location")
-async def get_location(CallSid: str = Form(...), SpeechResult: str = Form(None)):
+async def get_location(CallSid: str = Form(...), SpeechResult: str = Form(None), turn: int = 0):
     """Get location details."""
     if SpeechResult:
-        await db.active_calls.update_one(
+        await update_call(
             {"call_sid": CallSid},
-            {"$set": {"location": SpeechResult, "updated_at": datetime.now(timezone.utc).isoformat()}}
+            {"location": SpeechResult, "updated_at": datetime.now(timezone.utc).isoformat()}
         )
     
     response = VoiceResponse()
-    response.redirect('/api/webhooks/followup-questions')
+    response.redirect(f'/api/webhooks/followup-questions?turn={turn + 1}')
     return Response(content=str(response), media_type="application/xml")
 
 @api_router.post("/webhooks/followup-questions")
-async def followup_questions(CallSid: str = Form(...)):
+async def followup_questions(CallSid: str = Form(...), turn: int = 0):
     """Ask detailed follow-up questions based on incident type."""
     response = VoiceResponse()
     
@@ -624,13 +941,13 @@ async def followup_questions(CallSid: str = Form(...)):
     if not call:
         audio_url = generate_voice_audio_sync("Officers have been notified. Stay on the line.")
         response.play(audio_url)
-        response.redirect('/api/webhooks/hold-caller', method='POST')
+        response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
         return Response(content=str(response), media_type="application/xml")
     
     incident_type = call.get('incident_type', 'Other')
     
     # Ask multiple specific questions with ElevenLabs ONLY
-    gather = Gather(input='speech', timeout=5, speech_timeout=2, speech_model='phone_call', action='/api/webhooks/question-2', method='POST', language='en-US')
+    gather = Gather(input='speech', timeout=5, speech_timeout=2, speech_model='phone_call', action=f'/api/webhooks/question-2?turn={turn + 1}', method='POST', language='en-US')
     
     question = ""
     if incident_type in ['Medical', 'Fire']:
@@ -646,26 +963,26 @@ async def followup_questions(CallSid: str = Form(...)):
     gather.play(audio_url)
     
     response.append(gather)
-    response.redirect('/api/webhooks/question-2')
+    response.redirect(f'/api/webhooks/question-2?turn={turn + 1}')
     return Response(content=str(response), media_type="application/xml")
 
 @api_router.post("/webhooks/question-2")
-async def question_2(CallSid: str = Form(...), SpeechResult: str = Form(None)):
+async def question_2(CallSid: str = Form(...), SpeechResult: str = Form(None), turn: int = 0):
     """Second follow-up question."""
     if SpeechResult:
         call = await db.active_calls.find_one({"call_sid": CallSid}, {"_id": 0})
         if call:
             current_desc = call.get('description', '')
-            await db.active_calls.update_one(
+            await update_call(
                 {"call_sid": CallSid},
-                {"$set": {"description": f"{current_desc} | {SpeechResult}", "updated_at": datetime.now(timezone.utc).isoformat()}}
+                {"description": f"{current_desc} | {SpeechResult}", "updated_at": datetime.now(timezone.utc).isoformat()}
             )
     
     response = VoiceResponse()
     call = await db.active_calls.find_one({"call_sid": CallSid}, {"_id": 0})
     incident_type = call.get('incident_type', 'Other') if call else 'Other'
     
-    gather = Gather(input='speech', timeout=5, speech_timeout=2, speech_model='phone_call', action='/api/webhooks/question-3', method='POST', language='en-US')
+    gather = Gather(input='speech', timeout=5, speech_timeout=2, speech_model='phone_call', action=f'/api/webhooks/question-3?turn={turn + 1}', method='POST', language='en-US')
     
     question = ""
     if incident_type in ['Medical']:
@@ -683,19 +1000,19 @@ async def question_2(CallSid: str = Form(...), SpeechResult: str = Form(None)):
     gather.play(audio_url)
     
     response.append(gather)
-    response.redirect('/api/webhooks/question-3')
+    response.redirect(f'/api/webhooks/question-3?turn={turn + 1}')
     return Response(content=str(response), media_type="application/xml")
 
 @api_router.post("/webhooks/question-3")
-async def question_3(CallSid: str = Form(...), SpeechResult: str = Form(None)):
+async def question_3(CallSid: str = Form(...), SpeechResult: str = Form(None), turn: int = 0):
     """Third follow-up and call completion."""
     if SpeechResult:
         call = await db.active_calls.find_one({"call_sid": CallSid}, {"_id": 0})
         if call:
             current_desc = call.get('description', '')
-            await db.active_calls.update_one(
+            await update_call(
                 {"call_sid": CallSid},
-                {"$set": {"description": f"{current_desc} | {SpeechResult}", "updated_at": datetime.now(timezone.utc).isoformat()}}
+                {"description": f"{current_desc} | {SpeechResult}", "updated_at": datetime.now(timezone.utc).isoformat()}
             )
     
     # Mark call as Active NOW and generate radio dispatch announcement
@@ -715,14 +1032,14 @@ async def question_3(CallSid: str = Form(...), SpeechResult: str = Form(None)):
     print(f"Generated dispatch message: {dispatch_msg}")
     print(f"Dispatch audio URL: {dispatch_audio_url}")
     
-    await db.active_calls.update_one(
+    await update_call(
         {"call_sid": CallSid},
-        {"$set": {
+        {
             "status": "Active", 
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "conversation_history": ["Dispatcher: Thank you for that information. I've got officers heading to you right now."],
             "dispatch_audio_url": dispatch_audio_url  # Store for radio playback
-        }}
+        }
     )
     
     response = VoiceResponse()
@@ -736,7 +1053,7 @@ async def question_3(CallSid: str = Form(...), SpeechResult: str = Form(None)):
         input='speech',
         timeout=6,
         speech_timeout='auto',
-        action='/api/webhooks/hold-caller',
+        action=f'/api/webhooks/hold-caller?turn={turn + 1}',
         method='POST',
         language='en-US',
         speech_model='phone_call'
@@ -748,13 +1065,18 @@ async def question_3(CallSid: str = Form(...), SpeechResult: str = Form(None)):
     response.append(gather)
     
     # Fallback if no response
-    response.redirect('/api/webhooks/hold-caller', method='POST')
+    response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
     
     return Response(content=str(response), media_type="application/xml")
 
 @api_router.post("/webhooks/hold-caller")
-async def hold_caller(CallSid: str = Form(...), SpeechResult: str = Form(None)):
+async def hold_caller(CallSid: str = Form(...), SpeechResult: str = Form(None), turn: int = 0):
     """Keep caller engaged with real AI conversation - empathetic, human, dynamic."""
+    key = webhook_fingerprint("hold-caller", CallSid, SpeechResult, turn)
+    twiml = await webhook_cache.run(key, lambda: _hold_caller_twiml(CallSid, SpeechResult, turn))
+    return Response(content=twiml, media_type="application/xml")
+
+async def _hold_caller_twiml(CallSid: str, SpeechResult: Optional[str], turn: int) -> str:
     response = VoiceResponse()
     
     # Get call details for context
@@ -767,7 +1089,7 @@ async def hold_caller(CallSid: str = Form(...), SpeechResult: str = Form(None)):
         if audio_url:
             response.play(audio_url)
         response.hangup()
-        return Response(content=str(response), media_type="application/xml")
+        return str(response)
     
     # Check if officer just attached and needs to be announced
     if call and call.get('assigned_officer') and call.get('officer_notified'):
@@ -788,7 +1110,7 @@ async def hold_caller(CallSid: str = Form(...), SpeechResult: str = Form(None)):
             input='speech',
             timeout=7,
             speech_timeout='auto',
-            action='/api/webhooks/hold-caller',
+            action=f'/api/webhooks/hold-caller?turn={turn + 1}',
             method='POST',
             language='en-US',
             speech_model='phone_call'
@@ -798,8 +1120,8 @@ async def hold_caller(CallSid: str = Form(...), SpeechResult: str = Form(None)):
             gather.play(audio_url)
         
         response.append(gather)
-        response.redirect('/api/webhooks/hold-caller', method='POST')
-        return Response(content=str(response), media_type="application/xml")
+        response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
+        return str(response)
     
     # Build context for AI with what we ALREADY KNOW
     incident_type = call.get('incident_type', 'Unknown') if call else 'Unknown'
@@ -888,7 +1210,8 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
 
     try:
         # CONVERSATIONAL AI - natural responses
-        ai_response_obj = await openai_client.chat.completions.create(
+        ai_response_obj = await llm.chat(
+            "hold_caller", PRIORITY_LIVE,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -918,13 +1241,13 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
             dispatch_audio_url = generate_voice_audio_sync(dispatch_msg)
             
             # Mark as Active with dispatch audio
-            await db.active_calls.update_one(
+            await update_call(
                 {"call_sid": CallSid},
-                {"$set": {
+                {
                     "status": "Active",
                     "dispatch_audio_url": dispatch_audio_url,
                     "updated_at": datetime.now(timezone.utc).isoformat()
-                }}
+                }
             )
             
             # Say goodbye and hang up
@@ -933,15 +1256,15 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
             if audio_url:
                 response.play(audio_url)
             response.hangup()
-            return Response(content=str(response), media_type="application/xml")
+            return str(response)
         
         # Otherwise continue conversation
         # Save to conversation
         conversation_history.append(f"Dispatcher: {ai_response}")
         
-        await db.active_calls.update_one(
+        await update_call(
             {"call_sid": CallSid},
-            {"$set": {"conversation_history": conversation_history}}
+            {"conversation_history": conversation_history}
         )
         
         # Generate audio
@@ -952,7 +1275,7 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
             input='speech',
             timeout=5,
             speech_timeout='auto',
-            action='/api/webhooks/hold-caller',
+            action=f'/api/webhooks/hold-caller?turn={turn + 1}',
             method='POST',
             language='en-US',
             speech_model='phone_call',
@@ -963,7 +1286,7 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
             gather.play(audio_url)
         
         response.append(gather)
-        response.redirect('/api/webhooks/hold-caller', method='POST')
+        response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
         
     except Exception as e:
         logger.error(f"AI conversation error: {e}")
@@ -975,28 +1298,76 @@ Generate your NEXT response (8-15 words). Be natural, show you understood them."
         if audio_url:
             response.play(audio_url)
         response.pause(length=2)
-        response.redirect('/api/webhooks/hold-caller', method='POST')
+        response.redirect(f'/api/webhooks/hold-caller?turn={turn + 1}', method='POST')
     
-    return Response(content=str(response), media_type="application/xml")
+    return str(response)
 
 # Active Calls API (under /api prefix)
 @api_router.get("/calls/active")
-async def get_active_calls(current_user: User = Depends(get_current_user)):
-    """Get all active emergency calls."""
-    calls = await db.active_calls.find(
-        {"status": {"$ne": "Closed"}},
-        {"_id": 0}
-    ).sort("priority", 1).to_list(100)
+async def get_active_calls(
+    request: Request,
+    response: Response,
+    since: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Get all active emergency calls (summary - full transcript via /calls/{id}/transcript).
+    
+    Send the last ETag back as If-None-Match to get a 304 when nothing has changed.
+    Pass the X-Next-Cursor of the previous response as ?since= to get only the calls
+    changed since then, closed ones included (status "Closed") so they can be removed.
+    """
+    # The event bus sees every write to active_calls (from this process, or from all
+    # of them with CALL_EVENTS_SOURCE=change_stream), so its version is the board's
+    # and a 304 needs no query
+    etag = f'W/"{BOARD_EPOCH}-{call_events.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    board_seq = await current_update_seq(db)
+    if since is None:
+        calls = await db.active_calls.aggregate(active_calls_pipeline()).to_list(ACTIVE_CALLS_LIMIT)
+    else:
+        calls = await db.active_calls.aggregate(changed_since_pipeline(since)).to_list(ACTIVE_CALLS_LIMIT)
+        if len(calls) == ACTIVE_CALLS_LIMIT:
+            # More behind this page: continue from the last change returned, and no
+            # ETag so the follow-up request isn't answered with a 304
+            response.headers["X-Next-Cursor"] = str(calls[-1]["update_seq"])
+            return calls
+    
+    response.headers["ETag"] = etag
+    response.headers["X-Next-Cursor"] = str(board_seq)
     return calls
 
+@api_router.get("/calls/{call_id}/transcript")
+async def get_call_transcript(
+    call_id: str,
+    offset: int = 0,
+    history_offset: int = 0,
+    current_user: User = Depends(get_current_user)
+):
+    """Transcript turns from offset onward. Pass back turn_count / history_count as the
+    next offsets to fetch only what was said since the last poll."""
+    results = await db.active_calls.aggregate(
+        transcript_pipeline(call_id, max(offset, 0), max(history_offset, 0))
+    ).to_list(1)
+    if not results:
+        raise HTTPException(status_code=404, detail="Call not found")
+    return {"call_id": call_id, "offset": max(offset, 0), "history_offset": max(history_offset, 0), **results[0]}
+
 @api_router.get("/calls/recordings")
-async def get_call_recordings(current_user: User = Depends(get_current_user)):
-    """Get all calls with recordings."""
-    calls = await db.active_calls.find(
-        {"recording_url": {"$exists": True, "$ne": None}},
-        {"_id": 0}
-    ).sort("created_at", -1).to_list(100)
-    return calls
+async def get_call_recordings(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Get calls with recordings, newest first (keyset-paginated, see keyset_page)."""
+    return await keyset_page(
+        response, db.active_calls, {"recording_url": {"$exists": True, "$ne": None}},
+        cursor, limit, fields, stream
+    )
 
 @api_router.get("/calls/{call_id}/recording")
 async def get_call_recording(call_id: str, current_user: User = Depends(get_current_user)):
@@ -1036,15 +1407,15 @@ async def attach_to_call(call_id: str, current_user: User = Depends(get_current_
     officer_name = current_user.full_name
     badge_number = current_user.badge_number
     
-    result = await db.active_calls.update_one(
+    result = await update_call(
         {"id": call_id},
-        {"$set": {
+        {
             "assigned_officer": current_user.badge_number,
             "assigned_officer_name": officer_name,
             "status": "Dispatched",
             "officer_notified": True,  # Flag to tell dispatcher to announce
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+        }
     )
     
     if result.modified_count == 0:
@@ -1055,13 +1426,13 @@ async def attach_to_call(call_id: str, current_user: User = Depends(get_current_
 @api_router.post("/calls/{call_id}/on-scene")
 async def mark_on_scene(call_id: str, current_user: User = Depends(get_current_user)):
     """Officer marks themselves as on scene - only then does call end."""
-    result = await db.active_calls.update_one(
+    result = await update_call(
         {"id": call_id, "assigned_officer": current_user.badge_number},
-        {"$set": {
+        {
             "officer_on_scene": True,
             "status": "On Scene",
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+        }
     )
     
     if result.modified_count == 0:
@@ -1072,60 +1443,126 @@ async def mark_on_scene(call_id: str, current_user: User = Depends(get_current_u
 @api_router.post("/calls/{call_id}/close")
 async def close_call(call_id: str, current_user: User = Depends(get_current_user)):
     """Close/complete a call."""
-    await db.active_calls.update_one(
-        {"id": call_id},
-        {"$set": {"status": "Closed", "updated_at": datetime.now(timezone.utc).isoformat()}}
+    now = datetime.now(timezone.utc).isoformat()
+    # Only the first close stamps closed_at - crime analytics counts each call once by it
+    await update_call(
+        {"id": call_id, "status": {"$ne": "Closed"}},
+        {"status": "Closed", "closed_at": now, "updated_at": now},
+        event_type="call.closed"
     )
     return {"message": "Call closed"}
 
 # Person Search
 @api_router.get("/search/person")
 async def search_person(
+    response: Response,
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
     dob: Optional[str] = None,
     dl: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 100,
     current_user: User = Depends(get_current_user)
 ):
-    query = {}
-    if first_name:
-        query["first_name"] = {"$regex": first_name, "$options": "i"}
-    if last_name:
-        query["last_name"] = {"$regex": last_name, "$options": "i"}
-    if dob:
-        query["dob"] = dob
-    if dl:
-        query["drivers_license"] = dl
-    
-    results = await db.persons.find(query, {"_id": 0}).to_list(100)
-    return results
+    """Prefix + sounds-like name search, best matches first. Total hits in X-Total-Count."""
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 100)
+    start, end = (page - 1) * page_size, page * page_size
+    
+    # One filter per match score, so a page is read from the index in ranked order
+    results, total = await search_person_page(db.persons, first_name, last_name, dob, dl, start, end)
+    
+    response.headers["X-Total-Count"] = str(total)
+    return rank_persons(results, first_name, last_name)
 
 # Vehicle Search  
+VEHICLE_SEARCH_LIMIT = 100
+# Most pattern matches ranked per search; a broader pattern is refused rather than read whole
+PLATE_CANDIDATE_LIMIT = int(os.environ.get('PLATE_CANDIDATE_LIMIT', '2000'))
+
 @api_router.get("/search/vehicle")
 async def search_vehicle(
     plate: Optional[str] = None,
     vin: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
+    """Partial plate search: ? is one unknown character, * any run (e.g. 7K??3, 7K*3).
+    Lookalikes (0/O, 1/I, 8/B) match each other; exact matches rank first. A pattern
+    matching more than PLATE_CANDIDATE_LIMIT plates is refused with a 400. Vehicles
+    on the hot list carry "hot_list": {source: hit}."""
     query = {}
     if plate:
-        query["plate_number"] = {"$regex": plate, "$options": "i"}
+        try:
+            query.update(build_plate_query(plate))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     if vin:
         query["vin"] = vin
     
-    results = await db.vehicles.find(query, {"_id": 0}).to_list(100)
+    if plate:
+        # Every match is confirmed by the query; score them all on the plate fields, then load the best
+        matches = await db.vehicles.find(query, PLATE_RANK_PROJECTION).to_list(PLATE_CANDIDATE_LIMIT + 1)
+        if len(matches) > PLATE_CANDIDATE_LIMIT:
+            raise HTTPException(status_code=400, detail=f"More than {PLATE_CANDIDATE_LIMIT} plates match {plate}; "
+                                                        "narrow the pattern with more characters")
+        best = [match["id"] for match in rank_vehicles(matches, plate)[:VEHICLE_SEARCH_LIMIT]]
+        scores = {match["id"]: match["match_score"] for match in matches}
+        by_id = {vehicle["id"]: vehicle async for vehicle in db.vehicles.find({"id": {"$in": best}}, {"_id": 0, "plate_tokens": 0})}
+        results = [{**by_id[vehicle_id], "match_score": scores[vehicle_id]} for vehicle_id in best if vehicle_id in by_id]
+    else:
+        results = await db.vehicles.find(query, {"_id": 0, "plate_tokens": 0}).to_list(VEHICLE_SEARCH_LIMIT)
+    await hot_list.ready(db)
+    for vehicle in results:
+        hits = hot_list.check_plate(vehicle.get("plate_number"))
+        if hits:
+            vehicle["hot_list"] = hits
     return results
 
+@api_router.get("/hot-list/check")
+async def check_hot_list(
+    plate: Optional[str] = None,
+    person_id: Optional[str] = None,
+    drivers_license: Optional[str] = None,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    dob: Optional[str] = None,
+    registered_owner: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """"Any hit?" for a plate and/or person, from memory: {"hit", "hits": {source: hit}, "lookup_us"}."""
+    if not (await hot_list.ready(db)).loaded:
+        raise HTTPException(status_code=503, detail="Hot list not loaded yet", headers={"Retry-After": "5"})
+    
+    started = time.perf_counter()
+    hits: Dict[str, str] = {}
+    if plate:
+        hits.update(hot_list.check_plate(plate) or {})
+    if registered_owner:
+        hits.update(hot_list.check_owner(registered_owner) or {})
+    if person_id or drivers_license or (last_name and dob):
+        hits.update(hot_list.check_person(person_id, drivers_license, first_name, last_name, dob) or {})
+    return {"hit": bool(hits), "hits": hits, "lookup_us": round((time.perf_counter() - started) * 1e6, 1)}
+
 # Citations with auto-fine and person linking
 @api_router.post("/citations", response_model=Citation)
-async def create_citation(citation_data: dict, current_user: User = Depends(get_current_user)):
-    # Auto-generate fine amount
-    fine_amount = get_fine_amount(citation_data['violation_code'])
-    citation_data['fine_amount'] = fine_amount
+async def create_citation(citation_data: dict, response: Response, current_user: User = Depends(get_current_user)):
+    """The fine is the catalog's for the code on the citation date (400 for an unknown code).
+    X-Hot-List: hit | miss says whether the offender has warrants on the hot list,
+    unknown while the hot list isn't loaded.
+    A client_id that was already used returns the citation stored with it."""
+    if citation_data.get('client_id'):
+        existing = await db.citations.find_one({"client_id": {"$eq": citation_data['client_id'], "$type": "string"}}, {"_id": 0})
+        if existing:
+            return existing
     
-    # Find or create person record
-    person_id = await find_or_create_person(citation_data)
-    citation_data['person_id'] = person_id
+    # Auto-generate fine amount
+    index = violation_catalog.index
+    try:
+        fine = index.lookup(citation_data['violation_code'], citation_data.get('date_time'))
+    except (UnknownViolationCode, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    citation_data['fine_amount'] = fine.amount
+    citation_data['fine_catalog_version'] = index.version
     
     citation = Citation(
         **citation_data,
@@ -1133,31 +1570,303 @@ async def create_citation(citation_data: dict, current_user: User = Depends(get_
         officer_name=current_user.full_name
     )
     
-    # Save citation
-    await db.citations.insert_one(citation.model_dump())
+    # Find or create person record
+    citation.person_id = await find_or_create_person(citation_data)
     
-    # Update person record with citation
-    await db.persons.update_one(
-        {"id": person_id},
-        {"$push": {"citations": citation.id}}
-    )
+    # Save citation, then link it: a citation that isn't stored must not be on the person
+    try:
+        await db.citations.insert_one(citation.model_dump())
+    except DuplicateKeyError:
+        # Same client_id stored by a concurrent resend since the check above
+        existing = await db.citations.find_one({"client_id": {"$eq": citation.client_id, "$type": "string"}}, {"_id": 0})
+        if existing:
+            return existing
+        raise
+    await db.persons.update_one({"id": citation.person_id}, {"$push": {"citations": citation.id}})
+    
+    if (await hot_list.ready(db)).loaded:
+        offender_hits = hot_list.check_person(
+            citation.person_id, citation_data.get('offender_dl'), *split_offender_name(citation_data['offender_name']),
+            citation_data.get('offender_dob')
+        )
+        response.headers["X-Hot-List"] = "hit" if offender_hits else "miss"
+    else:
+        # Not built yet, or its build failed: a miss would tell the officer the offender is clear
+        logger.warning(f"Hot list not loaded ({hot_list.last_error or 'still building'}); citation {citation.id} unchecked")
+        response.headers["X-Hot-List"] = "unknown"
     
     return citation
 
+# Set server-side on bulk citations, whatever the device sends
+BULK_CITATION_SERVER_FIELDS = {"id", "person_id", "fine_amount", "fine_catalog_version", "officer_badge",
+                               "officer_name", "created_at"}
+
+@api_router.post("/citations/bulk")
+async def create_citations_bulk(citations_data: List[Dict[str, Any]], current_user: User = Depends(get_current_user)):
+    """Sync a device's batch of citations (see citation_batch).
+    
+    Every item needs a client_id; an item whose client_id is already stored is
+    reported as "duplicate" with the stored citation_id instead of being created
+    again, so a device can resend a batch after a dropped connection. Per-item
+    results in request order: {"index", "client_id", "status": "created" |
+    "duplicate" | "error", "citation_id", "person_id", "fine_amount",
+    "hot_list_hit"} or {..., "detail"}; hot_list_hit is null while the hot list
+    isn't loaded.
+    """
+    if len(citations_data) > MAX_BULK_CITATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CITATIONS} citations per request")
+    started = time.perf_counter()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(citations_data)
+    
+    def error(i: int, detail: str) -> Dict[str, Any]:
+        return {"index": i, "client_id": citations_data[i].get("client_id"), "status": "error", "detail": detail}
+    
+    client_ids = [item.get("client_id") for item in citations_data]
+    stored = {
+        c["client_id"]: c for c in await db.citations.find(
+            {"client_id": {"$in": [cid for cid in client_ids if isinstance(cid, str)], "$type": "string"}},
+            {"_id": 0, "client_id": 1, "id": 1, "person_id": 1}
+        ).to_list(None)
+    }
+    
+    # Validate and price every item against one catalog version
+    index = violation_catalog.index
+    accepted: Dict[int, Citation] = {}
+    offenders: Dict[int, PersonRecord] = {}
+    seen = set()
+    for i, item in enumerate(citations_data):
+        client_id = client_ids[i]
+        if not isinstance(client_id, str) or not client_id:
+            results[i] = error(i, "client_id is required")
+        elif client_id in stored:
+            results[i] = {"index": i, "client_id": client_id, "status": "duplicate",
+                          "citation_id": stored[client_id]["id"], "person_id": stored[client_id].get("person_id")}
+        elif client_id in seen:
+            results[i] = error(i, "client_id repeated in this batch")
+        else:
+            seen.add(client_id)
+            try:
+                fine = index.lookup(item.get("violation_code"), item.get("date_time"))
+                citation = Citation(
+                    **{k: v for k, v in item.items() if k not in BULK_CITATION_SERVER_FIELDS},
+                    fine_amount=fine.amount,
+                    fine_catalog_version=index.version,
+                    officer_badge=current_user.badge_number,
+                    officer_name=current_user.full_name
+                )
+                first_name, last_name = split_offender_name(citation.offender_name)
+                offenders[i] = PersonRecord(
+                    first_name=first_name, last_name=last_name, dob=citation.offender_dob or '',
+                    drivers_license=citation.offender_dl, address=citation.offender_address
+                )
+            except (UnknownViolationCode, ValueError) as e:
+                results[i] = error(i, str(e))
+                continue
+            accepted[i] = citation
+    
+    # Resolve offenders as a set: group by shared identity keys, one $in, one bulk upsert
+    keys_by_item = {i: person.identity_keys for i, person in offenders.items() if person.identity_keys}
+    person_of_item = {i: person.id for i, person in offenders.items() if not person.identity_keys}
+    
+    async def persons_by_key(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        async for person in db.persons.find({"identity_keys": {"$in": keys}}, {"_id": 0, "id": 1, "identity_keys": 1}):
+            for key in person["identity_keys"]:
+                found[key] = person
+        return found
+    
+    groups = group_by_identity(keys_by_item)
+    existing = await persons_by_key(sorted({key for keys in keys_by_item.values() for key in keys})) if groups else {}
+    new_groups, known = [], []
+    for group in groups:
+        keys = group_keys(group, keys_by_item)
+        match = next((existing[key] for key in keys if key in existing), None)
+        if match is None:
+            new_groups.append((group, keys))
+            continue
+        for i in group:
+            person_of_item[i] = match["id"]
+        learned = [key for key in keys if key not in match["identity_keys"]]
+        if learned:
+            known.append((match["id"], learned))
+    
+    anonymous = [i for i in offenders if not offenders[i].identity_keys]
+    operations = person_upserts([(keys, offenders[group[0]].model_dump()) for group, keys in new_groups],
+                                [offenders[i].model_dump() for i in anonymous], known)
+    if operations:
+        try:
+            await db.persons.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Upserts that lost a race to a concurrent sync are resolved below; a DL
+            # already on another person just isn't recorded twice
+            logger.warning(f"Bulk citation person writes: {len(e.details.get('writeErrors', []))} conflict(s)")
+    if new_groups:
+        upserted = await persons_by_key(sorted({key for _, keys in new_groups for key in keys}))
+        for group, keys in new_groups:
+            person = next((upserted[key] for key in keys if key in upserted), None)
+            for i in group:
+                if person is not None:
+                    person_of_item[i] = person["id"]
+    for i in anonymous + [group[0] for group, _ in new_groups]:
+        if person_of_item.get(i) == offenders[i].id:
+            suspect_matcher.upsert(offenders[i].model_dump())
+    
+    # Insert the citations, then link them to their persons in one unordered bulk_write
+    order = [i for i in accepted if i in person_of_item]
+    for i in accepted:
+        if i not in person_of_item:
+            results[i] = error(i, "Offender could not be resolved")
+    for i in order:
+        accepted[i].person_id = person_of_item[i]
+    inserted = set(order)
+    if order:
+        try:
+            await db.citations.insert_many([accepted[i].model_dump() for i in order], ordered=False)
+        except BulkWriteError as e:
+            raced = {}
+            for write_error in e.details.get("writeErrors", []):
+                i = order[write_error["index"]]
+                inserted.discard(i)
+                if write_error.get("code") == 11000:
+                    raced[accepted[i].client_id] = i
+                else:
+                    results[i] = error(i, write_error.get("errmsg", "Insert failed"))
+            # Same client_id stored by a concurrent resend of this batch
+            async for c in db.citations.find({"client_id": {"$in": list(raced), "$type": "string"}},
+                                             {"_id": 0, "client_id": 1, "id": 1, "person_id": 1}):
+                i = raced.pop(c["client_id"])
+                results[i] = {"index": i, "client_id": c["client_id"], "status": "duplicate",
+                              "citation_id": c["id"], "person_id": c.get("person_id")}
+            for i in raced.values():
+                results[i] = error(i, "Citation id already exists")
+    
+    links: Dict[str, List[str]] = {}
+    for i in order:
+        if i in inserted:
+            links.setdefault(person_of_item[i], []).append(accepted[i].id)
+    if links:
+        await db.persons.bulk_write(
+            [UpdateOne({"id": person_id}, {"$push": {"citations": {"$each": ids}}}) for person_id, ids in links.items()],
+            ordered=False
+        )
+    
+    hot_list_loaded = (await hot_list.ready(db)).loaded
+    if not hot_list_loaded:
+        logger.warning(f"Hot list not loaded ({hot_list.last_error or 'still building'}); bulk citations unchecked")
+    for i in order:
+        if i in inserted:
+            citation = accepted[i]
+            # None: unknown, the hot list isn't loaded
+            hit = bool(hot_list.check_person(citation.person_id, citation.offender_dl,
+                                             *split_offender_name(citation.offender_name), citation.offender_dob)
+                       ) if hot_list_loaded else None
+            results[i] = {"index": i, "client_id": citation.client_id, "status": "created", "citation_id": citation.id,
+                          "person_id": citation.person_id, "fine_amount": citation.fine_amount, "hot_list_hit": hit}
+    
+    elapsed = time.perf_counter() - started
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "duplicate", "error")}
+    return {
+        "created": counts["created"],
+        "duplicates": counts["duplicate"],
+        "failed": counts["error"],
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "citations_per_second": round(len(citations_data) / elapsed, 1) if citations_data else 0,
+        "results": results,
+    }
+
+MAX_FINE_ITEMS = 10000
+
+@api_router.post("/citations/fines")
+async def calculate_fines(items: List[Dict[str, Any]], current_user: User = Depends(get_current_user)):
+    """Fines for many {"violation_code", "date_time"} items, all priced by one catalog version.
+    
+    Per-item results in request order: {"index", "status": "ok", "fine_amount",
+    "effective_from", "court_determined"} or {"index", "status": "error", "detail"}.
+    """
+    if len(items) > MAX_FINE_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FINE_ITEMS} items per request")
+    index = violation_catalog.index
+    results = index.fines((item.get("violation_code"), item.get("date_time")) for item in items)
+    return {"catalog_version": index.version, "results": results}
+
+@api_router.get("/violations")
+async def get_violations(on_date: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Every violation code with its fine in effect on on_date (default today)."""
+    index = violation_catalog.index
+    try:
+        entries = index.current(on_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"catalog_version": index.version, "violations": [entry._asdict() for entry in entries]}
+
+@api_router.get("/violations/{code}/history")
+async def get_violation_history(code: str, current_user: User = Depends(get_current_user)):
+    """Every fine a code has had, oldest first - what was in effect on a disputed citation date."""
+    index = violation_catalog.index
+    try:
+        return {"catalog_version": index.version, "fines": [entry._asdict() for entry in index.history(code)]}
+    except UnknownViolationCode as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@api_router.post("/admin/violation-catalog/reload")
+async def reload_violation_catalog(current_user: User = Depends(get_current_user)):
+    """Re-read the catalog file; a file that doesn't validate leaves the current catalog live."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    try:
+        violation_catalog.reload()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Catalog not reloaded: {e}")
+    return violation_catalog.stats()
+
+@api_router.put("/admin/violation-catalog")
+async def replace_violation_catalog(catalog_data: dict, current_user: User = Depends(get_current_user)):
+    """Publish a new catalog version (fines already in effect can't change, see check_successor),
+    archiving the one it replaces. Other workers pick the file up within VIOLATION_CATALOG_POLL_SECONDS."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    try:
+        violation_catalog.publish(catalog_data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Catalog not published: {e}")
+    return violation_catalog.stats()
+
 @api_router.get("/citations")
-async def get_citations(current_user: User = Depends(get_current_user)):
-    citations = await db.citations.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return citations
+async def get_citations(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Citations, newest first (keyset-paginated, see keyset_page)."""
+    return await keyset_page(response, db.citations, {}, cursor, limit, fields, stream)
 
 # AI endpoints (keeping existing ones)
+# Derived plate search keys - no use to the model
+VEHICLE_ANALYSIS_PROJECTION = {"_id": 0, "plate_normalized": 0, "plate_skeleton": 0, "plate_length": 0, "plate_tokens": 0}
+
 @api_router.post("/ai/analyze-plate")
-async def analyze_plate(plate_data: dict, current_user: User = Depends(get_current_user)):
+async def analyze_plate(plate_data: dict, response: Response, current_user: User = Depends(get_current_user)):
+    """LLM assessment of a plate, reused while the plate, state, context and vehicle record are unchanged (X-Cache: HIT/MISS).
+    "hot_list" is {source: hit}, null for none, or "unknown" while the hot list isn't loaded."""
     try:
         plate_number = plate_data.get('plate_number', '')
         state = plate_data.get('state', '')
         context = plate_data.get('context', '')
         
-        vehicle = await db.vehicles.find_one({"plate_number": plate_number}, {"_id": 0})
+        vehicle = await db.vehicles.find_one({"plate_normalized": normalize_plate(plate_number)}, VEHICLE_ANALYSIS_PROJECTION)
+        if (await hot_list.ready(db)).loaded:
+            hits = hot_list.check_plate(plate_number)
+        else:
+            logger.warning(f"Hot list not loaded ({hot_list.last_error or 'still building'}); plate {plate_number} unchecked")
+            hits = "unknown"
+        cache_key = plate_analysis_cache.key(plate_number, state, context, vehicle)
+        analysis = plate_analysis_cache.get(cache_key)
+        if analysis is not None:
+            response.headers["X-Cache"] = "HIT"
+            return {"vehicle": vehicle, "hot_list": hits, "analysis": analysis}
         
         prompt = f"""Analyze this license plate and provide a detailed law enforcement assessment:
 
@@ -1174,7 +1883,8 @@ Provide:
 
 Format as JSON with keys: risk_level, concerns, recommendations, notes"""
         
-        response_obj = await openai_client.chat.completions.create(
+        response_obj = await llm.chat(
+            "analyze_plate", PRIORITY_INTERACTIVE,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a law enforcement AI assistant analyzing vehicle information."},
@@ -1182,37 +1892,160 @@ Format as JSON with keys: risk_level, concerns, recommendations, notes"""
             ],
             temperature=0.3
         )
-        response = response_obj.choices[0].message.content
+        response_text = response_obj.choices[0].message.content
         
         try:
-            analysis = json.loads(response)
+            analysis = json.loads(response_text)
+            plate_analysis_cache.set(cache_key, analysis)
         except:
-            analysis = {"risk_level": "Unknown", "raw_response": response}
+            analysis = {"risk_level": "Unknown", "raw_response": response_text}
         
-        return {"vehicle": vehicle, "analysis": analysis}
+        response.headers["X-Cache"] = "MISS"
+        return {"vehicle": vehicle, "hot_list": hits, "analysis": analysis}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI analysis failed: {str(e)}")
 
-@api_router.post("/ai/generate-report")
-async def generate_report(report_data: dict, current_user: User = Depends(get_current_user)):
-    try:
-        prompt = f"""Generate a professional police incident report based on this information:
+async def narrate_plate_hits(pending: List[tuple], vehicles: Dict[tuple, Any],
+                             hits: Dict[tuple, List[Dict[str, Any]]]) -> Dict[tuple, Dict[str, Any]]:
+    """One LLM call assessing every (read key, cache key) in pending; returns analyses by read key."""
+    # Keyed by ref, not plate: the same plate can be read in two states
+    records = [
+        {"ref": str(ref), "plate": plate, "state": state, "hits": hits[(plate, state)], "vehicle": vehicles[(plate, state)]}
+        for ref, ((plate, state), _) in enumerate(pending)
+    ]
+    template = """These vehicles were just seen by license plate readers and have hits on record.
+For each one give a short law enforcement assessment for the officer.
+
+{vehicles}
+
+Return a JSON object keyed by each vehicle's ref: {"REF": {"risk_level": "Low|Medium|High", "concerns": [], "recommendations": [], "notes": ""}}"""
+    prompt, prompt_stats = fit_records(template, "{vehicles}", records, ["ref", "plate", "state", "hits", "vehicle"],
+                                       ALPR_PROMPT_BUDGET, model="gpt-4o-mini", keep_fields=4)
+    logger.info(f"analyze_plates prompt: {prompt_stats}")
+    response_obj = await llm.chat(
+        "analyze_plates", PRIORITY_INTERACTIVE,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a law enforcement AI assistant analyzing vehicle information."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )
+    by_ref = json.loads(response_obj.choices[0].message.content)
+    analyses = {}
+    for ref, (key, cache_key) in enumerate(pending):
+        analysis = by_ref.get(str(ref)) if isinstance(by_ref, dict) else None
+        if isinstance(analysis, dict):
+            plate_analysis_cache.set(cache_key, analysis)
+            analyses[key] = analysis
+    return analyses
+
+@api_router.post("/ai/analyze-plates")
+async def analyze_plates(reads: List[PlateRead], narrate: bool = True, current_user: User = Depends(get_current_user)):
+    """Check a batch of plate reader hits at once (see plate_batch).
+    
+    Every read is checked locally against vehicle flags, registration status and
+    warrants on the registered owner, with one query per collection. Only reads
+    with flags or owner warrants get an LLM "analysis" - one call for the whole
+    batch, at most MAX_NARRATED_PER_BATCH vehicles, reused from the plate analysis
+    cache where possible; narrate=false skips it. Results are in request order
+    and the response reports reads_per_second.
+    """
+    if len(reads) > MAX_BATCH_READS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_READS} reads per request")
+    started = time.perf_counter()
+    
+    keys = [read_key(read.plate_number, read.state) for read in reads]
+    plates = sorted({plate for plate, _ in keys if plate})
+    candidates: Dict[str, List[Dict[str, Any]]] = {}
+    for vehicle in await db.vehicles.find({"plate_normalized": {"$in": plates}}, VEHICLE_ANALYSIS_PROJECTION).to_list(None):
+        candidates.setdefault(normalize_plate(vehicle["plate_number"]), []).append(vehicle)
+    vehicles = {key: pick_vehicle(candidates.get(key[0], []), key[1]) for key in set(keys)}
+    
+    owners = {}
+    found = [vehicle for vehicle in vehicles.values() if vehicle]
+    if (await hot_list.ready(db)).loaded:
+        # Only owners the hot list can't rule out; usually none, and no query at all
+        found = [vehicle for vehicle in found if hot_list.check_owner(vehicle.get("registered_owner"))]
+    query = owner_warrant_query(found)
+    if query:
+        owners = group_owners(await db.persons.find(query, OWNER_WARRANT_PROJECTION).to_list(None))
+    hits = {key: vehicle_hits(vehicle, owners) for key, vehicle in vehicles.items()}
+    
+    analyses: Dict[tuple, Dict[str, Any]] = {}
+    narrative_error = None
+    if narrate:
+        pending = []
+        for key, vehicle in vehicles.items():
+            if not needs_narrative(hits[key]):
+                continue
+            cache_key = plate_analysis_cache.key(key[0], key[1], hit_signature(hits[key]), vehicle)
+            cached = plate_analysis_cache.get(cache_key)
+            if cached is not None:
+                analyses[key] = cached
+            else:
+                pending.append((key, cache_key))
+        # Owner warrants first if the batch has more than one call's worth
+        pending.sort(key=lambda item: not any(hit["type"] == HIT_OWNER_WARRANT for hit in hits[item[0]]))
+        if pending:
+            try:
+                analyses.update(await narrate_plate_hits(pending[:MAX_NARRATED_PER_BATCH], vehicles, hits))
+            except Exception as e:
+                # Local hits are what the officer needs; the narrative is a bonus
+                logger.error(f"Batch plate narrative failed: {e}")
+                narrative_error = str(e)
+    
+    results = []
+    for index, (read, key) in enumerate(zip(reads, keys)):
+        vehicle = vehicles[key]
+        result = {"index": index, "read_id": read.read_id, "camera_id": read.camera_id, "plate_number": read.plate_number,
+                  "plate_normalized": key[0], "found": vehicle is not None, "hit": bool(hits[key]), "hits": hits[key]}
+        if hits[key]:
+            result["vehicle"] = vehicle
+        if key in analyses:
+            result["analysis"] = analyses[key]
+        results.append(result)
+    
+    elapsed = time.perf_counter() - started
+    summary = {
+        "reads": len(reads),
+        "unique_plates": len(vehicles),
+        "vehicles_found": sum(1 for vehicle in vehicles.values() if vehicle),
+        "hits": sum(1 for result in results if result["hit"]),
+        "narrated": len(analyses),
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "reads_per_second": round(len(reads) / elapsed, 1) if reads else 0,
+    }
+    logger.info(f"analyze_plates: {summary}")
+    if narrative_error:
+        summary["narrative_error"] = narrative_error
+    return {**summary, "results": results}
+
+REPORT_WRITER_PROMPT = "You are an expert police report writer. Generate professional, detailed incident reports."
+
+def report_prompt(report_data: dict, user: User) -> str:
+    return f"""Generate a professional police incident report based on this information:
 
 Incident Type: {report_data.get('incident_type', '')}
 Date/Time: {report_data.get('date_time', '')}
 Location: {report_data.get('location', '')}
-Officer: {current_user.full_name} (Badge #{current_user.badge_number})
+Officer: {user.full_name} (Badge #{user.badge_number})
 
 Brief Details:
 {report_data.get('details', '')}
 
 Generate a complete narrative following standard police report format. Be factual, detailed, and professional."""
-        
-        narrative_obj = await openai_client.chat.completions.create(
+
+@api_router.post("/ai/generate-report")
+async def generate_report(report_data: dict, current_user: User = Depends(get_current_user)):
+    try:
+        narrative_obj = await llm.chat(
+            "generate_report", PRIORITY_INTERACTIVE,
             model="gpt-4o",
             messages=[
-                {"role": "system", "content": "You are an expert police report writer. Generate professional, detailed incident reports."},
-                {"role": "user", "content": prompt}
+                {"role": "system", "content": REPORT_WRITER_PROMPT},
+                {"role": "user", "content": report_prompt(report_data, current_user)}
             ],
             temperature=0.5
         )
@@ -1222,24 +2055,150 @@ Generate a complete narrative following standard police report format. Be factua
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
 
+@api_router.post("/ai/generate-report/stream")
+async def generate_report_stream(
+    report_data: dict,
+    request: Request,
+    format: str = "sse",
+    current_user: User = Depends(get_current_user)
+):
+    """generate_report, forwarding tokens as they arrive.
+    
+    format=sse sends `event: token` / `event: done` / `event: error` server-sent
+    events; format=ndjson sends one {"type": ...} object per line. Tokens carry
+    {"delta"}; done carries the saved draft_id, ttft_ms and total_ms. If the client
+    goes away the upstream completion is closed and nothing is saved; a finished
+    narrative is stored in report_drafts.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be sse or ndjson")
+    
+    started = time.perf_counter()
+    try:
+        upstream = await llm.stream_chat(
+            "generate_report_stream", PRIORITY_INTERACTIVE,
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": REPORT_WRITER_PROMPT},
+                {"role": "user", "content": report_prompt(report_data, current_user)}
+            ],
+            temperature=0.5
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {str(e)}")
+    
+    def encode(event_type: str, payload: dict) -> str:
+        if format == "sse":
+            return f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+        return json.dumps({"type": event_type, **payload}) + "\n"
+    
+    async def events():
+        parts = []
+        ttft_ms = None
+        completed = False
+        try:
+            async for chunk in upstream:
+                if await request.is_disconnected():
+                    logger.info(f"Report stream for {current_user.badge_number} cancelled by client")
+                    return
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                parts.append(delta)
+                yield encode("token", {"delta": delta})
+            completed = True
+        except Exception as e:
+            yield encode("error", {"detail": f"Report generation failed: {str(e)}"})
+            return
+        finally:
+            if not completed:
+                # Stop generation upstream rather than paying for tokens nobody reads
+                await upstream.close()
+        
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        draft = {
+            "id": str(uuid.uuid4()),
+            "badge_number": current_user.badge_number,
+            "incident_type": report_data.get('incident_type', ''),
+            "location": report_data.get('location', ''),
+            "narrative": "".join(parts),
+            "ttft_ms": ttft_ms,
+            "total_ms": total_ms,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await db.report_drafts.insert_one(draft)
+        yield encode("done", {"draft_id": draft["id"], "ttft_ms": ttft_ms, "total_ms": total_ms})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        # No proxy buffering, or tokens arrive all at once at the end
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Derived search keys and link lists - no use to the model
+SUSPECT_CANDIDATE_PROJECTION = {"_id": 0, "citations": 0, "identity_keys": 0, "first_name_key": 0, "last_name_key": 0,
+                                "first_name_phonetic": 0, "last_name_phonetic": 0}
+MAX_SUSPECT_TOP_K = 50
+# Candidate fields sent to the model, most useful first; over budget, the tail goes first
+SUSPECT_PROMPT_FIELDS = ["id", "first_name", "last_name", "local_score", "dob", "sex", "race", "height", "weight",
+                         "hair_color", "eye_color", "local_matching_factors", "city", "warrants", "priors",
+                         "state", "notes", "middle_name", "address", "zip_code"]
+SUSPECT_PROMPT_KEEP_FIELDS = 4
+
 @api_router.post("/ai/match-suspect")
 async def match_suspect(suspect_data: dict, current_user: User = Depends(get_current_user)):
+    """Score the description against every person locally; the LLM only ranks the top candidates.
+    
+    Besides "description", accepts sex, race, age / age_min / age_max, height, weight,
+    hair_color, eye_color and city, plus top_k (default 10) and use_llm (default true;
+    false returns the local ranking without calling the model).
+    """
     try:
-        persons = await db.persons.find({}, {"_id": 0}).to_list(1000)
+        profile = parse_description(suspect_data)
+        index = await suspect_matcher.ready(db)
+        top_k = min(max(int(suspect_data.get("top_k") or DEFAULT_TOP_K), 1), MAX_SUSPECT_TOP_K)
+        ranked = index.score(profile, top_k)
+        if not ranked:
+            return {"matches": [], "candidates_scored": index.size}
+        
+        if suspect_data.get("use_llm") is False:
+            matches = [
+                {"person_id": person_id, "match_confidence": f"{round(score * 100)}%",
+                 "matching_factors": factors, "notes": "Local feature match"}
+                for person_id, score, factors in ranked
+            ]
+            return {"matches": matches, "candidates_scored": index.size}
+        
+        records = await db.persons.find(
+            {"id": {"$in": [person_id for person_id, _, _ in ranked]}}, SUSPECT_CANDIDATE_PROJECTION
+        ).to_list(top_k)
+        by_id = {record["id"]: record for record in records}
+        candidates = [
+            {**by_id[person_id], "local_score": score, "local_matching_factors": factors}
+            for person_id, score, factors in ranked if person_id in by_id
+        ]
         
-        prompt = f"""Analyze this suspect description and find potential matches from the database:
+        description = compact_json({key: value for key, value in suspect_data.items() if key not in ("top_k", "use_llm")})
+        template = f"""Analyze this suspect description and find potential matches from the database:
 
 Suspect Description:
-{json.dumps(suspect_data, indent=2)}
+{description}
 
-Database Records:
-{json.dumps(persons[:50], indent=2)}
+Candidate Records (pre-selected from {index.size} persons by physical characteristics, best first):
+{{candidates}}
 
 Identify the top 5 most likely matches based on physical characteristics, age, location, and any other relevant factors. 
 
 Return JSON array with: [{{"person_id": "id", "match_confidence": "percentage", "matching_factors": ["list"], "notes": "details"}}]"""
+        prompt, prompt_stats = fit_records(template, "{candidates}", candidates, SUSPECT_PROMPT_FIELDS,
+                                           MATCH_SUSPECT_PROMPT_BUDGET, keep_fields=SUSPECT_PROMPT_KEEP_FIELDS)
+        logger.info(f"match_suspect prompt: {prompt_stats}")
         
-        response_obj = await openai_client.chat.completions.create(
+        response_obj = await llm.chat(
+            "match_suspect", PRIORITY_INTERACTIVE,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are a law enforcement AI analyzing suspect information to find potential matches."},
@@ -1254,47 +2213,69 @@ Return JSON array with: [{{"person_id": "id", "match_confidence": "percentage",
         except:
             matches = []
         
-        return {"matches": matches}
+        return {"matches": matches, "candidates_scored": index.size, "prompt": prompt_stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Suspect matching failed: {str(e)}")
 
+MAX_CRIME_WINDOW_DAYS = 730
+# Summary fields the briefing is written from (no ids, timestamps or timings)
+CRIME_PROMPT_FIELDS = ["total_incidents", "counts_by_type", "trends", "predictions", "hotspots", "time_patterns",
+                       "recommendations"]
+# Dropped in this order while the prompt is over budget
+CRIME_PROMPT_DROP_ORDER = ["hotspots.location_key", "time_patterns.by_hour", "trends.by_type", "hotspots.top_types",
+                           "recommendations", "time_patterns.by_day"]
+
 @api_router.get("/ai/predict-crime")
-async def predict_crime(current_user: User = Depends(get_current_user)):
+async def predict_crime(
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    narrate: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Crime statistics over every report and closed call in the window (see crime_analytics).
+    
+    Returns counts_by_type, trends, hotspots, time_patterns, predictions and
+    recommendations computed locally; narrate=true adds an LLM-written briefing of
+    those numbers as "narrative".
+    """
+    window_days = min(max(window_days, 1), MAX_CRIME_WINDOW_DAYS)
     try:
-        reports = await db.reports.find({}, {"_id": 0}).sort("created_at", -1).to_list(100)
+        analysis = await crime_analytics.summary(db, window_days)
+        if not narrate:
+            return analysis
         
-        prompt = f"""Analyze these recent incident reports and provide predictive crime analysis:
+        template = f"""Write a short patrol briefing from these precomputed crime statistics for the last {window_days} days.
+Use only the numbers given; do not invent incidents, places or figures.
 
-{json.dumps(reports[:50], indent=2)}
+{{statistics}}
 
-Provide:
-1. Crime trend analysis (increasing/decreasing patterns)
-2. Hot spot locations
-3. Time-based patterns (day/time when crimes occur)
-4. Crime type predictions for next 7 days
-5. Patrol recommendations
-
-Return as JSON with keys: trends, hotspots, time_patterns, predictions, recommendations"""
+Cover the main trends, hot spot locations, peak days/times and the outlook for the next 7 days, then patrol recommendations."""
+        prompt, prompt_stats = fit_document(template, "{statistics}", analysis, CRIME_PROMPT_FIELDS,
+                                            CRIME_PROMPT_DROP_ORDER, PREDICT_CRIME_PROMPT_BUDGET)
+        logger.info(f"predict_crime prompt: {prompt_stats}")
         
-        response_obj = await openai_client.chat.completions.create(
+        response_obj = await llm.chat(
+            "predict_crime", PRIORITY_BACKGROUND,
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are a crime analyst AI providing predictive insights for law enforcement."},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.5
+            temperature=0.3
         )
-        response = response_obj.choices[0].message.content
-        
-        try:
-            analysis = json.loads(response)
-        except:
-            analysis = {"raw_response": response}
-        
-        return analysis
+        return {**analysis, "narrative": response_obj.choices[0].message.content, "prompt": prompt_stats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Predictive analysis failed: {str(e)}")
 
+@api_router.post("/admin/crime-analytics/rebuild")
+async def rebuild_crime_analytics(window_days: int = DEFAULT_WINDOW_DAYS, current_user: User = Depends(get_current_user)):
+    """Recount crime_stats from scratch (picks up back-dated or edited reports)."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    summary = await crime_analytics.refresh(db, min(max(window_days, 1), MAX_CRIME_WINDOW_DAYS), full=True)
+    return {"message": "Crime analytics rebuilt", "total_incidents": summary["total_incidents"],
+            "refresh_ms": summary["refresh_ms"]}
+
 # Reports
 @api_router.post("/reports", response_model=IncidentReport)
 async def create_report(report_data: dict, current_user: User = Depends(get_current_user)):
@@ -1307,16 +2288,182 @@ async def create_report(report_data: dict, current_user: User = Depends(get_curr
     return report
 
 @api_router.get("/reports")
-async def get_reports(current_user: User = Depends(get_current_user)):
-    reports = await db.reports.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    return reports
+async def get_reports(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """Incident reports, newest first (keyset-paginated, see keyset_page)."""
+    return await keyset_page(response, db.reports, {}, cursor, limit, fields, stream)
+
+# Bulk person / vehicle imports (see record_import)
+IMPORT_DIR = Path(os.environ.get('IMPORT_DIR', str(ROOT_DIR / 'imports')))
+IMPORT_KINDS = {
+    "persons": ImportKind("persons", PersonRecord, person_document, person_operation),
+    "vehicles": ImportKind("vehicles", VehicleRecord, VehicleRecord.model_dump, vehicle_operation),
+}
+# Running import / synthetic data tasks by job id, so a job is never run twice at once
+import_tasks: Dict[str, asyncio.Task] = {}
+
+async def run_record_import(job_id: str, path: Path, kind: str, fmt: str):
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            job = await run_import(db, job_id, f, IMPORT_KINDS[kind], fmt, source=str(path))
+        logger.info(f"Import {job_id} finished: {job['rows_done']} rows, {job['upserted']} new, "
+                    f"{job['modified']} updated, {job['invalid']} invalid")
+    except Exception as e:
+        logger.error(f"Import {job_id} failed: {e}")
+        return
+    finally:
+        import_tasks.pop(job_id, None)
+    # The bulk writes bypassed the in-process indexes; rebuild them behind the current ones.
+    # plate_analysis_cache needs nothing: its keys include the vehicle record version
+    hot_list.refresh(db)
+    if kind == "persons":
+        suspect_matcher.refresh(db)
+
+def start_record_import(job_id: str, path: Path, kind: str, fmt: str):
+    import_tasks[job_id] = asyncio.create_task(run_record_import(job_id, path, kind, fmt))
+
+@api_router.post("/admin/imports", status_code=202)
+async def create_record_import(
+    kind: str,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Import a CSV or NDJSON extract of persons or vehicles in the background.
+    
+    The upload is spooled to IMPORT_DIR and imported in chunks of upserts (see
+    record_import); poll GET /admin/imports/{job_id} for progress.
+    """
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if kind not in IMPORT_KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of {sorted(IMPORT_KINDS)}")
+    fmt = format or detect_format(file.filename or "")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(FORMATS)}")
+    
+    job_id = str(uuid.uuid4())
+    IMPORT_DIR.mkdir(exist_ok=True)
+    path = IMPORT_DIR / f"{job_id}.{fmt}"
+    with open(path, "wb") as out:
+        await asyncio.to_thread(shutil.copyfileobj, file.file, out, 1 << 20)
+    
+    job = new_job(job_id, kind, fmt, str(path))
+    job["filename"] = file.filename
+    await db[JOBS_COLLECTION].insert_one(job)
+    start_record_import(job_id, path, kind, fmt)
+    return {"job_id": job_id, "status": job["status"]}
+
+@api_router.get("/admin/imports/{job_id}")
+async def get_record_import(job_id: str, current_user: User = Depends(get_current_user)):
+    """Progress of an import: rows done, rows_per_second, counts and the first row errors."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db[JOBS_COLLECTION].find_one({"_id": job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    job["job_id"] = job.pop("_id")
+    job["active"] = job_id in import_tasks
+    return job
+
+@api_router.post("/admin/imports/{job_id}/resume", status_code=202)
+async def resume_record_import(job_id: str, current_user: User = Depends(get_current_user)):
+    """Carry on an import that failed or was cut off by a restart, from its last checkpoint."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db[JOBS_COLLECTION].find_one({"_id": job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    if job["status"] == STATUS_COMPLETED:
+        raise HTTPException(status_code=409, detail="Import already completed")
+    if job_id in import_tasks:
+        raise HTTPException(status_code=409, detail="Import is still running")
+    path = Path(job["source"])
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Import file is no longer available")
+    
+    start_record_import(job_id, path, job["collection"], job["format"])
+    return {"job_id": job_id, "status": "running", "rows_done": job["rows_done"]}
 
 # Seed Data
+SYNTHETIC_JOBS_COLLECTION = "synthetic_jobs"
+SYNTHETIC_WORKERS = int(os.environ.get('SYNTHETIC_WORKERS', synthetic_data.DEFAULT_WORKERS))
+
+async def run_synthetic_generation(job_id: str, counts: Dict[str, int], seed: int, end_date, history_days: int):
+    jobs = db[SYNTHETIC_JOBS_COLLECTION]
+    
+    async def save_progress(progress: dict):
+        await jobs.update_one({"_id": job_id}, {"$set": {"progress": progress}})
+    
+    try:
+        progress = await synthetic_data.generate(db, counts, seed=seed, end=end_date, history_days=history_days,
+                                                 workers=SYNTHETIC_WORKERS, on_progress=save_progress)
+        await jobs.update_one({"_id": job_id}, {"$set": {
+            "status": "completed", "progress": progress, "finished_at": datetime.now(timezone.utc).isoformat()}})
+        logger.info(f"Synthetic data {job_id} generated in {progress['seconds']}s: {progress['kinds']}")
+    except Exception as e:
+        logger.error(f"Synthetic data {job_id} failed: {e}")
+        await jobs.update_one({"_id": job_id}, {"$set": {"status": "failed", "error": str(e)}})
+        return
+    finally:
+        import_tasks.pop(job_id, None)
+    hot_list.refresh(db)
+    suspect_matcher.refresh(db)
+    if counts.keys() & {"reports", "calls"}:
+        # Back-dated incidents are only counted by a full rebuild
+        await crime_analytics.refresh(db, full=True)
+
 @api_router.post("/seed/generate")
-async def generate_seed_data(current_user: User = Depends(get_current_user)):
+async def generate_seed_data(
+    response: Response,
+    persons: int = 0,
+    vehicles: int = 0,
+    citations: int = 0,
+    reports: int = 0,
+    calls: int = 0,
+    seed: int = synthetic_data.DEFAULT_SEED,
+    end_date: Optional[str] = None,
+    history_days: int = synthetic_data.DEFAULT_HISTORY_DAYS,
+    current_user: User = Depends(get_current_user)
+):
+    """Two sample persons and vehicles; or, given counts, a synthetic data set of that size.
+    
+    Synthetic data (see synthetic_data) is generated in the background by
+    SYNTHETIC_WORKERS processes and is the same for the same seed, counts and
+    end_date; poll GET /seed/jobs/{job_id} for progress.
+    """
     if current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    counts = {kind: count for kind, count in zip(synthetic_data.KINDS, (persons, vehicles, citations, reports, calls))
+              if count}
+    if counts:
+        if any(not 0 < count <= synthetic_data.MAX_RECORDS_PER_KIND for count in counts.values()):
+            raise HTTPException(status_code=400, detail=f"Counts must be between 1 and {synthetic_data.MAX_RECORDS_PER_KIND}")
+        if not 1 <= history_days <= 3650:
+            raise HTTPException(status_code=400, detail="history_days must be between 1 and 3650")
+        try:
+            end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else datetime.now(timezone.utc).date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="end_date must be YYYY-MM-DD")
+        
+        job_id = str(uuid.uuid4())
+        await db[SYNTHETIC_JOBS_COLLECTION].insert_one({
+            "_id": job_id, "status": "running", "counts": counts, "seed": seed, "end_date": end.isoformat(),
+            "history_days": history_days, "started_at": datetime.now(timezone.utc).isoformat()
+        })
+        import_tasks[job_id] = asyncio.create_task(run_synthetic_generation(job_id, counts, seed, end, history_days))
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"job_id": job_id, "status": "running", "counts": counts}
+    
     persons_data = [
         PersonRecord(
             first_name="John", last_name="Doe", dob="1985-03-15",
@@ -1324,12 +2471,12 @@ async def generate_seed_data(current_user: User = Depends(get_current_user)):
             address="123 Main St", city="Los Angeles", state="CA",
             warrants=[{"type": "Traffic", "date": "2024-01-15", "amount": 250}],
             priors=[{"offense": "DUI", "date": "2020-06-10", "disposition": "Convicted"}]
-        ).model_dump(),
+        ),
         PersonRecord(
             first_name="Jane", last_name="Smith", dob="1990-07-22",
             drivers_license="S9876543", dl_state="CA",
             address="456 Oak Ave", city="San Diego", state="CA"
-        ).model_dump()
+        )
     ]
     
     vehicles_data = [
@@ -1348,14 +2495,33 @@ async def generate_seed_data(current_user: User = Depends(get_current_user)):
     
     existing_persons = await db.persons.count_documents({})
     if existing_persons == 0:
-        await db.persons.insert_many(persons_data)
+        await db.persons.insert_many([person_document(person) for person in persons_data])
+        for person in persons_data:
+            suspect_matcher.upsert(person.model_dump())
+            hot_list.upsert_person(person.model_dump())
     
     existing_vehicles = await db.vehicles.count_documents({})
     if existing_vehicles == 0:
         await db.vehicles.insert_many(vehicles_data)
+        for vehicle in vehicles_data:
+            plate_analysis_cache.invalidate_plate(vehicle["plate_number"])
+            hot_list.upsert_vehicle(vehicle)
     
     return {"message": "Sample data generated", "persons": len(persons_data), "vehicles": len(vehicles_data)}
 
+@api_router.get("/seed/jobs/{job_id}")
+async def get_synthetic_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Progress of a synthetic data generation: per-kind inserted / skipped and rows_per_second."""
+    if current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    job = await db[SYNTHETIC_JOBS_COLLECTION].find_one({"_id": job_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    job["job_id"] = job.pop("_id")
+    job["active"] = job_id in import_tasks
+    return job
+
 # Serve audio files for ElevenLabs - moved to /api/audio for ingress routing
 @api_router.get("/audio/{filename}")
 async def serve_audio(filename: str):
@@ -1407,7 +2573,7 @@ async def websocket_media_stream(websocket: WebSocket):
                 logger.info(f"Media stream started for call {call_sid}, stream {stream_sid}")
                 
                 # Create realtime dispatcher with stream_sid
-                dispatcher = RealtimeDispatcher(call_sid, db, stream_sid)
+                dispatcher = RealtimeDispatcher(call_sid, db, stream_sid, events=call_events, transcripts=transcript_hub)
                 
                 # Run the bidirectional audio streaming
                 await dispatcher.run(websocket)
@@ -1433,12 +2599,115 @@ async def websocket_media_stream(websocket: WebSocket):
                 pass
 
 
+WEBSOCKET_KEEPALIVE_SECONDS = 20
+
+# WebSocket push of active call changes to dispatcher consoles
+@app.websocket("/ws/calls")
+async def websocket_call_updates(websocket: WebSocket, token: str, resume: Optional[int] = None):
+    """Snapshot (or the calls changed since ?resume=<seq>) followed by live call deltas.
+    
+    Every message carries seq, the board sequence of the write (see call_board), so
+    reconnect to any worker with ?resume=<highest seq seen> to pick up where you
+    left off: the calls changed since then come as {"type": "changes", "calls"}.
+    Consoles that fall too far behind are closed with 4000 and should reconnect
+    without resume to get a fresh snapshot. Idle sockets get {"type": "ping"}.
+    """
+    try:
+        await user_from_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    subscriber = call_events.subscribe()
+    try:
+        board_seq = await current_update_seq(db)
+        calls = None
+        if resume is not None:
+            calls = await db.active_calls.aggregate(changed_since_pipeline(resume)).to_list(ACTIVE_CALLS_LIMIT)
+            if len(calls) < ACTIVE_CALLS_LIMIT:
+                await websocket.send_json({"type": "changes", "seq": board_seq, "calls": calls})
+            else:
+                calls = None  # more changed than one page: start over
+        if calls is None:
+            calls = await db.active_calls.aggregate(active_calls_pipeline()).to_list(ACTIVE_CALLS_LIMIT)
+            await websocket.send_json({"type": "snapshot", "seq": board_seq, "calls": calls})
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=WEBSOCKET_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing a quiet board, and notices dead sockets
+                await websocket.send_json({"type": "ping"})
+                continue
+            if subscriber.dropped:
+                await websocket.close(code=4000)
+                break
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"/ws/calls error: {e}")
+    finally:
+        call_events.unsubscribe(subscriber)
+
+@app.websocket("/ws/calls/{call_id}/transcript")
+async def websocket_call_transcript(websocket: WebSocket, call_id: str, token: str):
+    """Live caller / dispatcher transcript for one call, as it is spoken.
+    
+    Messages are {"type": "caller.delta" | "caller.final" | "dispatcher.delta" |
+    "dispatcher.final", "item_id", "text", "at"} and finally {"type": "end"} when the
+    media stream stops. Earlier turns come from /api/calls/{call_id}/transcript.
+    """
+    try:
+        await user_from_token(token)
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    
+    call = await db.active_calls.find_one({"id": call_id}, {"_id": 0, "call_sid": 1})
+    if not call:
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    call_sid = call["call_sid"]
+    subscriber = transcript_hub.subscribe(call_sid)
+    if subscriber is None:
+        # Too many consoles on this call already
+        await websocket.close(code=1013)
+        return
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=WEBSOCKET_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Nothing said for a while (or not a realtime call): a send notices dead sockets
+                await websocket.send_json({"type": "ping"})
+                continue
+            if subscriber.dropped:
+                await websocket.close(code=4000)
+                break
+            await websocket.send_json(event)
+            if event["type"] == "end":
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Transcript stream error for call {call_id}: {e}")
+    finally:
+        transcript_hub.unsubscribe(call_sid, subscriber)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination metadata read by the dashboards
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "X-Cache", "X-Hot-List"],
 )
 
 logging.basicConfig(
@@ -1447,6 +2716,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def bootstrap_db():
+    applied = await bootstrap_database(db)
+    if applied:
+        logger.info(f"Applied database migrations: {applied}")
+
+@app.on_event("startup")
+async def warm_hot_list():
+    # Serve from the last snapshot at once; ready() rebuilds from Mongo behind it
+    hot_list.load_snapshot()
+    app.state.hot_list_task = asyncio.create_task(hot_list.ready(db))
+
+async def poll_violation_catalog():
+    while True:
+        await asyncio.sleep(VIOLATION_CATALOG_POLL_SECONDS)
+        violation_catalog.reload_if_changed()
+
+@app.on_event("startup")
+async def watch_violation_catalog():
+    # Hot reload of fine changes published by another worker or an edited file
+    app.state.violation_catalog_task = asyncio.create_task(poll_violation_catalog())
+
+@app.on_event("startup")
+async def load_prompt_encodings():
+    # tiktoken may download its BPE file; prompts are estimated until it is in
+    app.state.prompt_encodings_task = asyncio.create_task(load_encodings(PROMPT_BUDGET_MODELS))
+
+@app.on_event("startup")
+async def start_call_event_source():
+    if call_events.source == SOURCE_CHANGE_STREAM:
+        app.state.call_events_task = asyncio.create_task(watch_active_calls(db, call_events))
+        logger.info("Feeding /ws/calls from the active_calls change stream")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    password_pool.shutdown()
+    if getattr(app.state, "call_events_task", None):
+        app.state.call_events_task.cancel()
+    if getattr(app.state, "prompt_encodings_task", None):
+        app.state.prompt_encodings_task.cancel()
+    if getattr(app.state, "violation_catalog_task", None):
+        app.state.violation_catalog_task.cancel()
+    # Interrupted imports keep their checkpoint and can be resumed
+    for task in list(import_tasks.values()):
+        task.cancel()
     client.close()
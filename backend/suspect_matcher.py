@@ -0,0 +1,447 @@
+"""
+Local candidate scoring for match_suspect.
+
+Persons are held as a columnar NumPy feature matrix (date of birth, height
+and weight as numbers, coded sex / race / eye / hair / city) so a suspect
+description can be scored against every record in one vectorized pass.
+Only the top-k candidates go to the LLM, or straight back to the caller in
+no-LLM mode. The matrix is loaded from Mongo on first use, kept current by
+upsert() on this worker's person writes, and rebuilt in the background every
+SUSPECT_INDEX_REFRESH_SECONDS to pick up writes made by other workers.
+Parsing persons into rows runs in a thread, and writes made while a build
+is reading Mongo are replayed onto the new matrix before it is swapped in.
+"""
+import asyncio
+import logging
+import re
+import time
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+LOAD_BATCH_SIZE = 10000
+
+# Fields needed to build a row
+PERSON_FEATURE_FIELDS = ["id", "dob", "height", "weight", "sex", "race", "eye_color", "hair_color", "city"]
+
+# Relative weight of each feature in the score, and how far off a numeric
+# feature can be before it contributes nothing
+WEIGHTS = {"sex": 3.0, "age": 2.0, "race": 2.0, "height": 1.5, "weight": 1.0, "hair": 1.0, "eye": 0.75, "city": 1.0}
+AGE_TOLERANCE_YEARS = 8.0
+HEIGHT_TOLERANCE_IN = 5.0
+WEIGHT_TOLERANCE_LB = 40.0
+
+SEX_ALIASES = {"m": "M", "male": "M", "man": "M", "guy": "M", "boy": "M",
+               "f": "F", "female": "F", "woman": "F", "girl": "F", "lady": "F"}
+RACE_ALIASES = {"w": "W", "white": "W", "caucasian": "W", "b": "B", "black": "B", "african american": "B",
+                "h": "H", "hispanic": "H", "latino": "H", "latina": "H", "a": "A", "asian": "A",
+                "i": "I", "native american": "I", "indian": "I"}
+# NCIC-style codes as well as words
+HAIR_ALIASES = {"blk": "black", "bro": "brown", "brn": "brown", "bln": "blond", "blonde": "blond",
+                "red": "red", "ginger": "red", "gry": "gray", "grey": "gray", "whi": "white",
+                "bal": "bald", "sdy": "blond", "sandy": "blond"}
+EYE_ALIASES = {"blu": "blue", "bro": "brown", "brn": "brown", "grn": "green", "haz": "hazel",
+               "gry": "gray", "grey": "gray", "blk": "black"}
+
+CATEGORICAL = ("sex", "race", "hair", "eye", "city")
+
+
+def _alias(value: Optional[str], aliases: Dict[str, str], keep_unknown: bool = True) -> Optional[str]:
+    if not value:
+        return None
+    key = re.sub(r"\s+", " ", str(value).strip().lower())
+    if key in aliases:
+        return aliases[key]
+    return key if keep_unknown and key else None
+
+
+def parse_height(value: Any) -> float:
+    """Height in inches from 5'10", 5-10, 510, 70 or 178 cm; NaN when unknown."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_height_text(str(value).strip().lower())
+
+
+# Recorded heights / weights / DOBs repeat a lot, which makes the initial load mostly cache hits
+@lru_cache(maxsize=4096)
+def _parse_height_text(text: str) -> float:
+    match = re.match(r"^(\d)\s*(?:'|ft|feet|foot|-|\s)\s*(\d{1,2})?", text)
+    if match:
+        return int(match.group(1)) * 12 + int(match.group(2) or 0)
+    match = re.match(r"^(\d{2,3})\s*cm", text)
+    if match:
+        return int(match.group(1)) / 2.54
+    if text.isdigit():
+        number = int(text)
+        if number >= 100 and number < 1000:
+            return (number // 100) * 12 + number % 100  # 510 -> 5'10"
+        return float(number)
+    return np.nan
+
+
+def parse_weight(value: Any) -> float:
+    """Weight in pounds from 180, 180 lbs or 82 kg; NaN when unknown."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_weight_text(str(value).strip().lower())
+
+
+@lru_cache(maxsize=4096)
+def _parse_weight_text(text: str) -> float:
+    match = re.match(r"^(\d{2,3})\s*(kg|kgs|kilos?)?", text)
+    if not match:
+        return np.nan
+    return int(match.group(1)) * (2.2046 if match.group(2) else 1.0)
+
+
+@lru_cache(maxsize=65536)
+def _dob_ordinal(dob: Optional[str]) -> int:
+    try:
+        return date.fromisoformat(str(dob)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+def person_features(person: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "dob": _dob_ordinal(person.get("dob")),
+        "height": parse_height(person.get("height")),
+        "weight": parse_weight(person.get("weight")),
+        "sex": _alias(person.get("sex"), SEX_ALIASES, keep_unknown=False),
+        "race": _alias(person.get("race"), RACE_ALIASES),
+        "hair": _alias(person.get("hair_color"), HAIR_ALIASES),
+        "eye": _alias(person.get("eye_color"), EYE_ALIASES),
+        "city": _alias(person.get("city"), {}),
+    }
+
+
+def parse_description(suspect_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Suspect profile from structured fields and/or a free-text description."""
+    text = str(suspect_data.get("description") or "").lower()
+    profile: Dict[str, Any] = {}
+
+    sex = _alias(suspect_data.get("sex"), SEX_ALIASES, keep_unknown=False)
+    if not sex:
+        match = re.search(r"\b(male|female|man|woman|guy|boy|girl|lady)\b", text)
+        sex = SEX_ALIASES[match.group(1)] if match else None
+    if sex:
+        profile["sex"] = sex
+
+    race = _alias(suspect_data.get("race"), RACE_ALIASES)
+    if not race:
+        match = re.search(r"\b(white|caucasian|black|african american|hispanic|latino|latina|asian|native american)\b", text)
+        race = RACE_ALIASES[match.group(1)] if match else None
+    if race:
+        profile["race"] = race
+
+    if suspect_data.get("age_min") or suspect_data.get("age_max"):
+        profile["age"] = (float(suspect_data.get("age_min") or 0), float(suspect_data.get("age_max") or 120))
+    elif suspect_data.get("age"):
+        age = float(suspect_data["age"])
+        profile["age"] = (age - 3, age + 3)
+    else:
+        decade = re.search(r"\b(early|mid|late)?[\s-]*(\d)0'?s\b", text)
+        span = re.search(r"\b(\d{2})\s*(?:-|to)\s*(\d{2})\s*(?:years|yrs|yo|y/o)?\b", text)
+        single = re.search(r"\b(?:age\s*(\d{2})|(\d{2})\s*(?:years? old|yrs? old|yo|y/o))\b", text)
+        if decade:
+            low = int(decade.group(2)) * 10
+            profile["age"] = {"early": (low, low + 3), "mid": (low + 3, low + 7), "late": (low + 6, low + 9)}.get(
+                decade.group(1), (low, low + 9))
+        elif span:
+            profile["age"] = (float(span.group(1)), float(span.group(2)))
+        elif single:
+            age = float(single.group(1) or single.group(2))
+            profile["age"] = (age - 3, age + 3)
+
+    height = parse_height(suspect_data.get("height"))
+    if np.isnan(height):
+        match = re.search(r"\b(\d)\s*(?:'|ft|feet|foot)\s*(\d{1,2})?", text)
+        height = int(match.group(1)) * 12 + int(match.group(2) or 0) if match else np.nan
+    if not np.isnan(height):
+        profile["height"] = float(height)
+
+    weight = parse_weight(suspect_data.get("weight"))
+    if np.isnan(weight):
+        match = re.search(r"\b(\d{2,3})\s*(lbs?|pounds|kg|kgs|kilos?)\b", text)
+        if match:
+            weight = int(match.group(1)) * (2.2046 if match.group(2).startswith("k") else 1.0)
+    if not np.isnan(weight):
+        profile["weight"] = float(weight)
+
+    hair = _alias(suspect_data.get("hair_color"), HAIR_ALIASES)
+    if not hair:
+        match = re.search(r"\b(black|brown|blonde?|red|ginger|gr[ae]y|white|sandy)[\s-]+hair(?:ed)?\b|\b(bald|blonde?)\b", text)
+        hair = _alias(match.group(1) or match.group(2), HAIR_ALIASES) if match else None
+    if hair:
+        profile["hair"] = hair
+
+    eye = _alias(suspect_data.get("eye_color"), EYE_ALIASES)
+    if not eye:
+        match = re.search(r"\b(blue|brown|green|hazel|gr[ae]y|black)[\s-]+eye[sd]?\b", text)
+        eye = _alias(match.group(1), EYE_ALIASES) if match else None
+    if eye:
+        profile["eye"] = eye
+
+    city = _alias(suspect_data.get("city"), {})
+    if city:
+        profile["city"] = city
+    elif text:
+        profile["_text"] = text  # cities are matched against the index vocabulary
+    return profile
+
+
+class SuspectIndex:
+    """Columnar feature matrix of persons with vectorized top-k scoring."""
+
+    def __init__(self):
+        self.size = 0
+        self.ids: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.valid = np.zeros(0, dtype=bool)
+        self.dob = np.zeros(0, dtype=np.int32)
+        self.height = np.zeros(0, dtype=np.float32)
+        self.weight = np.zeros(0, dtype=np.float32)
+        self.codes = {column: np.zeros(0, dtype=np.int32) for column in CATEGORICAL}
+        # value -> code per categorical column; 0 means unknown
+        self.vocab: Dict[str, Dict[str, int]] = {column: {} for column in CATEGORICAL}
+        self.loaded_at: Optional[float] = None
+        self.last_score_ms: Optional[float] = None
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        if not value:
+            return 0
+        vocab = self.vocab[column]
+        if value not in vocab:
+            vocab[value] = len(vocab) + 1
+        return vocab[value]
+
+    def _grow(self, capacity: int):
+        if capacity <= len(self.valid):
+            return
+        capacity = max(capacity, len(self.valid) * 2, 1024)
+
+        def grown(array: np.ndarray, fill) -> np.ndarray:
+            bigger = np.full(capacity, fill, dtype=array.dtype)
+            bigger[:self.size] = array[:self.size]
+            return bigger
+
+        self.valid = grown(self.valid, False)
+        self.dob = grown(self.dob, 0)
+        self.height = grown(self.height, np.nan)
+        self.weight = grown(self.weight, np.nan)
+        self.codes = {column: grown(codes, 0) for column, codes in self.codes.items()}
+
+    def extend(self, persons: Iterable[Dict[str, Any]]):
+        """Append many persons at once (initial load); existing ids are updated in place."""
+        batch = []
+        for person in persons:
+            if person.get("id") in self.rows:
+                self.upsert(person)
+            else:
+                batch.append(person)
+        if not batch:
+            return
+        start = self.size
+        self._grow(start + len(batch))
+        features = [person_features(p) for p in batch]
+        end = start + len(batch)
+        self.valid[start:end] = True
+        self.dob[start:end] = [f["dob"] for f in features]
+        self.height[start:end] = [f["height"] for f in features]
+        self.weight[start:end] = [f["weight"] for f in features]
+        for column in CATEGORICAL:
+            self.codes[column][start:end] = [self._code(column, f[column]) for f in features]
+        for offset, person in enumerate(batch):
+            self.rows[person["id"]] = start + offset
+            self.ids.append(person["id"])
+        self.size = end
+
+    def upsert(self, person: Dict[str, Any]):
+        row = self.rows.get(person["id"])
+        if row is None:
+            self.extend([person])
+            return
+        features = person_features(person)
+        self.valid[row] = True
+        self.dob[row] = features["dob"]
+        self.height[row] = features["height"]
+        self.weight[row] = features["weight"]
+        for column in CATEGORICAL:
+            self.codes[column][row] = self._code(column, features[column])
+
+    def remove(self, person_id: str):
+        row = self.rows.pop(person_id, None)
+        if row is not None:
+            self.valid[row] = False
+            self.ids[row] = None
+
+    def _resolve(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Profile with categorical values turned into codes (None when never seen)."""
+        resolved = {k: v for k, v in profile.items() if k not in CATEGORICAL and k != "_text"}
+        for column in CATEGORICAL:
+            if column in profile:
+                resolved[column] = self.vocab[column].get(profile[column], -1)
+        text = profile.get("_text")
+        if text and "city" not in resolved:
+            words = re.findall(r"[a-z]+", text)
+            for n in (3, 2, 1):
+                for i in range(len(words) - n + 1):
+                    code = self.vocab["city"].get(" ".join(words[i:i + n]))
+                    if code:
+                        resolved["city"] = code
+                        break
+                if "city" in resolved:
+                    break
+        return resolved
+
+    def score(self, profile: Dict[str, Any], k: int = DEFAULT_TOP_K, today: Optional[date] = None) -> List[Tuple[str, float, List[str]]]:
+        """Top-k (person_id, score 0-1, matching factors) for a parsed suspect profile."""
+        resolved = self._resolve(profile)
+        n = self.size
+        if n == 0 or not resolved:
+            return []
+        started = time.perf_counter()
+        valid = self.valid[:n].copy()
+        total = np.zeros(n, dtype=np.float32)
+        weight_sum = 0.0
+
+        for column in CATEGORICAL:
+            if column not in resolved:
+                continue
+            codes = self.codes[column][:n]
+            matched = codes == resolved[column]
+            if column == "sex":
+                # A recorded, different sex rules the person out
+                valid &= (codes == 0) | matched
+            total += WEIGHTS[column] * matched
+            weight_sum += WEIGHTS[column]
+
+        if "age" in resolved:
+            low, high = resolved["age"]
+            today_ordinal = (today or date.today()).toordinal()
+            dob = self.dob[:n]
+            age = (today_ordinal - dob) / 365.25
+            off_by = np.maximum(np.maximum(low - age, age - high), 0)
+            closeness = np.clip(1 - off_by / AGE_TOLERANCE_YEARS, 0, 1)
+            total += WEIGHTS["age"] * np.where(dob > 0, closeness, 0).astype(np.float32)
+            weight_sum += WEIGHTS["age"]
+
+        for column, values, tolerance in (("height", self.height, HEIGHT_TOLERANCE_IN),
+                                          ("weight", self.weight, WEIGHT_TOLERANCE_LB)):
+            if column in resolved:
+                closeness = np.clip(1 - np.abs(values[:n] - resolved[column]) / tolerance, 0, 1)
+                total += WEIGHTS[column] * np.nan_to_num(closeness, nan=0.0)
+                weight_sum += WEIGHTS[column]
+
+        scores = np.where(valid, total / weight_sum, -1.0)
+        k = min(k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        self.last_score_ms = (time.perf_counter() - started) * 1000
+        return [(self.ids[row], round(float(scores[row]), 4), self.factors(int(row), resolved))
+                for row in top if scores[row] > 0]
+
+    def factors(self, row: int, resolved: Dict[str, Any]) -> List[str]:
+        """Which parts of the description this row matched."""
+        found = [column for column in CATEGORICAL if column in resolved and self.codes[column][row] == resolved[column]]
+        if "age" in resolved and self.dob[row]:
+            age = (date.today().toordinal() - int(self.dob[row])) / 365.25
+            if resolved["age"][0] - 2 <= age <= resolved["age"][1] + 2:
+                found.append("age")
+        for column, values, tolerance in (("height", self.height, 2.0), ("weight", self.weight, 15.0)):
+            if column in resolved and abs(float(values[row]) - resolved[column]) <= tolerance:
+                found.append(column)
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "persons": len(self.rows),
+            "rows": self.size,
+            "bytes": int(self.valid.nbytes + self.dob.nbytes + self.height.nbytes + self.weight.nbytes
+                         + sum(codes.nbytes for codes in self.codes.values())),
+            "loaded_at": self.loaded_at,
+            "last_score_ms": self.last_score_ms,
+        }
+
+
+class SuspectMatcher:
+    """Owns the live SuspectIndex: lazy first load, periodic background rebuilds."""
+
+    def __init__(self, refresh_seconds: float = 600):
+        self.refresh_seconds = refresh_seconds
+        self.index = SuspectIndex()
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Person writes applied while a build runs, replayed onto its result
+        self._writes_during_build: Optional[List[Dict[str, Any]]] = None
+
+    @staticmethod
+    async def build(db) -> SuspectIndex:
+        index = SuspectIndex()
+        projection = {"_id": 0, **{field: 1 for field in PERSON_FEATURE_FIELDS}}
+        batch = []
+        # Feature parsing is pure Python: it runs in a thread, one batch at a time, while the next batch is read
+        parsing = None
+        async for person in db.persons.find({}, projection).batch_size(LOAD_BATCH_SIZE):
+            batch.append(person)
+            if len(batch) >= LOAD_BATCH_SIZE:
+                if parsing:
+                    await parsing
+                parsing = asyncio.ensure_future(asyncio.to_thread(index.extend, batch))
+                batch = []
+        if parsing:
+            await parsing
+        await asyncio.to_thread(index.extend, batch)
+        index.loaded_at = time.time()
+        return index
+
+    async def _load(self, db) -> SuspectIndex:
+        """build(), plus this worker's person writes made while it ran."""
+        self._writes_during_build = []
+        try:
+            fresh = await self.build(db)
+            for person in self._writes_during_build:
+                fresh.upsert(person)
+        finally:
+            self._writes_during_build = None
+        return fresh
+
+    async def _rebuild(self, db):
+        try:
+            fresh = await self._load(db)
+            self.index = fresh
+            logger.info(f"Suspect index rebuilt: {fresh.size} persons")
+        except Exception as e:
+            logger.error(f"Suspect index rebuild failed: {e}")
+
+    async def ready(self, db) -> SuspectIndex:
+        if self.index.loaded_at is None:
+            async with self._lock:
+                if self.index.loaded_at is None:
+                    self.index = await self._load(db)
+        elif (time.time() - self.index.loaded_at > self.refresh_seconds
+              and (self._refresh_task is None or self._refresh_task.done())):
+            # Keep serving the current matrix while a new one is built
+            self._refresh_task = asyncio.create_task(self._rebuild(db))
+        return self.index
+
+    def refresh(self, db):
+        """Rebuild in the background now, e.g. after a bulk import (no-op until the first load)."""
+        if self.index.loaded_at is not None and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._rebuild(db))
+
+    def upsert(self, person: Dict[str, Any]):
+        """Apply a person write made by this worker (only recorded for the build until the first load)."""
+        if self._writes_during_build is not None:
+            self._writes_during_build.append(person)
+        if self.index.loaded_at is not None:
+            self.index.upsert(person)
@@ -0,0 +1,751 @@
+"""
+Deterministic synthetic records for load and search benchmarks.
+
+generate_seed_data inserts two persons and two vehicles, which says nothing
+about how search, the hot list or the suspect pre-filter behave at scale.
+This generates millions of persons, vehicles, citations, incident reports
+and closed (historical) calls with realistic shape:
+
+  - names drawn Zipf-weighted from common US first names (by sex) and
+    surnames, so "Smith" and "Garcia" repeat the way they do in real data
+  - ages, heights, weights, hair and eye colour by sex; a few percent of
+    persons with warrants or priors
+  - plates in each state's real format (CA 1ABC234, TX ABC1234, vanity
+    plates), makes / models / years skewed towards common and recent cars,
+    a few expired or flagged
+  - incident locations clustered on per-city hotspots (a street block or an
+    intersection, Zipf-weighted) with the rest spread over ordinary
+    addresses, so crime_analytics has hotspots to find
+  - incident times following hour-of-day profiles per incident type (traffic
+    stops at commute hours, DUI and assaults at night, burglary by day) and
+    a weekend lift
+  - citations priced from the violation catalog, with repeat offenders
+
+Output depends only on (seed, counts, end date). Records are made in
+blocks of BLOCK_SIZE; each block draws from its own RNG seeded by (seed,
+kind, block), so blocks can be built in any order by any number of worker
+processes and still come out identical, and ids are derived from the seed
+and record number. Re-running a generation therefore skips what is already
+there (unordered inserts, duplicate ids ignored). Citations reference
+persons and vehicles of the block with the same number (modulo), which is
+rebuilt from its seed rather than read back from Mongo.
+
+Run it with generate_synthetic_data.py or POST /api/seed/generate with
+counts. One worker builds about 25k persons, 18k vehicles, 45k citations or
+70k reports / calls a second; inserts overlap with building, up to 2 blocks
+per worker in flight.
+
+Persons whose name + DOB collide with an earlier one (0.2% of a million
+persons, growing linearly with the count) are skipped by the identity_keys
+unique index like any other duplicate. They are the same identity, so
+citations and reports that refer to a skipped person are pointed at the
+person who holds its identity key instead (see identity_aliases).
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from fine_codes import catalog as violation_catalog
+from name_search import person_identity_keys, person_name_keys
+from plate_search import vehicle_plate_keys
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 10_000
+DEFAULT_SEED = 42
+DEFAULT_HISTORY_DAYS = 365
+DEFAULT_WORKERS = 4
+MAX_RECORDS_PER_KIND = 50_000_000
+
+# Generation order: citations link to persons, so persons come first
+KINDS = ("persons", "vehicles", "citations", "reports", "calls")
+COLLECTIONS = {"persons": "persons", "vehicles": "vehicles", "citations": "citations",
+               "reports": "reports", "calls": "active_calls"}
+ID_NAMESPACE = uuid.UUID("6f1c2d4e-8a7b-4c3d-9e0f-1a2b3c4d5e6f")
+
+
+def zipf_weights(n: int, exponent: float = 1.0) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def normalized(values) -> np.ndarray:
+    weights = np.asarray(values, dtype=float)
+    return weights / weights.sum()
+
+
+# Ordered by frequency (SSA / Census lists); sampled Zipf-weighted by rank
+MALE_FIRST_NAMES = [
+    "James", "Robert", "John", "Michael", "David", "William", "Richard", "Joseph", "Thomas", "Christopher",
+    "Charles", "Daniel", "Matthew", "Anthony", "Mark", "Donald", "Steven", "Andrew", "Paul", "Joshua",
+    "Kenneth", "Kevin", "Brian", "George", "Timothy", "Ronald", "Jason", "Edward", "Jeffrey", "Ryan",
+    "Jacob", "Gary", "Nicholas", "Eric", "Jonathan", "Stephen", "Larry", "Justin", "Scott", "Brandon",
+    "Benjamin", "Samuel", "Gregory", "Alexander", "Patrick", "Frank", "Raymond", "Jack", "Dennis", "Jerry",
+    "Tyler", "Aaron", "Jose", "Adam", "Nathan", "Henry", "Zachary", "Douglas", "Peter", "Kyle",
+    "Noah", "Ethan", "Jeremy", "Walter", "Christian", "Keith", "Roger", "Terry", "Austin", "Sean",
+    "Gerald", "Carl", "Harold", "Dylan", "Arthur", "Lawrence", "Jordan", "Jesse", "Bryan", "Billy",
+    "Bruce", "Gabriel", "Joe", "Logan", "Alan", "Juan", "Albert", "Willie", "Elijah", "Wayne",
+    "Randy", "Vincent", "Mason", "Roy", "Ralph", "Bobby", "Russell", "Bradley", "Philip", "Eugene",
+    "Carlos", "Luis", "Miguel", "Jorge", "Antonio", "Luke", "Liam", "Marcus", "Hector", "Wei",
+]
+FEMALE_FIRST_NAMES = [
+    "Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica", "Karen", "Sarah",
+    "Lisa", "Nancy", "Sandra", "Betty", "Ashley", "Emily", "Kimberly", "Margaret", "Donna", "Michelle",
+    "Carol", "Amanda", "Melissa", "Deborah", "Stephanie", "Rebecca", "Sharon", "Laura", "Cynthia", "Dorothy",
+    "Amy", "Kathleen", "Angela", "Shirley", "Emma", "Brenda", "Pamela", "Nicole", "Anna", "Samantha",
+    "Katherine", "Christine", "Debra", "Rachel", "Carolyn", "Janet", "Maria", "Olivia", "Heather", "Helen",
+    "Catherine", "Diane", "Julie", "Victoria", "Joyce", "Lauren", "Kelly", "Christina", "Ruth", "Joan",
+    "Virginia", "Judith", "Evelyn", "Hannah", "Andrea", "Megan", "Cheryl", "Jacqueline", "Madison", "Teresa",
+    "Abigail", "Sophia", "Martha", "Sara", "Gloria", "Janice", "Kathryn", "Ann", "Isabella", "Judy",
+    "Charlotte", "Julia", "Grace", "Amber", "Alice", "Jean", "Denise", "Frances", "Danielle", "Marilyn",
+    "Natalie", "Beverly", "Diana", "Brittany", "Theresa", "Kayla", "Alexis", "Doris", "Lori", "Tiffany",
+    "Rosa", "Guadalupe", "Ana", "Veronica", "Yesenia", "Mei", "Priya", "Aaliyah", "Ava", "Mia",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+    "Green", "Adams", "Nelson", "Baker", "Hall", "Rivera", "Campbell", "Mitchell", "Carter", "Roberts",
+    "Gomez", "Phillips", "Evans", "Turner", "Diaz", "Parker", "Cruz", "Edwards", "Collins", "Reyes",
+    "Stewart", "Morris", "Morales", "Murphy", "Cook", "Rogers", "Gutierrez", "Ortiz", "Morgan", "Cooper",
+    "Peterson", "Bailey", "Reed", "Kelly", "Howard", "Ramos", "Kim", "Cox", "Ward", "Richardson",
+    "Watson", "Brooks", "Chavez", "Wood", "James", "Bennett", "Gray", "Mendoza", "Ruiz", "Hughes",
+    "Price", "Alvarez", "Castillo", "Sanders", "Patel", "Myers", "Long", "Ross", "Foster", "Jimenez",
+    "Powell", "Jenkins", "Perry", "Russell", "Sullivan", "Bell", "Coleman", "Butler", "Henderson", "Barnes",
+    "Gonzales", "Fisher", "Vasquez", "Simmons", "Romero", "Jordan", "Patterson", "Alexander", "Hamilton", "Graham",
+    "Reynolds", "Griffin", "Wallace", "Moreno", "West", "Cole", "Hayes", "Bryant", "Herrera", "Gibson",
+    "Ellis", "Tran", "Medina", "Aguilar", "Stevens", "Murray", "Ford", "Castro", "Marshall", "Owens",
+    "Harrison", "Fernandez", "McDonald", "Woods", "Washington", "Kennedy", "Wells", "Vargas", "Henry", "Chen",
+    "Freeman", "Webb", "Tucker", "Guzman", "Burns", "Crawford", "Olson", "Simpson", "Porter", "Hunter",
+    "Gordon", "Mendez", "Silva", "Shaw", "Snyder", "Mason", "Dixon", "Munoz", "Hunt", "Hicks",
+    "Holmes", "Palmer", "Wagner", "Black", "Robertson", "Boyd", "Rose", "Stone", "Salazar", "Fox",
+    "Warren", "Mills", "Meyer", "Rice", "Schmidt", "Garza", "Daniels", "Ferguson", "Nichols", "Stephens",
+    "Soto", "Weaver", "Ryan", "Gardner", "Payne", "Grant", "Dunn", "Kelley", "Spencer", "Hawkins",
+    "Wang", "Liu", "Zhang", "Singh", "Pham", "Le", "Park", "Choi", "Yamamoto", "O'Brien",
+]
+# The long tails of rarer names, built from common stems and endings. Without
+# them name + DOB (an identity key) would collide for several percent of a
+# few million persons; with them about 0.2% of a million do
+FIRST_NAME_STEMS = ["Ja", "Ka", "Ma", "Da", "Le", "Ri", "Ty", "Bra", "Ca", "Jo", "Ne", "Ro", "Sa", "Ze", "Ari",
+                    "Eli", "Mi", "No", "Re", "Si", "Ay", "Bri", "Ker", "Lu", "Tre"]
+FIRST_NAME_ENDINGS = ["den", "son", "ley", "ra", "na", "lyn", "ton", "ric", "vin", "ya",
+                      "lan", "mir", "ia", "el", "on", "ette", "ias", "wyn", "ren", "isa"]
+TAIL_FIRST_NAMES = [stem + ending for stem in FIRST_NAME_STEMS for ending in FIRST_NAME_ENDINGS]
+SURNAME_STEMS = [
+    "Ander", "Bar", "Cal", "Dal", "Ed", "Fair", "Gold", "Hart", "Ivan", "Kirk", "Lang", "Mar", "Nor", "Ost", "Pem",
+    "Quin", "Rad", "Stan", "Thorn", "Vel", "Wal", "York", "Zim", "Bel", "Cor", "Dun", "Fen", "Gar", "Hol", "Lind",
+    "Ash", "Brad", "Crom", "Dray", "Els", "Fitz", "Grim", "Hess", "Jar", "Kess",
+]
+SURNAME_MIDDLES = ["", "a", "e", "in", "en", "er"]
+SURNAME_ENDINGS = ["son", "berg", "ton", "ley", "man", "well", "ford", "wood", "ski", "ez",
+                   "ini", "ova", "field", "stein", "s", "ham", "ridge", "ick", "ard", "ovich"]
+TAIL_LAST_NAMES = [stem + middle + ending for stem in SURNAME_STEMS for middle in SURNAME_MIDDLES
+                   for ending in SURNAME_ENDINGS]
+# Shares of persons with a common first name / surname; Smith comes out near its real 0.8%
+COMMON_FIRST_NAME_SHARE = 0.6
+COMMON_LAST_NAME_SHARE = 0.2
+MALE_NAME_WEIGHTS = zipf_weights(len(MALE_FIRST_NAMES), 0.5)
+FEMALE_NAME_WEIGHTS = zipf_weights(len(FEMALE_FIRST_NAMES), 0.5)
+LAST_NAME_WEIGHTS = zipf_weights(len(LAST_NAMES), 0.55)
+
+RACES, RACE_WEIGHTS = ["W", "H", "B", "A", "O"], normalized([36, 40, 6, 15, 3])
+HAIR_COLORS, HAIR_WEIGHTS = ["Black", "Brown", "Blond", "Red", "Gray", "Bald"], normalized([38, 38, 12, 3, 6, 3])
+EYE_COLORS, EYE_WEIGHTS = ["Brown", "Blue", "Hazel", "Green", "Gray"], normalized([55, 25, 10, 8, 2])
+
+# (city, weight, zip prefix, area code)
+CITIES = [
+    ("Los Angeles", 40, "900", "213"), ("San Diego", 14, "921", "619"), ("San Jose", 10, "951", "408"),
+    ("San Francisco", 8, "941", "415"), ("Fresno", 5, "937", "559"), ("Sacramento", 5, "958", "916"),
+    ("Long Beach", 5, "908", "562"), ("Oakland", 4, "946", "510"), ("Bakersfield", 4, "933", "661"),
+    ("Anaheim", 3, "928", "714"),
+]
+CITY_WEIGHTS = normalized([c[1] for c in CITIES])
+STREET_NAMES = [
+    "Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park", "Lincoln", "Sunset",
+    "Broadway", "Mission", "Olive", "Spring", "Grand", "Figueroa", "Vermont", "Western", "Central", "Harbor",
+    "Valley", "Jefferson", "Adams", "Madison", "Monroe", "Jackson", "Euclid", "Palm", "Walnut", "Chestnut",
+    "1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "9th", "10th", "Alvarado", "La Brea", "El Camino Real",
+]
+STREET_SUFFIXES, STREET_SUFFIX_WEIGHTS = ["St", "Ave", "Blvd", "Dr", "Rd", "Ln", "Way"], normalized([35, 30, 10, 10, 8, 4, 3])
+HOTSPOTS_PER_CITY = 30
+HOTSPOT_SHARE = 0.65  # share of incidents at a hotspot; the rest are at ordinary addresses
+
+# Plate formats by state: D digit, L letter (CA skips I, O and Q)
+PLATE_STATES = [("CA", 88, [("DLLLDDD", 0.97), ("DLLLDD", 0.03)]), ("NV", 3, [("DDDLDD", 1.0)]),
+                ("AZ", 3, [("LLLDDDD", 1.0)]), ("OR", 2, [("DDDLLL", 1.0)]), ("TX", 2, [("LLLDDDD", 1.0)]),
+                ("WA", 2, [("LLLDDDD", 1.0)])]
+PLATE_STATE_WEIGHTS = normalized([s[1] for s in PLATE_STATES])
+VANITY_SHARE = 0.02
+PLATE_LETTERS = np.array(list("ABCDEFGHJKLMNPRSTUVWXYZ"))
+ALL_LETTERS = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+VIN_CHARS = np.array(list("ABCDEFGHJKLMNPRSTUVWXYZ0123456789"))
+# (make, model, weight)
+VEHICLE_MODELS = [
+    ("Toyota", "Camry", 9), ("Honda", "Civic", 8), ("Toyota", "Corolla", 8), ("Honda", "Accord", 7),
+    ("Ford", "F-150", 7), ("Tesla", "Model 3", 5), ("Toyota", "RAV4", 6), ("Nissan", "Altima", 5),
+    ("Chevrolet", "Silverado", 4), ("Honda", "CR-V", 5), ("Toyota", "Tacoma", 4), ("Hyundai", "Elantra", 3),
+    ("Nissan", "Sentra", 3), ("Ford", "Explorer", 3), ("Jeep", "Wrangler", 3), ("BMW", "3 Series", 2),
+    ("Chevrolet", "Malibu", 2), ("Kia", "Soul", 2), ("Subaru", "Outback", 2), ("Toyota", "Prius", 3),
+    ("Mercedes-Benz", "C-Class", 2), ("Dodge", "Charger", 2), ("Volkswagen", "Jetta", 2), ("Ford", "Mustang", 2),
+]
+VEHICLE_MODEL_WEIGHTS = normalized([m[2] for m in VEHICLE_MODELS])
+VEHICLE_COLORS, VEHICLE_COLOR_WEIGHTS = (["White", "Black", "Gray", "Silver", "Blue", "Red", "Green", "Brown", "Gold"],
+                                         normalized([25, 22, 18, 13, 9, 8, 2, 2, 1]))
+REGISTRATION_STATUSES, REGISTRATION_WEIGHTS = (["Active", "EXPIRED", "SUSPENDED", "REVOKED"],
+                                               normalized([930, 50, 15, 5]))
+VEHICLE_FLAGS, VEHICLE_FLAG_RATES = ["STOLEN", "WANTED"], [0.003, 0.001]
+
+WARRANT_RATE = 0.025
+PRIOR_RATE = 0.12
+WARRANT_TYPES, WARRANT_WEIGHTS = (["Failure to Appear", "Traffic", "Misdemeanor", "Felony", "Probation Violation"],
+                                  normalized([35, 25, 20, 12, 8]))
+PRIOR_OFFENSES = ["DUI", "Petty Theft", "Burglary", "Battery", "Vandalism", "Possession", "Reckless Driving", "Trespass"]
+DISPOSITIONS = ["Convicted", "Dismissed", "Diverted", "Pending"]
+
+# Hour-of-day weights (0-23)
+HOURLY_PROFILES = {
+    "commute": [2, 1, 1, 1, 1, 2, 5, 9, 10, 8, 6, 6, 6, 6, 7, 8, 10, 10, 8, 6, 5, 4, 3, 2],
+    "night": [9, 9, 8, 6, 3, 2, 1, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 4, 5, 6, 7, 8, 9, 9],
+    "day": [2, 1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 8, 8, 8, 8, 7, 6, 5, 4, 3, 3, 2, 2],
+    "waking": [3, 2, 2, 2, 2, 3, 4, 5, 6, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 6, 6, 5, 4, 4],
+}
+HOURLY_PROFILES = {name: normalized(weights) for name, weights in HOURLY_PROFILES.items()}
+WEEKDAY_WEIGHTS = [0.95, 0.9, 0.9, 0.95, 1.1, 1.25, 1.15]  # Monday first
+
+# (code, citation weight, hour profile)
+CITATION_CODES = [
+    ("VC-22350", 30, "commute"), ("VC-22349", 10, "commute"), ("VC-21453", 9, "commute"),
+    ("VC-22454", 9, "commute"), ("VC-23123", 8, "commute"), ("VC-27360", 6, "commute"),
+    ("VC-12500", 6, "day"), ("VC-16028", 6, "day"), ("VC-21658", 4, "commute"), ("VC-22107", 3, "commute"),
+    ("VC-23103", 2, "night"), ("VC-23152", 3, "night"), ("PC-484", 2, "day"), ("PC-415", 2, "night"),
+    ("PC-242", 1, "night"), ("PC-594", 1, "night"), ("PC-459", 0.5, "day"), ("PC-487", 0.5, "day"),
+    ("PC-148", 0.5, "night"), ("PC-243", 0.3, "night"),
+]
+CITATION_CODE_WEIGHTS = normalized([c[1] for c in CITATION_CODES])
+CITATION_OUTCOMES, CITATION_OUTCOME_WEIGHTS = ["Paid", "Contested", "Dismissed"], normalized([80, 12, 8])
+# A quarter of citations go to a pool of 2% of persons, so repeat offenders have several
+REPEAT_OFFENDER_SHARE = 0.25
+REPEAT_OFFENDER_POOL = 0.02
+
+# (incident type, weight, hour profile)
+REPORT_TYPES = [
+    ("Theft", 22, "day"), ("Burglary", 10, "day"), ("Vandalism", 10, "night"), ("Assault", 9, "night"),
+    ("Traffic Accident", 14, "commute"), ("Domestic Disturbance", 8, "night"), ("DUI", 6, "night"),
+    ("Narcotics", 6, "night"), ("Robbery", 5, "night"), ("Trespassing", 6, "day"), ("Fraud", 4, "day"),
+]
+REPORT_TYPE_WEIGHTS = normalized([t[1] for t in REPORT_TYPES])
+REPORT_STATUSES, REPORT_STATUS_WEIGHTS = ["Approved", "Submitted", "Draft"], normalized([80, 15, 5])
+INVOLVED_ROLES = ["Suspect", "Victim", "Witness"]
+
+# (incident type, weight, hour profile, priority) - the types the dispatcher assigns
+CALL_TYPES = [("Medical", 35, "waking", 1), ("Police", 35, "night", 2), ("Traffic", 15, "commute", 2),
+              ("Fire", 5, "waking", 1), ("Other", 10, "waking", 4)]
+CALL_TYPE_WEIGHTS = normalized([t[1] for t in CALL_TYPES])
+CALL_DESCRIPTIONS = {
+    "Medical": ["Person not breathing", "Fall with injury", "Chest pain", "Unconscious person", "Difficulty breathing"],
+    "Police": ["Suspicious person", "Shoplifter detained", "Loud party", "Fight in progress", "Break-in reported"],
+    "Traffic": ["Two-car collision", "Vehicle blocking lane", "Hit and run", "Erratic driver", "Motorcycle down"],
+    "Fire": ["Smoke from building", "Brush fire", "Car fire", "Fire alarm sounding", "Kitchen fire"],
+    "Other": ["Animal in roadway", "Downed power line", "Welfare check", "Lost child", "Noise complaint"],
+}
+
+NUM_OFFICERS = 300
+
+# RNG streams besides the per-kind ones (block_rng)
+HOTSPOT_STREAM = len(KINDS)
+OFFICER_STREAM = len(KINDS) + 1
+
+
+def block_rng(seed: int, kind: str, block: int) -> np.random.Generator:
+    return np.random.default_rng([seed, KINDS.index(kind), block])
+
+
+def record_id(seed: int, kind: str, number: int) -> str:
+    return str(uuid.uuid5(ID_NAMESPACE, f"{seed}:{kind}:{number}"))
+
+
+def serial_code(number: int, salt: int) -> str:
+    """Six hex digits, distinct for the first 16.7M numbers (odd multiplier mod 16^6)."""
+    return f"{(number * 0x9E3779 + salt) % 0x1000000:06X}"
+
+
+def block_counts(total: int) -> List[int]:
+    return [min(BLOCK_SIZE, total - start) for start in range(0, total, BLOCK_SIZE)]
+
+
+def incident_times(rng: np.random.Generator, n: int, profiles: np.ndarray, end: date, history_days: int) -> List[datetime]:
+    """n datetimes over the history_days before end: weekday-weighted days, hour from each row's profile."""
+    first_day = end - timedelta(days=history_days)
+    weekday_p = normalized([WEEKDAY_WEIGHTS[(first_day + timedelta(days=d)).weekday()] for d in range(history_days)])
+    days = rng.choice(history_days, size=n, p=weekday_p)
+    hours = np.empty(n, dtype=int)
+    for profile in np.unique(profiles):
+        rows = profiles == profile
+        hours[rows] = rng.choice(24, size=int(rows.sum()), p=HOURLY_PROFILES[profile])
+    minutes = rng.integers(0, 60, size=n)
+    base = datetime.combine(first_day, dt_time(), tzinfo=timezone.utc)
+    return [base + timedelta(days=int(d), hours=int(h), minutes=int(m)) for d, h, m in zip(days, hours, minutes)]
+
+
+@lru_cache(maxsize=4)
+def hotspots(seed: int) -> Tuple[Tuple[str, ...], ...]:
+    """Per city, HOTSPOTS_PER_CITY street blocks and intersections, most active first."""
+    rng = np.random.default_rng([seed, HOTSPOT_STREAM])
+    cities = []
+    for city, *_ in CITIES:
+        spots = []
+        for _ in range(HOTSPOTS_PER_CITY):
+            street = f"{rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES, p=STREET_SUFFIX_WEIGHTS)}"
+            if rng.random() < 0.5:
+                cross = f"{rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES, p=STREET_SUFFIX_WEIGHTS)}"
+                spots.append(f"{street} & {cross}, {city}")
+            else:
+                spots.append(f"{int(rng.integers(1, 80)) * 100}|{street}, {city}")
+        cities.append(tuple(spots))
+    return tuple(cities)
+
+
+def addresses(rng: np.random.Generator, n: int) -> List[str]:
+    houses = rng.integers(100, 20000, size=n)
+    streets = rng.choice(STREET_NAMES, size=n)
+    suffixes = rng.choice(STREET_SUFFIXES, size=n, p=STREET_SUFFIX_WEIGHTS)
+    return [f"{h} {s} {x}" for h, s, x in zip(houses, streets, suffixes)]
+
+
+def incident_locations(rng: np.random.Generator, n: int, seed: int) -> List[str]:
+    """Clustered: HOTSPOT_SHARE at a Zipf-weighted hotspot of the city, the rest anywhere in it."""
+    city_index = rng.choice(len(CITIES), size=n, p=CITY_WEIGHTS)
+    at_hotspot = rng.random(n) < HOTSPOT_SHARE
+    spot_index = rng.choice(HOTSPOTS_PER_CITY, size=n, p=zipf_weights(HOTSPOTS_PER_CITY))
+    house_offset = rng.integers(0, 100, size=n)
+    elsewhere = addresses(rng, n)
+    spots = hotspots(seed)
+    locations = []
+    for i in range(n):
+        if at_hotspot[i]:
+            spot = spots[city_index[i]][spot_index[i]]
+            block, _, rest = spot.partition("|")
+            locations.append(f"{int(block) + house_offset[i]} {rest}" if rest else spot)
+        else:
+            locations.append(f"{elsewhere[i]}, {CITIES[city_index[i]][0]}")
+    return locations
+
+
+def patterned(rng: np.random.Generator, pattern: str, letters: np.ndarray) -> str:
+    return "".join(str(rng.integers(1 if i == 0 else 0, 10)) if ch == "D" else rng.choice(letters)
+                   for i, ch in enumerate(pattern))
+
+
+@lru_cache(maxsize=8)
+def person_columns(seed: int, block: int, count: int) -> Dict[str, Any]:
+    """Every drawn attribute of a persons block, before documents are built (shared with citations / reports)."""
+    rng = block_rng(seed, "persons", block)
+    start = block * BLOCK_SIZE
+    male = rng.random(count) < 0.5
+    first = np.where(rng.random(count) < COMMON_FIRST_NAME_SHARE,
+                     np.where(male, rng.choice(MALE_FIRST_NAMES, size=count, p=MALE_NAME_WEIGHTS),
+                              rng.choice(FEMALE_FIRST_NAMES, size=count, p=FEMALE_NAME_WEIGHTS)),
+                     rng.choice(TAIL_FIRST_NAMES, size=count))
+    middle = np.where(male, rng.choice(MALE_FIRST_NAMES, size=count), rng.choice(FEMALE_FIRST_NAMES, size=count))
+    last = np.where(rng.random(count) < COMMON_LAST_NAME_SHARE, rng.choice(LAST_NAMES, size=count, p=LAST_NAME_WEIGHTS),
+                    rng.choice(TAIL_LAST_NAMES, size=count))
+    age_days = (np.clip(rng.normal(40, 15, size=count), 16, 90) * 365.25).astype(int)
+    city_index = rng.choice(len(CITIES), size=count, p=CITY_WEIGHTS)
+    numbers = np.arange(start, start + count)
+    return {
+        "id": [record_id(seed, "persons", int(i)) for i in numbers],
+        "male": male, "first": first, "middle": middle, "last": last,
+        "has_middle": rng.random(count) < 0.6,
+        "age_days": age_days,
+        "has_dl": rng.random(count) < 0.92,
+        # Distinct for the first 260M persons: 7919 is coprime to 10^7
+        "dl": [f"{ALL_LETTERS[(i // 10_000_000 + seed) % 26]}{(i * 7919 + seed) % 10_000_000:07d}" for i in numbers],
+        "city_index": city_index,
+        "address": addresses(rng, count),
+        "zip": rng.integers(0, 100, size=count),
+        "phone": rng.integers(2000000, 9999999, size=count),
+        "race": rng.choice(RACES, size=count, p=RACE_WEIGHTS),
+        "height": np.where(male, rng.normal(69.5, 3.0, size=count), rng.normal(64.0, 2.8, size=count)).round().astype(int),
+        "weight": np.clip(np.where(male, rng.normal(190, 35, size=count), rng.normal(160, 35, size=count)), 95, 380).astype(int),
+        "hair": rng.choice(HAIR_COLORS, size=count, p=HAIR_WEIGHTS),
+        "eye": rng.choice(EYE_COLORS, size=count, p=EYE_WEIGHTS),
+        "warrants": rng.random(count) < WARRANT_RATE,
+        "priors": np.where(rng.random(count) < PRIOR_RATE, rng.integers(1, 4, size=count), 0),
+        "created_days_ago": rng.integers(0, 3650, size=count),
+        "detail_seed": rng.integers(0, 2 ** 32, size=count),
+    }
+
+
+@lru_cache(maxsize=8)
+def vehicle_columns(seed: int, block: int, count: int) -> Dict[str, Any]:
+    rng = block_rng(seed, "vehicles", block)
+    start = block * BLOCK_SIZE
+    state_index = rng.choice(len(PLATE_STATES), size=count, p=PLATE_STATE_WEIGHTS)
+    vanity = rng.random(count) < VANITY_SHARE
+    plates = []
+    for i in range(count):
+        if vanity[i]:
+            plates.append("".join(rng.choice(ALL_LETTERS, size=int(rng.integers(3, 8)))))
+            continue
+        formats = PLATE_STATES[state_index[i]][2]
+        pattern = formats[rng.choice(len(formats), p=[f[1] for f in formats])][0]
+        plates.append(patterned(rng, pattern, PLATE_LETTERS if PLATE_STATES[state_index[i]][0] == "CA" else ALL_LETTERS))
+    return {
+        "id": [record_id(seed, "vehicles", int(i)) for i in range(start, start + count)],
+        "plate": plates,
+        "state": [PLATE_STATES[s][0] for s in state_index],
+        "model_index": rng.choice(len(VEHICLE_MODELS), size=count, p=VEHICLE_MODEL_WEIGHTS),
+        # Mostly recent: age in years is roughly exponential with a 7 year mean
+        "age_years": np.minimum(rng.exponential(7.0, size=count).astype(int), 30),
+        "color": rng.choice(VEHICLE_COLORS, size=count, p=VEHICLE_COLOR_WEIGHTS),
+        "vin": ["".join(v) for v in rng.choice(VIN_CHARS, size=(count, 17))],
+        "owner": rng.integers(0, BLOCK_SIZE, size=count),
+        "insured": rng.random(count) < 0.92,
+        "registration": rng.choice(REGISTRATION_STATUSES, size=count, p=REGISTRATION_WEIGHTS),
+        "flags": np.stack([rng.random(count) < rate for rate in VEHICLE_FLAG_RATES], axis=1),
+        "created_days_ago": rng.integers(0, 3650, size=count),
+    }
+
+
+@lru_cache(maxsize=4 * NUM_OFFICERS)
+def officer(seed: int, index: int) -> Tuple[str, str]:
+    """(badge number, full name) of one of NUM_OFFICERS officers on the synthetic roster."""
+    rng = np.random.default_rng([seed, OFFICER_STREAM, index])
+    first = rng.choice(MALE_FIRST_NAMES + FEMALE_FIRST_NAMES)
+    return f"{1000 + index}", f"{first} {rng.choice(LAST_NAMES, p=LAST_NAME_WEIGHTS)}"
+
+
+def iso(moment: datetime) -> str:
+    return moment.isoformat()
+
+
+def person_name(columns: Dict[str, Any], i: int) -> Tuple[str, str]:
+    return str(columns["first"][i]), str(columns["last"][i])
+
+
+def dob(columns: Dict[str, Any], i: int, end: date) -> str:
+    return (end - timedelta(days=int(columns["age_days"][i]))).isoformat()
+
+
+def persons_block(seed: int, block: int, count: int, end: date, history_days: int) -> List[Dict[str, Any]]:
+    c = person_columns(seed, block, count)
+    anchor = datetime.combine(end, dt_time(), tzinfo=timezone.utc)
+    docs = []
+    for i in range(count):
+        first, last = person_name(c, i)
+        birth = dob(c, i, end)
+        city, _, zip_prefix, area = CITIES[c["city_index"][i]]
+        dl = c["dl"][i] if c["has_dl"][i] else None
+        # Warrants and priors are rare: their own RNG only when there are some
+        detail = np.random.default_rng(int(c["detail_seed"][i])) if c["warrants"][i] or c["priors"][i] else None
+        warrants = [{"type": str(detail.choice(WARRANT_TYPES, p=WARRANT_WEIGHTS)),
+                     "date": (end - timedelta(days=int(detail.integers(1, 1500)))).isoformat(),
+                     "amount": int(detail.choice([250, 500, 1000, 2500, 10000]))}
+                    for _ in range(int(detail.integers(1, 3)) if c["warrants"][i] else 0)]
+        priors = [{"offense": str(detail.choice(PRIOR_OFFENSES)),
+                   "date": (end - timedelta(days=int(detail.integers(200, 5000)))).isoformat(),
+                   "disposition": str(detail.choice(DISPOSITIONS))}
+                  for _ in range(int(c["priors"][i]))]
+        created = iso(anchor - timedelta(days=int(c["created_days_ago"][i])))
+        doc = {
+            "id": c["id"][i], "first_name": first, "last_name": last,
+            "middle_name": str(c["middle"][i]) if c["has_middle"][i] else None,
+            "dob": birth, "ssn": None, "drivers_license": dl, "dl_state": "CA" if dl else None,
+            "address": c["address"][i], "city": city, "state": "CA", "zip_code": f"{zip_prefix}{c['zip'][i]:02d}",
+            "phone": f"({area}) {str(c['phone'][i])[:3]}-{str(c['phone'][i])[3:]}",
+            "race": str(c["race"][i]), "sex": "M" if c["male"][i] else "F",
+            "height": f"{c['height'][i] // 12}'{c['height'][i] % 12}\"", "weight": str(c["weight"][i]),
+            "eye_color": str(c["eye"][i]),
+            "hair_color": "Brown" if c["hair"][i] == "Bald" and not c["male"][i] else str(c["hair"][i]),
+            "warrants": warrants, "priors": priors, "citations": [], "notes": None,
+            **person_name_keys(first, last),
+            "created_at": created, "updated_at": created,
+        }
+        identity_keys = person_identity_keys(dl, first, last, birth)
+        if identity_keys:
+            doc["identity_keys"] = identity_keys
+        docs.append(doc)
+    return docs
+
+
+def vehicles_block(seed: int, block: int, count: int, end: date, history_days: int, person_blocks: List[int]) -> List[Dict[str, Any]]:
+    c = vehicle_columns(seed, block, count)
+    owner_block = block % len(person_blocks) if person_blocks else None
+    owners = person_columns(seed, owner_block, person_blocks[owner_block]) if person_blocks else None
+    anchor = datetime.combine(end, dt_time(), tzinfo=timezone.utc)
+    docs = []
+    for i in range(count):
+        make, model, _ = VEHICLE_MODELS[c["model_index"][i]]
+        owner = owner_address = None
+        if owners is not None:
+            o = int(c["owner"][i]) % person_blocks[owner_block]
+            owner = " ".join(person_name(owners, o))
+            owner_address = f"{owners['address'][o]}, {CITIES[owners['city_index'][o]][0]}, CA"
+        registration = str(c["registration"][i])
+        docs.append({
+            "id": c["id"][i], "plate_number": c["plate"][i], "state": c["state"][i], "vin": c["vin"][i],
+            "make": make, "model": model, "year": end.year - int(c["age_years"][i]), "color": str(c["color"][i]),
+            "registered_owner": owner, "owner_address": owner_address,
+            "insurance_status": "Active" if c["insured"][i] else "Lapsed",
+            "registration_status": registration,
+            "flags": [flag for flag, on in zip(VEHICLE_FLAGS, c["flags"][i]) if on],
+            "notes": None,
+            **vehicle_plate_keys(c["plate"][i]),
+            "created_at": iso(anchor - timedelta(days=int(c["created_days_ago"][i]))),
+        })
+    return docs
+
+
+def citations_block(seed: int, block: int, count: int, end: date, history_days: int,
+                    person_blocks: List[int], vehicle_blocks: List[int]) -> List[Dict[str, Any]]:
+    rng = block_rng(seed, "citations", block)
+    start = block * BLOCK_SIZE
+    code_index = rng.choice(len(CITATION_CODES), size=count, p=CITATION_CODE_WEIGHTS)
+    profiles = np.array([CITATION_CODES[k][2] for k in code_index])
+    when = incident_times(rng, count, profiles, end, history_days)
+    locations = incident_locations(rng, count, seed)
+    officers = rng.integers(0, NUM_OFFICERS, size=count)
+    repeat = rng.random(count) < REPEAT_OFFENDER_SHARE
+    offenders = rng.integers(0, BLOCK_SIZE, size=count)
+    vehicle_picks = rng.integers(0, BLOCK_SIZE, size=count)
+    court_days = rng.integers(30, 61, size=count)
+    settled = rng.random(count)
+    outcomes = rng.choice(CITATION_OUTCOMES, size=count, p=CITATION_OUTCOME_WEIGHTS)
+    entry_delay = rng.integers(2, 30, size=count)
+    people = person_columns(seed, block % len(person_blocks), person_blocks[block % len(person_blocks)]) if person_blocks else None
+    cars = vehicle_columns(seed, block % len(vehicle_blocks), vehicle_blocks[block % len(vehicle_blocks)]) if vehicle_blocks else None
+    catalog = violation_catalog.index
+    docs = []
+    for i in range(count):
+        code = CITATION_CODES[code_index[i]][0]
+        fine = catalog.lookup(code, when[i])
+        is_traffic = code.startswith("VC-")
+        doc = {
+            "id": f"CT-{when[i]:%Y%m%d}-{serial_code(start + i, seed)}",
+            "citation_type": "traffic" if is_traffic else "criminal",
+            "violation_code": fine.code, "violation_description": fine.description,
+            "offender_name": "Unknown", "offender_dl": None, "offender_dob": None, "offender_address": None,
+            "person_id": None, "vehicle_plate": None, "vehicle_info": None,
+            "location": locations[i], "date_time": f"{when[i]:%Y-%m-%dT%H:%M}",
+            "fine_amount": fine.amount, "fine_catalog_version": catalog.version, "client_id": None,
+            "court_date": (when[i] + timedelta(days=int(court_days[i]))).date().isoformat(),
+            "officer_badge": None, "officer_name": None, "notes": None,
+            # Older citations are more likely to be settled
+            "status": str(outcomes[i]) if settled[i] < 0.9 * (end - when[i].date()).days / history_days else "Active",
+            "created_at": iso(when[i] + timedelta(minutes=int(entry_delay[i]))),
+        }
+        doc["officer_badge"], doc["officer_name"] = officer(seed, int(officers[i]))
+        if people is not None:
+            pool = max(1, int(len(people["id"]) * REPEAT_OFFENDER_POOL)) if repeat[i] else len(people["id"])
+            p = int(offenders[i]) % pool
+            first, last = person_name(people, p)
+            doc.update({"offender_name": f"{last}, {first}", "person_id": people["id"][p],
+                        "offender_dl": people["dl"][p] if people["has_dl"][p] else None,
+                        "offender_dob": dob(people, p, end),
+                        "offender_address": f"{people['address'][p]}, {CITIES[people['city_index'][p]][0]}, CA"})
+        if is_traffic and cars is not None:
+            v = int(vehicle_picks[i]) % len(cars["id"])
+            make, model, _ = VEHICLE_MODELS[cars["model_index"][v]]
+            doc["vehicle_plate"] = cars["plate"][v]
+            doc["vehicle_info"] = f"{end.year - int(cars['age_years'][v])} {make} {model} ({cars['color'][v]})"
+        docs.append(doc)
+    return docs
+
+
+def reports_block(seed: int, block: int, count: int, end: date, history_days: int, person_blocks: List[int]) -> List[Dict[str, Any]]:
+    rng = block_rng(seed, "reports", block)
+    start = block * BLOCK_SIZE
+    type_index = rng.choice(len(REPORT_TYPES), size=count, p=REPORT_TYPE_WEIGHTS)
+    profiles = np.array([REPORT_TYPES[k][2] for k in type_index])
+    when = incident_times(rng, count, profiles, end, history_days)
+    locations = incident_locations(rng, count, seed)
+    officers = rng.integers(0, NUM_OFFICERS, size=count)
+    involved = rng.choice(3, size=count, p=[0.3, 0.45, 0.25])
+    picks = rng.integers(0, BLOCK_SIZE, size=(count, 2))
+    roles = rng.integers(0, len(INVOLVED_ROLES), size=(count, 2))
+    statuses = rng.choice(REPORT_STATUSES, size=count, p=REPORT_STATUS_WEIGHTS)
+    written_after = rng.integers(30, 600, size=count)
+    people = person_columns(seed, block % len(person_blocks), person_blocks[block % len(person_blocks)]) if person_blocks else None
+    docs = []
+    for i in range(count):
+        incident_type = REPORT_TYPES[type_index[i]][0]
+        badge, name = officer(seed, int(officers[i]))
+        persons = []
+        if people is not None:
+            for k in range(int(involved[i])):
+                p = int(picks[i][k]) % len(people["id"])
+                first, last = person_name(people, p)
+                persons.append({"person_id": people["id"][p], "name": f"{first} {last}",
+                                "role": INVOLVED_ROLES[roles[i][k]]})
+        written = iso(when[i] + timedelta(minutes=int(written_after[i])))
+        docs.append({
+            "id": f"RPT-{when[i]:%Y%m%d}-{serial_code(start + i, seed + 1)}",
+            "incident_type": incident_type,
+            "incident_date": when[i].date().isoformat(), "incident_time": f"{when[i]:%H:%M}",
+            "location": locations[i],
+            "narrative": f"Officer {name} responded to a reported {incident_type.lower()} at {locations[i]}. "
+                         f"{len(persons)} person(s) involved. See attached statements.",
+            "reporting_officer": name, "badge_number": badge,
+            "involved_persons": persons, "involved_vehicles": [], "evidence": [], "witnesses": [],
+            "status": str(statuses[i]), "created_at": written, "updated_at": written,
+        })
+    return docs
+
+
+def calls_block(seed: int, block: int, count: int, end: date, history_days: int) -> List[Dict[str, Any]]:
+    rng = block_rng(seed, "calls", block)
+    start = block * BLOCK_SIZE
+    type_index = rng.choice(len(CALL_TYPES), size=count, p=CALL_TYPE_WEIGHTS)
+    profiles = np.array([CALL_TYPES[k][2] for k in type_index])
+    when = incident_times(rng, count, profiles, end, history_days)
+    locations = incident_locations(rng, count, seed)
+    officers = rng.integers(0, NUM_OFFICERS, size=count)
+    descriptions = rng.integers(0, 5, size=count)
+    phones = rng.integers(2000000, 9999999, size=count)
+    areas = rng.choice(len(CITIES), size=count, p=CITY_WEIGHTS)
+    # Call length in minutes, long-tailed
+    durations = np.clip(rng.lognormal(3.5, 0.6, size=count), 5, 480).astype(int)
+    docs = []
+    for i in range(count):
+        incident_type, _, _, priority = CALL_TYPES[type_index[i]]
+        number = start + i
+        call_id = record_id(seed, "calls", number)
+        description = CALL_DESCRIPTIONS[incident_type][descriptions[i]]
+        closed = iso(when[i] + timedelta(minutes=int(durations[i])))
+        docs.append({
+            "id": call_id, "call_sid": "CA" + call_id.replace("-", ""),
+            "caller_phone": f"+1{CITIES[areas[i]][3]}{phones[i]}",
+            "incident_type": incident_type, "location": locations[i], "description": description,
+            "priority": priority, "status": "Closed", "assigned_officer": officer(seed, int(officers[i]))[0],
+            "transcription": f"Caller: {description} at {locations[i]}.\nDispatcher: Help is on the way.",
+            "recording_url": None, "recording_duration": None, "update_seq": 0,
+            "created_at": iso(when[i]), "updated_at": closed, "closed_at": closed,
+        })
+    return docs
+
+
+def build_block(kind: str, seed: int, block: int, count: int, end: date, history_days: int,
+                person_blocks: List[int], vehicle_blocks: List[int]) -> List[Dict[str, Any]]:
+    """Documents of one block. Runs in a worker process."""
+    if kind == "persons":
+        return persons_block(seed, block, count, end, history_days)
+    if kind == "vehicles":
+        return vehicles_block(seed, block, count, end, history_days, person_blocks)
+    if kind == "citations":
+        return citations_block(seed, block, count, end, history_days, person_blocks, vehicle_blocks)
+    if kind == "reports":
+        return reports_block(seed, block, count, end, history_days, person_blocks)
+    return calls_block(seed, block, count, end, history_days)
+
+
+async def identity_aliases(db, dropped: List[Dict[str, Any]]) -> Dict[str, str]:
+    """{id: surviving person's id} for persons skipped because another person holds their identity key."""
+    existing = {doc["id"] async for doc in db.persons.find({"id": {"$in": [doc["id"] for doc in dropped]}}, {"_id": 0, "id": 1})}
+    by_key: Dict[str, List[str]] = {}
+    for doc in dropped:
+        if doc["id"] not in existing:
+            for key in doc.get("identity_keys", []):
+                by_key.setdefault(key, []).append(doc["id"])
+    aliases = {}
+    if by_key:
+        async for survivor in db.persons.find({"identity_keys": {"$in": list(by_key)}}, {"_id": 0, "id": 1, "identity_keys": 1}):
+            for key in survivor["identity_keys"]:
+                aliases.update((person_id, survivor["id"]) for person_id in by_key.get(key, []))
+    return aliases
+
+
+async def insert_block(db, kind: str, docs: List[Dict[str, Any]], aliases: Dict[str, str]) -> int:
+    """Insert a block, skipping records already there; returns how many were inserted.
+
+    Persons skipped for a duplicate identity are added to aliases, and
+    citations and reports referring to them are repointed through it before
+    insert. Inserted citations are also pushed onto their persons."""
+    if kind == "citations":
+        for doc in docs:
+            doc["person_id"] = aliases.get(doc["person_id"], doc["person_id"])
+    elif kind == "reports":
+        for doc in docs:
+            for person in doc["involved_persons"]:
+                person["person_id"] = aliases.get(person["person_id"], person["person_id"])
+    try:
+        await db[COLLECTIONS[kind]].insert_many(docs, ordered=False)
+        inserted = docs
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        failed = {error["index"] for error in errors}
+        inserted = [doc for position, doc in enumerate(docs) if position not in failed]
+        if kind == "persons":
+            aliases.update(await identity_aliases(db, [docs[position] for position in sorted(failed)]))
+    if kind == "citations":
+        by_person: Dict[str, List[str]] = {}
+        for doc in inserted:
+            if doc["person_id"]:
+                by_person.setdefault(doc["person_id"], []).append(doc["id"])
+        if by_person:
+            await db.persons.bulk_write([UpdateOne({"id": person_id}, {"$push": {"citations": {"$each": ids}}})
+                                         for person_id, ids in by_person.items()], ordered=False)
+    return len(inserted)
+
+
+async def generate(db, counts: Dict[str, int], seed: int = DEFAULT_SEED, end: Optional[date] = None,
+                   history_days: int = DEFAULT_HISTORY_DAYS, workers: int = DEFAULT_WORKERS,
+                   on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """Generate and insert counts[kind] records of each kind, in blocks built by worker processes.
+
+    At most 2 * workers blocks are in memory at once. on_progress is awaited
+    after every block with the running totals.
+    """
+    end = end or date.today()
+    person_blocks = block_counts(counts.get("persons", 0))
+    vehicle_blocks = block_counts(counts.get("vehicles", 0))
+    progress: Dict[str, Any] = {
+        "seed": seed, "end_date": end.isoformat(), "history_days": history_days, "workers": workers,
+        "kinds": {kind: {"requested": counts.get(kind, 0), "inserted": 0, "skipped": 0} for kind in KINDS if counts.get(kind)},
+    }
+    started = time.perf_counter()
+    written = 0
+    # Skipped duplicate persons -> the person holding their identity, for citations and reports
+    aliases: Dict[str, str] = {}
+    # spawn, not fork: the parent may be a server with an event loop and threads
+    pool = ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=multiprocessing.get_context("spawn"))
+    loop = asyncio.get_running_loop()
+    try:
+        for kind in KINDS:
+            blocks = block_counts(counts.get(kind, 0))
+            if not blocks:
+                continue
+            window = asyncio.Semaphore(2 * max(workers, 1))
+
+            async def run_block(block: int, count: int):
+                nonlocal written
+                async with window:
+                    docs = await loop.run_in_executor(pool, build_block, kind, seed, block, count, end, history_days,
+                                                      person_blocks, vehicle_blocks)
+                    inserted = await insert_block(db, kind, docs, aliases)
+                totals = progress["kinds"][kind]
+                totals["inserted"] += inserted
+                totals["skipped"] += count - inserted
+                written += count
+                progress["rows_per_second"] = round(written / (time.perf_counter() - started), 1)
+                if on_progress:
+                    await on_progress(progress)
+
+            await asyncio.gather(*(run_block(block, count) for block, count in enumerate(blocks)))
+            logger.info(f"Synthetic {kind}: {progress['kinds'][kind]}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    progress["seconds"] = round(time.perf_counter() - started, 1)
+    return progress
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Citation sync: one request per citation vs /citations/bulk
+
+Runs against a live server. Usage:
+    python test_bulk_citations.py [base_url] [num_citations] [batch_size]   (default http://localhost:8000, 500, 50)
+Credentials come from RMS_USERNAME / RMS_PASSWORD (default admin / admin123).
+Offenders repeat across citations (about three tickets each) so the bulk path's
+offender grouping is exercised.
+"""
+import os
+import sys
+import time
+import uuid
+
+import requests
+
+CODES = ["VC-22350", "VC-21453", "VC-22454", "VC-12500", "VC-16028", "VC-27360", "VC-23123"]
+
+
+def login(base_url: str) -> str:
+    response = requests.post(f"{base_url}/api/auth/login", json={
+        "username": os.environ.get("RMS_USERNAME", "admin"),
+        "password": os.environ.get("RMS_PASSWORD", "admin123"),
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def make_citations(n: int, run: str) -> list:
+    return [{
+        "client_id": f"{run}-{i}",
+        "citation_type": "traffic",
+        "violation_code": CODES[i % len(CODES)],
+        "violation_description": "Bulk sync test",
+        "offender_name": f"Bench{run[:6]}, Driver{i // 3}",
+        "offender_dl": f"B{run[:4].upper()}{i // 3:05d}",
+        "offender_dob": "1990-01-01",
+        "location": "Main St & 1st Ave",
+        "date_time": "2025-01-15T14:30",
+    } for i in range(n)]
+
+
+def main(base_url: str, n: int, batch_size: int):
+    print("=" * 60)
+    print("Bulk Citation Test")
+    print("=" * 60)
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {login(base_url)}"
+
+    citations = make_citations(n, uuid.uuid4().hex)
+    started = time.perf_counter()
+    for citation in citations:
+        session.post(f"{base_url}/api/citations", json=citation).raise_for_status()
+    single = time.perf_counter() - started
+    print("\n1. POST /citations, one at a time:")
+    print(f"   ✓ {n:,} citations in {single:.2f}s ({n / single:,.0f}/s)")
+
+    citations = make_citations(n, uuid.uuid4().hex)
+    started = time.perf_counter()
+    created = 0
+    for start in range(0, n, batch_size):
+        response = session.post(f"{base_url}/api/citations/bulk", json=citations[start:start + batch_size])
+        response.raise_for_status()
+        created += response.json()["created"]
+    bulk = time.perf_counter() - started
+    assert created == n, f"{created} of {n} created"
+    print(f"\n2. POST /citations/bulk, {batch_size} per request:")
+    print(f"   ✓ {n:,} citations in {bulk:.2f}s ({n / bulk:,.0f}/s, {single / bulk:.1f}x)")
+
+    response = session.post(f"{base_url}/api/citations/bulk", json=citations[:batch_size])
+    response.raise_for_status()
+    assert response.json()["duplicates"] == min(batch_size, n)
+    print("\n3. Resending a synced batch:")
+    print(f"   ✓ {response.json()['duplicates']} duplicates recognized by client_id, nothing created")
+
+    print("\n" + "=" * 60)
+    print("✅ Bulk citation test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+         int(sys.argv[3]) if len(sys.argv) > 3 else 50)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Active calls board: bytes per poll, full documents vs summary projection"""
+import asyncio
+import json
+import os
+import sys
+import uuid
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from call_board import active_calls_pipeline, transcript_pipeline
+
+TURN = "Caller: There's a man in a red jacket breaking into cars on the corner of 5th and Main, he just ran north"
+
+
+def synthetic_call(turns: int) -> dict:
+    transcript = "\n".join(f"{TURN} ({i})" for i in range(turns))
+    return {
+        "id": str(uuid.uuid4()), "call_sid": f"CA{uuid.uuid4().hex}", "caller_phone": "+15555550100",
+        "incident_type": "Police", "location": "5th and Main", "priority": 2, "status": "Active",
+        "transcription": transcript, "description": transcript,
+        "conversation_history": [f"Dispatcher: Okay, stay with me ({i})" for i in range(turns)],
+        "created_at": "2025-01-01T00:00:00+00:00", "updated_at": "2025-01-01T00:00:00+00:00",
+    }
+
+
+async def check_call_board():
+    print("=" * 60)
+    print("Active Calls Board Payload Test")
+    print("=" * 60)
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_board_test"
+    await client.drop_database(db_name)
+    db = client[db_name]
+
+    try:
+        print("\n1. Bytes per poll (20 open calls):")
+        for turns in (2, 10, 50):
+            await db.active_calls.delete_many({})
+            await db.active_calls.insert_many([synthetic_call(turns) for _ in range(20)])
+            full = await db.active_calls.find({"status": {"$ne": "Closed"}}, {"_id": 0}).sort("priority", 1).to_list(100)
+            summary = await db.active_calls.aggregate(active_calls_pipeline()).to_list(100)
+            full_bytes, summary_bytes = len(json.dumps(full)), len(json.dumps(summary))
+            assert summary_bytes < full_bytes
+            assert summary[0]["transcript_turns"] == turns
+            print(f"   ✓ {turns:>2} turns/call: full {full_bytes:>8,} B, summary {summary_bytes:>6,} B "
+                  f"({summary_bytes / full_bytes:.0%})")
+
+        print("\n2. Incremental transcript fetch:")
+        call = await db.active_calls.find_one({}, {"_id": 0, "id": 1})
+        first = (await db.active_calls.aggregate(transcript_pipeline(call["id"])).to_list(1))[0]
+        assert len(first["turns"]) == first["turn_count"] == 50
+        tail = (await db.active_calls.aggregate(transcript_pipeline(call["id"], offset=48)).to_list(1))[0]
+        assert len(tail["turns"]) == 2
+        done = (await db.active_calls.aggregate(transcript_pipeline(call["id"], offset=50)).to_list(1))[0]
+        assert done["turns"] == []
+        print(f"   ✓ Full fetch {len(json.dumps(first)):,} B, incremental fetch {len(json.dumps(tail)):,} B")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print("\n" + "=" * 60)
+    print("✅ Call board test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(check_call_board())
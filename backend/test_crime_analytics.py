@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Crime analytics: counters, hour-of-week, trend checks, incremental vs full rebuild and summary latency
+
+Usage: python test_crime_analytics.py [num_incidents]   (default 200,000)
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from crime_analytics import (CrimeAnalytics, incident_frame, counter_updates, location_keys, trend,
+                             STATS_COLLECTION, SUMMARY_COLLECTION, LEASE_ID, DEFAULT_WINDOW_DAYS)
+
+INCIDENT_TYPES = ["Burglary", "Theft", "Assault", "Vandalism", "Traffic", "DUI"]
+LOCATIONS = ["100 Main Street", "250 Main St Apt 4", "5th Ave & Oak", "Fifth Avenue and Oak", "77 Elm Road"]
+
+
+def check_counters():
+    print("\n1. Counters and hour-of-week:")
+    reports = incident_frame([
+        # Monday 14:30 and the same block of Main Street twice
+        {"id": "r1", "incident_type": "Burglary", "location": "100 Main Street", "incident_date": "2025-06-02",
+         "incident_time": "14:30", "created_at": "2025-06-02T15:00:00+00:00"},
+        {"id": "r2", "incident_type": "Burglary", "location": "250 Main St Apt 4", "incident_date": "2025-06-02",
+         "incident_time": "14:05", "created_at": "2025-06-02T15:00:00+00:00"},
+        # No incident date: falls back to when it was written
+        {"id": "r3", "incident_type": None, "location": "", "incident_date": None, "incident_time": None,
+         "created_at": "2025-06-08T23:10:00+00:00"},
+    ], "reports")
+    assert list(reports["hour_of_week"]) == [14, 14, 6 * 24 + 23], list(reports["hour_of_week"])
+    assert reports["location_key"].iloc[0] == reports["location_key"].iloc[1] == "main st"
+    assert list(reports["incident_type"])[2] == "Unknown" and reports["location_key"].iloc[2] == "unknown"
+    calls = incident_frame([{"id": "c1", "incident_type": "Traffic", "location": "5th Ave & Oak",
+                             "created_at": "2025-06-03T08:15:00+00:00", "closed_at": "2025-06-03T09:00:00+00:00"}],
+                           "active_calls")
+    assert list(calls["hour_of_week"]) == [24 + 8]
+    assert list(calls["location_key"]) == ["5th ave and oak"]
+    assert location_keys(calls["location_key"]).tolist() == ["5th ave and oak"]  # keys are stable
+
+    ops = counter_updates(reports, "reports")
+    increments = {op._filter["_id"]: op._doc["$inc"]["count"] for op in ops}
+    assert increments["reports|2025-06-02|Burglary|main st|14"] == 2, increments
+    assert sum(increments.values()) == 3
+    print("   ✓ Incidents keyed by day, type, location cluster and hour of week; one $inc per counter")
+
+
+def check_trend():
+    print("\n2. Trend:")
+    start = date(2025, 1, 1)
+    rising = trend({(start + timedelta(days=d)).isoformat(): d for d in range(30)}, start, 30)
+    assert abs(rising["slope_per_day"] - 1.0) < 1e-6 and rising["direction"] == "increasing", rising
+    assert abs(rising["projected_next_7_days"] - sum(range(30, 37))) < 0.5, rising
+    flat = trend({(start + timedelta(days=d)).isoformat(): 5 for d in range(30)}, start, 30)
+    assert flat["slope_per_day"] == 0 and flat["direction"] == "stable" and flat["daily_mean"] == 5
+    falling = trend({(start + timedelta(days=d)).isoformat(): 30 - d for d in range(30)}, start, 30)
+    assert falling["direction"] == "decreasing"
+    print("   ✓ Least-squares slope, direction and 7-day projection")
+
+
+def synthetic_incidents(rng: random.Random, start: int, count: int, today: date):
+    reports, calls = [], []
+    for i in range(start, start + count):
+        when = datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc) - timedelta(
+            days=rng.randint(0, 60), minutes=rng.randint(0, 1439))
+        incident_type, location = rng.choice(INCIDENT_TYPES), rng.choice(LOCATIONS)
+        if i % 4:
+            reports.append({"id": f"rpt-{i}", "incident_type": incident_type, "location": location,
+                            "incident_date": when.date().isoformat(), "incident_time": f"{when:%H:%M}",
+                            "created_at": (when + timedelta(hours=1)).isoformat()})
+        else:
+            calls.append({"id": f"call-{i}", "incident_type": incident_type, "location": location,
+                          "status": "Closed", "created_at": when.isoformat(),
+                          "closed_at": (when + timedelta(hours=1)).isoformat()})
+    return reports, calls
+
+
+async def insert_incidents(db, reports, calls):
+    for collection, docs in ((db.reports, reports), (db.active_calls, calls)):
+        for start in range(0, len(docs), 10000):
+            await collection.insert_many(docs[start:start + 10000], ordered=False)
+
+
+async def stats_by_key(db) -> dict:
+    return {doc["_id"]: doc["count"] async for doc in db[STATS_COLLECTION].find({}, {"count": 1})}
+
+
+async def benchmark(num_incidents: int):
+    print(f"\n3. Incremental refresh at {num_incidents:,} incidents:")
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_crime_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    rng = random.Random(11)
+    today = datetime.now(timezone.utc).date()
+
+    try:
+        reports, calls = synthetic_incidents(rng, 0, num_incidents, today)
+        await insert_incidents(db, reports, calls)
+        analytics = CrimeAnalytics()
+        summary = await analytics.refresh(db, full=True)
+        print(f"   Full rebuild in {summary['refresh_ms']:.0f}ms")
+        expected = Counter(doc["incident_type"] for doc in reports + calls)
+        assert summary["total_incidents"] == num_incidents, summary["total_incidents"]
+        assert summary["counts_by_type"] == dict(expected), summary["counts_by_type"]
+        assert sum(summary["time_patterns"]["by_hour"]) == num_incidents
+        print(f"   ✓ Counts by type and hour of week add up to all {num_incidents:,} incidents")
+
+        # New incidents folded by two processes at once (two instances: separate locks, one lease)
+        more_reports, more_calls = synthetic_incidents(rng, num_incidents, num_incidents // 10, today)
+        await insert_incidents(db, more_reports, more_calls)
+        started = time.perf_counter()
+        await asyncio.gather(CrimeAnalytics().refresh(db), CrimeAnalytics().refresh(db))
+        print(f"   Two concurrent incremental refreshes in {(time.perf_counter() - started) * 1000:.0f}ms")
+        incremental = await stats_by_key(db)
+        await CrimeAnalytics().refresh(db, full=True)
+        rebuilt = await stats_by_key(db)
+        assert incremental == rebuilt, "incremental counters differ from a full rebuild"
+        print(f"   ✓ {len(rebuilt):,} counters match a full rebuild (nothing folded twice)")
+
+        timings = []
+        for _ in range(50):
+            t0 = time.perf_counter()
+            await analytics.summary(db, DEFAULT_WINDOW_DAYS)
+            timings.append((time.perf_counter() - t0) * 1000)
+        timings.sort()
+        print(f"   ✓ Materialized summary read: p50 {timings[25]:.1f}ms, p95 {timings[47]:.1f}ms")
+        assert await db[SUMMARY_COLLECTION].count_documents({"_id": LEASE_ID}) == 0
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Crime Analytics Test")
+    print("=" * 60)
+    check_counters()
+    check_trend()
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
+    print("\n" + "=" * 60)
+    print("✅ Crime analytics test complete!")
+    print("=" * 60)
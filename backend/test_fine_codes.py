@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Violation catalog: effective-dated lookups, hot reload, publishing and lookup throughput
+
+Usage: python test_fine_codes.py [num_lookups]   (default 1,000,000)
+"""
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fine_codes import CatalogIndex, UnknownViolationCode, ViolationCatalog, DEFAULT_CATALOG_PATH, check_successor
+
+CATALOG = {
+    "version": "test-1",
+    "violations": [
+        {"code": "VC-22350", "description": "Speeding", "category": "Traffic",
+         "fines": [{"effective_from": "2000-01-01", "amount": 238.0}, {"effective_from": "2025-07-01", "amount": 250.0}]},
+        {"code": "PC-459", "description": "Burglary", "category": "Criminal", "court_determined": True,
+         "fines": [{"effective_from": "2000-01-01", "amount": 0.0}]},
+    ],
+}
+
+
+def check_lookups():
+    print("\n1. Effective-dated lookups:")
+    index = CatalogIndex(CATALOG)
+    assert index.lookup("VC-22350", "2025-06-30T23:59").amount == 238.0
+    assert index.lookup("vc 22350", "2025-07-01").amount == 250.0
+    assert index.lookup("VC-22350", "2025-06-30").effective_to == "2025-07-01"
+    assert index.lookup("PC-459", "2020-01-01").court_determined
+    for code, day in [("VC-99999", "2025-01-01"), ("VC-22350", "1999-12-31")]:
+        try:
+            index.lookup(code, day)
+            raise AssertionError(f"{code} on {day} should not be priced")
+        except UnknownViolationCode:
+            pass
+    print("   ✓ Fine in effect on the citation date; unknown codes and dates raise")
+
+    results = index.fines([("VC-22350", "2024-01-01"), ("BAD", None), ("VC-22350", "not a date")])
+    assert [r["status"] for r in results] == ["ok", "error", "error"]
+    print("   ✓ Bulk pricing reports per-item errors")
+
+    shipped = CatalogIndex(json.loads(DEFAULT_CATALOG_PATH.read_text()))
+    assert shipped.lookup("VC-23152").amount == 1800.0 and len(shipped) == 20
+    print(f"   ✓ Shipped catalog {shipped.version}: {len(shipped)} codes")
+
+
+def check_reload():
+    print("\n2. Hot reload:")
+    path = Path(tempfile.mkdtemp()) / "catalog.json"
+    path.write_text(json.dumps(CATALOG))
+    catalog = ViolationCatalog(path)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            index = catalog.index
+            try:
+                amount = index.lookup("VC-22350", "2025-08-01").amount
+                assert amount == (250.0 if index.version == "test-1" else 300.0)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    updated = json.loads(json.dumps(CATALOG))
+    updated["version"] = "test-2"
+    updated["violations"][0]["fines"].append({"effective_from": "2025-08-01", "amount": 300.0})
+    for _ in range(200):
+        path.write_text(json.dumps(updated))
+        catalog.reload()
+        path.write_text(json.dumps(CATALOG))
+        catalog.reload()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert not errors, errors[:3]
+    print(f"   ✓ {catalog.reloads} reloads under 4 concurrent readers, no torn reads")
+
+    path.write_text('{"version": "bad", "violations": [{"code": "X", "fines": [{"effective_from": "2000-01-01", "amount": -1}]}]}')
+    try:
+        catalog.reload()
+        raise AssertionError("Invalid catalog should not load")
+    except ValueError:
+        pass
+    assert catalog.index.version == "test-1"
+    print("   ✓ Invalid file rejected, previous version stays live")
+
+
+def check_publish():
+    print("\n3. Publishing:")
+    path = Path(tempfile.mkdtemp()) / "catalog.json"
+    path.write_text(json.dumps(CATALOG))
+    catalog = ViolationCatalog(path)
+    today = "2025-08-01"
+
+    def edited(version, change):
+        data = json.loads(json.dumps(CATALOG))
+        data["version"] = version
+        change(data["violations"])
+        return data
+
+    rejected = {
+        "same version": edited("test-1", lambda v: v[0]["fines"].append({"effective_from": "2026-01-01", "amount": 260.0})),
+        "amount in effect": edited("test-2", lambda v: v[0]["fines"][1].update(amount=275.0)),
+        "past fine added": edited("test-2", lambda v: v[0]["fines"].append({"effective_from": today, "amount": 260.0})),
+        "code removed": edited("test-2", lambda v: v.pop(1)),
+    }
+    for reason, data in rejected.items():
+        try:
+            catalog.publish(data, today=today)
+            raise AssertionError(f"{reason} should be rejected")
+        except ValueError:
+            pass
+    assert catalog.index.version == "test-1" and not catalog.history_dir.exists()
+    print("   ✓ Same version, changed or removed fines in effect rejected")
+
+    future = edited("test-2", lambda v: (v[0]["fines"].append({"effective_from": "2025-08-02", "amount": 260.0}),
+                                         v.append({"code": "VC-1", "fines": [{"effective_from": "2025-09-01", "amount": 5.0}]})))
+    catalog.publish(future, today=today)
+    assert catalog.index.lookup("VC-22350", "2025-08-02").amount == 260.0
+    assert json.loads(catalog.archive_path("test-1").read_text()) == CATALOG
+    # VC-1 isn't in effect yet, so the next version may drop it
+    catalog.publish(edited("test-3", lambda v: v[0]["fines"].append({"effective_from": "2025-08-02", "amount": 260.0})),
+                    today=today)
+    assert "VC-1" not in catalog.index and catalog.archive_path("test-2").exists()
+    try:
+        catalog.publish(edited("test-1", lambda v: v[0]["fines"].append({"effective_from": "2025-08-02", "amount": 260.0})),
+                        today=today)
+        raise AssertionError("An archived version should not be published again")
+    except ValueError:
+        pass
+    check_successor(catalog.index, CatalogIndex(edited("test-4", lambda v: v.pop())), today="1999-01-01")
+    print("   ✓ Future fines published, replaced versions archived, versions never reused")
+
+
+def check_throughput(n: int):
+    print(f"\n4. Lookup throughput ({n:,} lookups):")
+    index = CatalogIndex(json.loads(DEFAULT_CATALOG_PATH.read_text()))
+    codes = [entry.code for entry in index.current()]
+    rng = random.Random(7)
+    items = [(rng.choice(codes), f"{rng.randint(2001, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00")
+             for _ in range(n)]
+
+    started = time.perf_counter()
+    for code, day in items:
+        index.lookup(code, day)
+    elapsed = time.perf_counter() - started
+    print(f"   ✓ single: {n / elapsed:,.0f} lookups/s ({elapsed / n * 1e6:.2f}µs each)")
+
+    started = time.perf_counter()
+    results = index.fines(items)
+    elapsed = time.perf_counter() - started
+    assert all(r["status"] == "ok" for r in results)
+    print(f"   ✓ bulk:   {n / elapsed:,.0f} citations/s")
+
+
+def main(n: int):
+    print("=" * 60)
+    print("Violation Catalog Test")
+    print("=" * 60)
+    check_lookups()
+    check_reload()
+    check_publish()
+    check_throughput(n)
+    print("\n" + "=" * 60)
+    print("✅ Violation catalog test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
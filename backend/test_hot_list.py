@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Hot list: hit checks, snapshots, and Bloom filter memory / false positives at scale
+
+Usage: python test_hot_list.py [num_entries]   (default 10,000,000)
+The positives dict is measured at min(num_entries, 1,000,000) and scaled up.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from hot_list import BloomFilter, HotList
+
+
+def check_hits():
+    print("\n1. Hit checks:")
+    hot_list = HotList(capacity=1000)
+    hot_list.loaded_at = time.time()
+    hot_list.upsert_vehicle({"id": "v1", "plate_number": "XYZ 789", "registration_status": "Expired", "flags": ["STOLEN"]})
+    hot_list.upsert_vehicle({"id": "v2", "plate_number": "ABC123", "registration_status": "Active", "flags": []})
+    hot_list.upsert_person({"id": "p1", "first_name": "John", "last_name": "Doe", "dob": "1985-03-15",
+                            "drivers_license": "D1234567", "warrants": [{"type": "Traffic"}]})
+    assert hot_list.check_plate("xyz-789") == {"vehicle:v1": "EXPIRED,STOLEN"}
+    assert hot_list.check_plate("ABC123") is None
+    assert hot_list.check_owner("Doe, John") == {"person:p1": "1 warrant(s)"}
+    assert hot_list.check_person(drivers_license="d-1234567") == {"person:p1": "1 warrant(s)"}
+    assert hot_list.check_person(first_name="John", last_name="Doe", dob="1985-03-15")
+    print("   ✓ Plates, owners and persons found by normalized keys")
+
+    hot_list.upsert_person({"id": "p1", "first_name": "John", "last_name": "Doe", "dob": "1985-03-15", "warrants": []})
+    assert hot_list.check_person(person_id="p1") is None and hot_list.stale == 4
+    print("   ✓ Cleared warrants drop out at once (stale filter bits wait for the rebuild)")
+
+    path = os.path.join(tempfile.mkdtemp(), "hot_list.npz")
+    hot_list.snapshot_path = path
+    hot_list.save_snapshot()
+    restored = HotList(snapshot_path=path)
+    assert restored.load_snapshot() and restored.loaded
+    assert restored.check_plate("XYZ789") == {"vehicle:v1": "EXPIRED,STOLEN"}
+    assert restored.check_person(person_id="p1") is None
+    print("   ✓ Snapshot round trip")
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for HotList.build: find(...).batch_size(n) as an async iterator."""
+
+    def __init__(self, docs, on_read=None):
+        self.docs, self.on_read = docs, on_read
+
+    def find(self, query, projection):
+        return self
+
+    def batch_size(self, n):
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+            await asyncio.sleep(0)
+        if self.on_read:
+            self.on_read()
+
+
+def check_rebuild_keeps_writes():
+    print("\n2. Writes during a rebuild:")
+    hot_list = HotList(capacity=1000)
+    hot_list.loaded_at = time.time()
+    stolen = {"id": "v1", "plate_number": "XYZ789", "flags": ["STOLEN"]}
+    wanted = {"id": "p9", "first_name": "Ann", "last_name": "Lee", "dob": "1990-01-01", "warrants": [{"type": "Felony"}]}
+
+    class DB:
+        # The warrant lands after the build has already read persons
+        vehicles = FakeCollection([stolen])
+        persons = FakeCollection([], on_read=lambda: hot_list.upsert_person(wanted))
+
+    asyncio.run(hot_list._rebuild(DB()))
+    assert hot_list.check_plate("XYZ789") and hot_list.check_person(person_id="p9")
+    assert hot_list.check_owner("Lee, Ann") == {"person:p9": "1 warrant(s)"}
+    print("   ✓ A warrant written mid-rebuild is replayed onto the new list")
+
+
+def positives_bytes_per_entry(n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = {f"plate:BN{i:08d}": {f"vehicle:{i:036d}": "STOLEN"} for i in range(n)}
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del entries
+    return used / n
+
+
+def check_scale(n: int):
+    print(f"\n3. Bloom filter at {n:,} entries (1% target):")
+    bloom = BloomFilter(capacity=n, error_rate=0.01)
+    started = time.perf_counter()
+    chunk = 1_000_000
+    for start in range(0, n, chunk):
+        bloom.add_many(f"plate:BN{i:08d}" for i in range(start, min(start + chunk, n)))
+    build = time.perf_counter() - started
+    print(f"   ✓ {bloom.nbytes / 2 ** 20:,.1f} MiB ({bloom.num_bits / n:.1f} bits/entry, {bloom.num_hashes} probes), "
+          f"built in {build:.1f}s")
+
+    probes = 200_000
+    assert all(f"plate:BN{i:08d}" in bloom for i in range(0, n, max(n // 1000, 1)))
+    started = time.perf_counter()
+    false_positives = sum(f"plate:ZZ{i:08d}" in bloom for i in range(probes))
+    per_lookup = (time.perf_counter() - started) / probes * 1e6
+    print(f"   ✓ no false negatives; false positive rate {false_positives / probes:.4f} "
+          f"(expected {bloom.expected_error_rate():.4f}), {per_lookup:.2f}µs per negative lookup")
+
+    sample = min(n, 1_000_000)
+    per_entry = positives_bytes_per_entry(sample)
+    print(f"\n4. Positives dict: ~{per_entry:,.0f} bytes/entry (measured at {sample:,}), "
+          f"~{per_entry * n / 2 ** 30:,.2f} GiB at {n:,}")
+
+
+def main(n: int):
+    print("=" * 60)
+    print("Hot List Test")
+    print("=" * 60)
+    check_hits()
+    check_rebuild_keeps_writes()
+    check_scale(n)
+    print("\n" + "=" * 60)
+    print("✅ Hot list test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
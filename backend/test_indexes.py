@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Verify that every server.py query shape is served by an index (explain plans)"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from db_migrations import bootstrap_database, verify_indexes, MIGRATIONS
+
+
+async def check_indexes():
+    print("=" * 60)
+    print("Index / Explain Plan Test")
+    print("=" * 60)
+
+    # Use a scratch database so the real one is never touched
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_index_test"
+    await client.drop_database(db_name)
+    db = client[db_name]
+
+    try:
+        print("\n1. Bootstrap:")
+        applied = await bootstrap_database(db)
+        assert applied == [version for version, _, _ in MIGRATIONS], applied
+        print(f"   ✓ Applied migrations {applied}")
+
+        print("\n2. Bootstrap is idempotent:")
+        assert await bootstrap_database(db) == []
+        print("   ✓ Second run applied nothing")
+
+        print("\n3. Explain plans:")
+        results = await verify_indexes(db)
+        for result in results:
+            mark = "✓" if result["ok"] else "✗"
+            print(f"   {mark} {result['collection']} {result['query']} -> {result['used_indexes'] or 'COLLSCAN'}")
+        assert all(result["ok"] for result in results), "Some queries do not use their index"
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print("\n" + "=" * 60)
+    print("✅ Index test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(check_indexes())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Event-loop lag during a login burst: bcrypt inline vs on the password pool
+
+Usage: python test_password_pool.py [logins]   (default 50)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from passlib.context import CryptContext
+from password_pool import PasswordPool, PoolBusy
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+TICK = 0.01
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    """Stand-in for webhooks / the media relay: how late does a 10ms timer fire?"""
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - t0 - TICK) * 1000)
+
+
+async def burst(logins: int, verify) -> dict:
+    hashed = pwd_context.hash("shift-change")
+    lags, stop = [], asyncio.Event()
+    tick_task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK * 2)
+
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(verify("shift-change", hashed) for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - t0
+
+    stop.set()
+    await tick_task
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "ok": sum(1 for r in results if r is True),
+        "busy": sum(1 for r in results if isinstance(r, PoolBusy)),
+        "p50": lags[len(lags) // 2] if lags else 0.0,
+        "max": lags[-1] if lags else 0.0,
+    }
+
+
+async def main(logins: int):
+    print("=" * 60)
+    print("Password Pool Test")
+    print("=" * 60)
+
+    async def inline(password, hashed):
+        return pwd_context.verify(password, hashed)
+
+    pool = PasswordPool(pwd_context)
+    small_pool = PasswordPool(pwd_context, max_workers=2, max_pending=4)
+    try:
+        print(f"\n1. Event-loop lag during {logins} concurrent logins:")
+        for name, verify in [("inline", inline), (f"pool ({pool.max_workers} workers)", pool.verify)]:
+            r = await burst(logins, verify)
+            print(f"   {name:<18} {r['elapsed']:.2f}s total, loop lag p50 {r['p50']:.1f}ms, max {r['max']:.1f}ms")
+
+        print("\n2. Queue limit:")
+        r = await burst(20, small_pool.verify)
+        assert r["ok"] == 4 and r["busy"] == 16
+        print(f"   ✓ {r['ok']} accepted, {r['busy']} refused with PoolBusy (max_pending=4)")
+
+        print("\n3. Bulk provisioning hash:")
+        t0 = time.perf_counter()
+        hashes = await pool.hash_many([f"password-{i}" for i in range(logins)])
+        assert pwd_context.verify("password-0", hashes[0])
+        print(f"   ✓ {logins} hashes in {time.perf_counter() - t0:.2f}s")
+
+        print("\n4. Bulk hash refused mid-batch:")
+        busy_pool = PasswordPool(pwd_context, max_workers=4, max_pending=2)
+        try:
+            await busy_pool.hash_many([f"password-{i}" for i in range(4)])
+            raise AssertionError("expected PoolBusy")
+        except PoolBusy:
+            pass
+        finally:
+            busy_pool.shutdown()
+        assert busy_pool.pending == 0, busy_pool.stats()
+        print("   ✓ PoolBusy raised with nothing left queued on the pool")
+    finally:
+        pool.shutdown()
+        small_pool.shutdown()
+
+    print("\n" + "=" * 60)
+    print("✅ Password pool test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
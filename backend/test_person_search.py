@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Person search: phonetic/normalization checks and latency benchmark
+
+Usage: python test_person_search.py [num_persons] [base_url]   (default 1,000,000)
+With base_url, also checks citation offender resolution against a live server
+(credentials from RMS_USERNAME / RMS_PASSWORD, default admin / admin123).
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+import requests
+from motor.motor_asyncio import AsyncIOMotorClient
+from db_migrations import bootstrap_database, explain_index_usage
+from name_search import (normalize_name, metaphone, person_name_keys, build_person_query, person_search_tiers,
+                         rank_persons, search_person_page, PERSON_SEARCH_SORT)
+
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+              "Moore", "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "O'Brien"]
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William",
+               "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+               "Christopher", "Karen", "Steven", "Catherine", "Jon", "Kathryn"]
+
+
+def check_keys():
+    print("\n1. Normalization / phonetic keys:")
+    assert normalize_name("O'Brien-Núñez") == "obriennunez"
+    assert metaphone("Smith") == metaphone("Smyth")
+    assert metaphone("Jon") == metaphone("John")
+    assert metaphone("Catherine") == metaphone("Kathryn")
+    assert metaphone("Phillips") == metaphone("Philips")
+    # A leading H is sounded; only digraphs (CH, SH, PH, TH, GH) silence it
+    assert metaphone("Hernandez").startswith("H") and metaphone("Hall") == "HL"
+    assert metaphone("Harris") != metaphone("Rees")
+    ranked = rank_persons([
+        {"first_name": "Jon", "last_name": "Smyth"},
+        {"first_name": "John", "last_name": "Smith"},
+        {"first_name": "John", "last_name": "Smithers"},
+    ], first_name="John", last_name="Smith")
+    assert [p["last_name"] for p in ranked] == ["Smith", "Smithers", "Smyth"], ranked
+    scores = [score for score, _ in person_search_tiers("John", "Smith")]
+    assert scores == sorted(set(scores), reverse=True) and scores[0] == 300, scores
+    print("   ✓ Keys and ranking behave as expected")
+
+
+def synthetic_person(rng: random.Random, i: int) -> dict:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES) + (str(i % 997) if i % 3 else "")
+    return {
+        "id": f"bench-{i}",
+        "first_name": first,
+        "last_name": last,
+        "dob": f"{rng.randint(1940, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "drivers_license": f"D{i:07d}",
+        **person_name_keys(first, last),
+    }
+
+
+async def benchmark(num_persons: int):
+    print(f"\n2. Search latency at {num_persons:,} persons:")
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_search_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    rng = random.Random(42)
+
+    try:
+        await bootstrap_database(db)
+        started = time.perf_counter()
+        for start in range(0, num_persons, 10000):
+            batch = [synthetic_person(rng, i) for i in range(start, min(start + 10000, num_persons))]
+            await db.persons.insert_many(batch, ordered=False)
+        print(f"   Loaded in {time.perf_counter() - started:.1f}s")
+
+        searches = [("John", "Smith"), ("Jon", "Smyth"), (None, "Thom"), ("Kathryn", "Obrien"), (None, "Garc")]
+        for first, last in searches:
+            # The score tiers are disjoint and cover the plain query, and come back in rank order
+            matched = await db.persons.count_documents(build_person_query(first, last))
+            tiers = person_search_tiers(first, last)
+            counts = [await db.persons.count_documents(query) for _, query in tiers]
+            assert sum(counts) == matched, (first, last, counts, matched)
+            page = []
+            for _, query in tiers:
+                page += await db.persons.find(query, {"_id": 0}).sort(PERSON_SEARCH_SORT).limit(100 - len(page)).to_list(None)
+                if len(page) >= 100:
+                    break
+            assert [p["id"] for p in rank_persons(list(page), first, last)] == [p["id"] for p in page], (first, last)
+        print("   ✓ Score tiers cover every match and page in rank order")
+
+        # search_person's own path: count every tier, then read the page from the tiers it overlaps
+        dob_only = (await db.persons.find_one({}, {"dob": 1}))["dob"]
+        cases = [(first, last, None, 1) for first, last in searches] + [
+            ("John", "Smith", None, 50),   # deep page: skip inside a later tier
+            ("John", None, None, 1),       # first name only
+            ("Kath", None, None, 20),
+            (None, None, dob_only, 1),     # DOB only
+        ]
+        for first, last, dob, _ in cases:
+            for _, query in person_search_tiers(first, last, dob):
+                used = await explain_index_usage(db, "persons", query, PERSON_SEARCH_SORT)
+                assert used, (first, last, dob, query)
+        print("   ✓ Every tier, with or without a last name, reads from an index")
+        for first, last, dob, page in cases:
+            timings = []
+            for _ in range(20):
+                t0 = time.perf_counter()
+                results, total = await search_person_page(db.persons, first, last, dob, None,
+                                                          (page - 1) * 100, page * 100)
+                rank_persons(results, first, last)
+                timings.append((time.perf_counter() - t0) * 1000)
+            timings.sort()
+            label = " ".join(part for part in (first, last, dob) if part)
+            print(f"   ✓ {label} page {page}: {len(results)} of {total} hits, "
+                  f"p50 {timings[10]:.1f}ms, p95 {timings[18]:.1f}ms")
+
+        # The old unanchored regex search for comparison
+        t0 = time.perf_counter()
+        await db.persons.find({"last_name": {"$regex": "Smith", "$options": "i"}}, {"_id": 0}).to_list(100)
+        print(f"   (legacy regex search: {(time.perf_counter() - t0) * 1000:.1f}ms)")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+def check_split_identity(base_url: str):
+    print("\n3. Offender whose DL and name + DOB belong to two different persons:")
+    login = requests.post(f"{base_url}/api/auth/login", json={
+        "username": os.environ.get("RMS_USERNAME", "admin"),
+        "password": os.environ.get("RMS_PASSWORD", "admin123"),
+    })
+    login.raise_for_status()
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    run = uuid.uuid4().hex[:8]
+    name, dl, dob = f"Split{run}, Hector", f"S{run.upper()}", "1985-03-04"
+
+    def cite(**offender):
+        response = requests.post(f"{base_url}/api/citations", headers=headers, json={
+            "citation_type": "traffic", "violation_code": "VC-22350", "violation_description": "Split identity test",
+            "offender_name": name, "location": "Main St & 1st Ave", "date_time": "2025-01-15T14:30", **offender,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()["person_id"]
+
+    by_dl = cite(offender_dl=dl)
+    by_name = cite(offender_dob=dob)
+    assert by_dl != by_name
+    # Both keys taken by different persons: resolved by DL, no 500
+    assert cite(offender_dl=dl, offender_dob=dob) == by_dl
+    print("   ✓ Citation with both keys links to the DL holder")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Person Search Test")
+    print("=" * 60)
+    check_keys()
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
+    if len(sys.argv) > 2:
+        check_split_identity(sys.argv[2].rstrip("/"))
+    print("\n" + "=" * 60)
+    print("✅ Person search test complete!")
+    print("=" * 60)
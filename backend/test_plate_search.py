@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Partial-plate search: pattern checks, ALPR batch hit checks and latency benchmark
+
+Usage: python test_plate_search.py [num_plates]   (default 2,000,000)
+"""
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from db_migrations import bootstrap_database
+from plate_search import normalize_plate, vehicle_plate_keys, build_plate_query, rank_vehicles, PLATE_RANK_PROJECTION
+from plate_batch import (read_key, owner_name_key, address_key, group_owners, pick_vehicle, vehicle_hits,
+                         needs_narrative, hit_signature, HIT_OWNER_WARRANT, HIT_POSSIBLE_OWNER_WARRANT)
+
+
+# search_vehicle's PLATE_CANDIDATE_LIMIT default
+PLATE_CANDIDATE_LIMIT = 2000
+
+
+def matches(pattern, plates):
+    """Run a pattern over in-memory records the way Mongo + rank_vehicles would."""
+    records = [{"plate_number": p, **vehicle_plate_keys(p)} for p in plates]
+    query = build_plate_query(pattern)
+    wanted = set(query.get("plate_tokens", {}).get("$all", []))
+    candidates = [r for r in records if wanted <= set(r["plate_tokens"])]
+    return [r["plate_number"] for r in rank_vehicles(candidates, pattern)]
+
+
+def check_patterns():
+    print("\n1. Pattern matching:")
+    assert normalize_plate("7k-o 13") == "7KO13"
+    plates = ["7KO13", "7K013", "7KAB3", "7KAB4", "ABC123", "8ABC123", "7K-X-993"]
+    assert set(matches("7K??3", plates)) == {"7KO13", "7K013", "7KAB3"}
+    assert set(matches("7K*3", plates)) == {"7KO13", "7K013", "7KAB3", "7K-X-993"}
+    assert matches("ABC123", plates)[0] == "ABC123"  # exact match ranks first
+    assert "ABC123" in matches("A8C", plates)        # B/8 lookalike
+    assert matches("7KOI3", plates)[0] == "7KO13"    # verbatim characters beat lookalikes
+    # Only a verbatim character at the position given counts: the 0 elsewhere in 7KO0 doesn't
+    scores = {r["plate_number"]: r["match_score"]
+              for r in rank_vehicles([{"plate_number": p, **vehicle_plate_keys(p)} for p in ("7K0O", "7KO0")], "7K0?")}
+    assert scores["7K0O"] > scores["7KO0"], scores
+    # Too broad to narrow through the token index
+    for pattern in ("7", "*", "7???", "*A?B*"):
+        try:
+            build_plate_query(pattern)
+            raise AssertionError(f"{pattern} should be rejected")
+        except ValueError:
+            pass
+    print("   ✓ Wildcards, lookalikes and ranking behave as expected")
+
+
+def check_batch_hits():
+    print("\n2. ALPR batch hits:")
+    assert read_key("7k-o 13", " ca") == ("7KO13", "CA")
+    assert owner_name_key("John Q Smith") == owner_name_key("Smith, John Q") == ("john", "smith")
+    assert owner_name_key("Cher") is None and owner_name_key(None) is None
+    assert address_key("123 Main Street, Fresno CA") == address_key("123  MAIN ST.") == "123 main st"
+    assert address_key(None) == ""
+
+    ca, nv = {"plate_normalized": "7KO13", "state": "CA"}, {"plate_normalized": "7KO13", "state": "NV"}
+    assert pick_vehicle([ca, nv], "NV") is nv
+    assert pick_vehicle([ca], "") is ca
+    assert pick_vehicle([ca, nv], "AZ") is None  # same plate, two other states
+
+    def person(person_id, address):
+        return {"id": person_id, "first_name_key": "john", "last_name_key": "smith", "address": address,
+                "warrants": [{"type": "FTA"}]}
+    vehicle = {"registered_owner": "John Smith", "owner_address": "123 Main Street, Fresno", "registration_status": "VALID"}
+    owners = group_owners([person("p1", "123 Main St"), person("p2", "9 Elm Ave")])
+    assert len(owners[("john", "smith")]) == 2  # namesakes are all kept
+
+    # The namesake at the owner's address is the owner; the other isn't reported
+    hits = vehicle_hits(vehicle, owners)
+    assert [(hit["type"], hit.get("person_id")) for hit in hits] == [(HIT_OWNER_WARRANT, "p1")]
+    assert needs_narrative(hits)
+
+    # No namesake at the owner's address: one name-only hit, not narrated
+    hits = vehicle_hits({**vehicle, "owner_address": "500 Oak Rd"}, owners)
+    assert [hit["type"] for hit in hits] == [HIT_POSSIBLE_OWNER_WARRANT]
+    assert hits[0]["person_ids"] == ["p1", "p2"]
+    assert not needs_narrative(hits)
+    assert [hit["type"] for hit in vehicle_hits({**vehicle, "owner_address": None}, owners)] == [HIT_POSSIBLE_OWNER_WARRANT]
+
+    # Registration problems are hits without a narrative; other flags are narrated
+    hits = vehicle_hits({"registration_status": "expired", "flags": ["EXPIRED", "stolen"]}, {})
+    assert [(hit["type"], hit["detail"]) for hit in hits] == [("registration", "EXPIRED"), ("flag", "STOLEN")]
+    assert needs_narrative(hits)
+    assert not needs_narrative(hits[:1])
+    assert vehicle_hits(None, owners) == [] and not needs_narrative([])
+    assert hit_signature(hits) == hit_signature(hits[::-1]) == "alpr:flag=STOLEN,registration=EXPIRED"
+    print("   ✓ Owner warrants need a matching address; name-only matches aren't narrated")
+
+
+def synthetic_plate(rng: random.Random) -> str:
+    # California-style 1ABC234 plus a sprinkling of vanity plates
+    if rng.random() < 0.9:
+        return f"{rng.randint(1, 9)}{''.join(rng.choices(string.ascii_uppercase, k=3))}{rng.randint(0, 999):03d}"
+    return "".join(rng.choices(string.ascii_uppercase + string.digits, k=rng.randint(4, 7)))
+
+
+async def benchmark(num_plates: int):
+    print(f"\n3. Search latency at {num_plates:,} plates:")
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_plate_bench"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    rng = random.Random(7)
+
+    try:
+        await bootstrap_database(db)
+        started = time.perf_counter()
+        for start in range(0, num_plates, 10000):
+            batch = []
+            for i in range(start, min(start + 10000, num_plates)):
+                plate = synthetic_plate(rng)
+                batch.append({"id": f"bench-{i}", "plate_number": plate, "state": "CA", **vehicle_plate_keys(plate)})
+            await db.vehicles.insert_many(batch, ordered=False)
+        print(f"   Loaded in {time.perf_counter() - started:.1f}s")
+
+        for pattern in ["7KQR??3", "7K*3", "ABC", "?XYZ12?", "5S0D*"]:
+            timings = []
+            for _ in range(20):
+                t0 = time.perf_counter()
+                # Bounded like search_vehicle: past the limit it answers 400 instead of ranking
+                candidates = await db.vehicles.find(build_plate_query(pattern), PLATE_RANK_PROJECTION).to_list(
+                    PLATE_CANDIDATE_LIMIT + 1)
+                results = rank_vehicles(candidates, pattern) if len(candidates) <= PLATE_CANDIDATE_LIMIT else None
+                timings.append((time.perf_counter() - t0) * 1000)
+            timings.sort()
+            hits = f"{len(results)} hits" if results is not None else f"over {PLATE_CANDIDATE_LIMIT}, refused"
+            print(f"   ✓ {pattern}: {hits}, p50 {timings[10]:.1f}ms, p95 {timings[18]:.1f}ms")
+
+        # The old unanchored regex search for comparison
+        t0 = time.perf_counter()
+        await db.vehicles.find({"plate_number": {"$regex": "ABC", "$options": "i"}}, {"_id": 0}).to_list(100)
+        print(f"   (legacy regex search: {(time.perf_counter() - t0) * 1000:.1f}ms)")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Plate Search Test")
+    print("=" * 60)
+    check_patterns()
+    check_batch_hits()
+    asyncio.run(benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000))
+    print("\n" + "=" * 60)
+    print("✅ Plate search test complete!")
+    print("=" * 60)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Record import: chunk preparation, resuming an interrupted job, and uploading
+a generated CSV extract to /admin/imports and timing it
+
+Usage:
+    python test_record_import.py [base_url] [num_rows]   (default http://localhost:8000, 100,000)
+The resume check runs run_import directly against MONGO_URL (scratch database);
+the upload checks run against a live server. Credentials come from
+RMS_USERNAME / RMS_PASSWORD (default admin / admin123).
+Every tenth row repeats an earlier driver's licence, so some rows update
+rather than insert.
+"""
+import asyncio
+import csv
+import io
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import requests
+from dotenv import load_dotenv
+load_dotenv(Path(__file__).parent / '.env')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from db_migrations import bootstrap_database
+from record_import import JOBS_COLLECTION, STATUS_COMPLETED, STATUS_FAILED, merge_updates, prepare_chunk, run_import
+from server import IMPORT_KINDS
+
+
+def login(base_url: str) -> str:
+    response = requests.post(f"{base_url}/api/auth/login", json={
+        "username": os.environ.get("RMS_USERNAME", "admin"),
+        "password": os.environ.get("RMS_PASSWORD", "admin123"),
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def make_extract(n: int, run: str) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["first_name", "last_name", "dob", "drivers_license", "dl_state", "city", "flags"])
+    for i in range(n):
+        driver = i - 1 if i % 10 == 9 else i
+        writer.writerow([f"Import{driver}", f"Test{run[:6]}", f"19{50 + driver % 50}-01-{driver % 28 + 1:02d}",
+                         f"I{run[:4].upper()}{driver:07d}", "CA", "Los Angeles", ""])
+    writer.writerow(["", "MissingFirst", "1990-01-01", "", "", "", ""])
+    return out.getvalue().encode()
+
+
+def check_prepare_chunk():
+    print("\n1. Chunk preparation:")
+    earlier = {"$set": {"city": "Fresno", "phone": "555-0100"}, "$setOnInsert": {"id": "a", "notes": "x", "state": "CA"},
+               "$addToSet": {"identity_keys": {"$each": ["dl:D1"]}}}
+    later = {"$set": {"city": "Modesto", "state": "NV"}, "$setOnInsert": {"id": "b"},
+             "$addToSet": {"identity_keys": {"$each": ["nd:x", "dl:D1"]}}}
+    assert merge_updates(earlier, later) == {
+        "$set": {"city": "Modesto", "phone": "555-0100", "state": "NV"},   # later row wins field by field
+        "$setOnInsert": {"id": "b", "notes": "x"},                          # never both $set and $setOnInsert
+        "$addToSet": {"identity_keys": {"$each": ["dl:D1", "nd:x"]}},
+    }
+
+    rows = [
+        (1, {"first_name": "Ann", "last_name": "Lee", "dob": "1980-01-01", "drivers_license": "D1", "city": "Fresno"}, None),
+        (2, {"first_name": "Bob", "last_name": "Ray", "dob": "1970-05-05", "city": ""}, None),
+        (3, None, "Invalid JSON: Expecting value"),
+        (4, {"first_name": "Ann", "last_name": "Lee", "dob": "1980-01-01", "drivers_license": "d-1", "city": "Modesto"}, None),
+        (5, {"first_name": "Cy", "dob": "1990-01-01"}, None),
+    ]
+    operations, numbers, errors = prepare_chunk(rows, IMPORT_KINDS["persons"])
+    assert len(operations) == 2 and numbers == [2, 4]   # rows 1 and 4 are one licence, reported as row 4
+    ann = operations[1]._doc
+    assert ann["$set"]["city"] == "Modesto" and "city" not in operations[0]._doc["$set"]   # empty cells don't overwrite
+    assert [e["row"] for e in errors] == [3, 5] and errors[1]["error"].startswith("last_name")
+
+    operations, numbers, errors = prepare_chunk([(1, {"plate_number": "--", "state": "CA"}, None)], IMPORT_KINDS["vehicles"])
+    assert not operations and errors == [{"row": 1, "error": "plate_number has no letters or digits"}]
+    print("   ✓ Repeated records merged, row errors reported by row number")
+
+
+async def check_resume(n: int = 5000, chunk_size: int = 500):
+    print(f"\n2. Resuming an interrupted import ({n:,} rows, chunks of {chunk_size}):")
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"{os.environ.get('DB_NAME', 'law_enforcement_rms')}_import_test"
+    await client.drop_database(db_name)
+    db = client[db_name]
+    lines = make_extract(n, uuid.uuid4().hex).decode().splitlines(keepends=True)
+    expected = n - n // 10
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(job):
+        if job["rows_done"] >= n // 2:
+            raise Interrupted()
+
+    try:
+        await bootstrap_database(db)
+        try:
+            await run_import(db, "resume", lines, IMPORT_KINDS["persons"], "csv", chunk_size=chunk_size,
+                             on_progress=interrupt)
+            raise AssertionError("The import should have been interrupted")
+        except Interrupted:
+            pass
+        job = await db[JOBS_COLLECTION].find_one({"_id": "resume"})
+        stopped = job["rows_done"]
+        assert job["status"] == STATUS_FAILED and stopped == n // 2, job
+
+        progress = []
+        job = await run_import(db, "resume", lines, IMPORT_KINDS["persons"], "csv", chunk_size=chunk_size,
+                               on_progress=lambda job: progress.append(job["rows_done"]))
+        assert progress[0] == stopped + chunk_size, progress   # picks up after the checkpoint
+        assert job["status"] == STATUS_COMPLETED and job["rows_done"] == n + 1, job
+        assert job["upserted"] == expected and job["invalid"] == 1, job
+        assert await db.persons.count_documents({}) == expected
+        assert len(await db.persons.distinct("drivers_license")) == expected
+        print(f"   ✓ Stopped at row {stopped:,}, resumed at row {stopped + 1:,}: "
+              f"{expected:,} persons, none skipped or duplicated")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+def wait(session: requests.Session, base_url: str, job_id: str) -> dict:
+    while True:
+        job = session.get(f"{base_url}/api/admin/imports/{job_id}").json()
+        if job["status"] != "running":
+            return job
+        print(f"   … {job['rows_done']:,} rows ({job.get('rows_per_second') or 0:,.0f} rows/s)")
+        time.sleep(1)
+
+
+def main(base_url: str, n: int):
+    print("=" * 60)
+    print("Record Import Test")
+    print("=" * 60)
+    check_prepare_chunk()
+    asyncio.run(check_resume())
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {login(base_url)}"
+    extract = make_extract(n, uuid.uuid4().hex)
+
+    print(f"\n3. Importing {n:,} person rows:")
+    started = time.perf_counter()
+    response = session.post(f"{base_url}/api/admin/imports", params={"kind": "persons"},
+                            files={"file": ("persons.csv", extract, "text/csv")})
+    response.raise_for_status()
+    job = wait(session, base_url, response.json()["job_id"])
+    elapsed = time.perf_counter() - started
+    assert job["status"] == "completed", job
+    assert job["upserted"] == n - n // 10 and job["invalid"] == 1, job
+    print(f"   ✓ {job['rows_done']:,} rows in {elapsed:.1f}s ({job['rows_done'] / elapsed:,.0f} rows/s end to end)")
+    print(f"   ✓ {job['upserted']:,} new persons; repeated licences merged; "
+          f"invalid row reported: {job['errors'][0]['error']}")
+
+    print("\n4. Importing the same file again:")
+    response = session.post(f"{base_url}/api/admin/imports", params={"kind": "persons"},
+                            files={"file": ("persons.csv", extract, "text/csv")})
+    response.raise_for_status()
+    job = wait(session, base_url, response.json()["job_id"])
+    assert job["upserted"] == 0, job
+    print(f"   ✓ No new persons, {job['modified']:,} records updated in place")
+
+    print("\n" + "=" * 60)
+    print("✅ Record import test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
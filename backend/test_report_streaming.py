@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Report writer: time-to-first-token, buffered vs streaming endpoint
+
+Runs against a live server. Usage:
+    python test_report_streaming.py [base_url] [runs]   (default http://localhost:8000, 3)
+Credentials come from RMS_USERNAME / RMS_PASSWORD (default admin / admin123).
+"""
+import json
+import os
+import sys
+import time
+
+import requests
+
+REPORT = {
+    "incident_type": "Theft",
+    "date_time": "2025-01-15 14:30",
+    "location": "123 Main St",
+    "details": "Victim reports bicycle stolen from rack outside library between 1pm and 2pm. Lock was cut.",
+}
+
+
+def login(base_url: str) -> str:
+    response = requests.post(f"{base_url}/api/auth/login", json={
+        "username": os.environ.get("RMS_USERNAME", "admin"),
+        "password": os.environ.get("RMS_PASSWORD", "admin123"),
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def buffered(base_url: str, headers: dict) -> dict:
+    t0 = time.perf_counter()
+    response = requests.post(f"{base_url}/api/ai/generate-report", json=REPORT, headers=headers)
+    response.raise_for_status()
+    elapsed = (time.perf_counter() - t0) * 1000
+    # Nothing reaches the officer until the whole narrative is done
+    return {"ttft_ms": elapsed, "total_ms": elapsed, "chars": len(response.json()["narrative"])}
+
+
+def streamed(base_url: str, headers: dict) -> dict:
+    t0 = time.perf_counter()
+    ttft = None
+    chars = 0
+    with requests.post(f"{base_url}/api/ai/generate-report/stream?format=ndjson", json=REPORT,
+                       headers=headers, stream=True) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "token":
+                if ttft is None:
+                    ttft = (time.perf_counter() - t0) * 1000
+                chars += len(event["delta"])
+            elif event["type"] == "error":
+                raise RuntimeError(event["detail"])
+            elif event["type"] == "done":
+                assert event["draft_id"]
+    return {"ttft_ms": ttft, "total_ms": (time.perf_counter() - t0) * 1000, "chars": chars}
+
+
+def main(base_url: str, runs: int):
+    print("=" * 60)
+    print("Report Streaming Test")
+    print("=" * 60)
+    headers = {"Authorization": f"Bearer {login(base_url)}"}
+
+    for name, run in [("buffered /ai/generate-report", buffered), ("streamed /ai/generate-report/stream", streamed)]:
+        results = [run(base_url, headers) for _ in range(runs)]
+        ttft = sorted(r["ttft_ms"] for r in results)[len(results) // 2]
+        total = sorted(r["total_ms"] for r in results)[len(results) // 2]
+        print(f"\n{name}:")
+        print(f"   ✓ median time to first token {ttft:,.0f}ms, total {total:,.0f}ms "
+              f"({results[0]['chars']:,} chars)")
+
+    print("\n" + "=" * 60)
+    print("✅ Report streaming test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000",
+         int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Suspect pre-filter: description parsing, ranking checks and scoring throughput
+
+Usage: python test_suspect_matcher.py [num_persons]   (default 1,000,000)
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from suspect_matcher import SuspectIndex, SuspectMatcher, parse_description
+
+CITIES = ["Los Angeles", "San Diego", "San Jose", "Fresno", "Sacramento", "Long Beach", "Oakland"]
+HAIR = ["BLK", "BRO", "BLN", "RED", "GRY", "BAL"]
+EYES = ["BRO", "BLU", "GRN", "HAZ"]
+TODAY = date(2025, 6, 1)
+
+
+def check_parsing():
+    print("\n1. Description parsing:")
+    profile = parse_description({"description": "White male, mid 30s, 5'10\", about 180 lbs, brown hair, blue eyes"})
+    assert profile["sex"] == "M" and profile["race"] == "W"
+    assert profile["age"] == (33, 37) and profile["height"] == 70 and profile["weight"] == 180
+    assert profile["hair"] == "brown" and profile["eye"] == "blue"
+    assert parse_description({"description": "x", "sex": "F", "age": 25})["age"] == (22, 28)
+    print("   ✓ Free text and structured fields parsed")
+
+
+def check_ranking():
+    print("\n2. Ranking:")
+    index = SuspectIndex()
+    index.extend([
+        {"id": "match", "dob": "1990-02-01", "sex": "M", "race": "W", "height": "5'10\"", "weight": "180",
+         "hair_color": "BRO", "eye_color": "BLU", "city": "Fresno"},
+        {"id": "close", "dob": "1988-02-01", "sex": "M", "race": "W", "height": "6'1\"", "weight": "210",
+         "hair_color": "BLK", "eye_color": "BRO", "city": "Fresno"},
+        {"id": "female", "dob": "1990-02-01", "sex": "F", "race": "W", "height": "5'10\"", "weight": "180",
+         "hair_color": "BRO", "eye_color": "BLU", "city": "Fresno"},
+        {"id": "unknown", "dob": "", "first_name": "No", "last_name": "Details"},
+    ])
+    profile = parse_description({"description": "white male mid 30s 5'10 180 lbs brown hair blue eyes seen in fresno"})
+    ranked = index.score(profile, k=4, today=TODAY)
+    assert [r[0] for r in ranked][:2] == ["match", "close"], ranked
+    assert "female" not in [r[0] for r in ranked]
+    assert "city" in ranked[0][2]
+    index.upsert({"id": "close", "dob": "1990-02-01", "sex": "M", "race": "W", "height": "5'10\"", "weight": "180",
+                  "hair_color": "BRO", "eye_color": "BLU", "city": "Fresno"})
+    assert index.score(profile, k=2, today=TODAY)[1][1] == ranked[0][1]
+    index.remove("match")
+    assert index.score(profile, k=4, today=TODAY)[0][0] == "close"
+    print("   ✓ Best match first, sex mismatch excluded, incremental upsert/remove applied")
+
+
+def check_rebuild_keeps_writes():
+    print("\n3. Writes during a rebuild:")
+    matcher = SuspectMatcher()
+    persons = [{"id": f"p{i}", "dob": "1990-02-01", "sex": "M", "race": "W", "city": "Fresno"} for i in range(3)]
+
+    class Persons:
+        """find(...).batch_size(n) as an async iterator; a person is written while the build reads."""
+        def find(self, query, projection):
+            return self
+
+        def batch_size(self, n):
+            return self
+
+        async def __aiter__(self):
+            for person in persons:
+                yield person
+                await asyncio.sleep(0)
+            matcher.upsert({"id": "late", "dob": "1985-01-01", "sex": "F", "race": "B", "city": "Oakland"})
+
+    class DB:
+        persons = Persons()
+
+    index = asyncio.run(matcher.ready(DB()))
+    assert set(index.rows) == {"p0", "p1", "p2", "late"}, index.rows
+    print("   ✓ A person written mid-build is replayed onto the new matrix")
+
+
+def synthetic_person(i: int, rng: random.Random) -> dict:
+    return {
+        "id": f"p-{i}",
+        "dob": f"{rng.randint(1940, 2006)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "sex": rng.choice("MF"),
+        "race": rng.choice("WBHA"),
+        "height": f"{rng.randint(4, 6)}'{rng.randint(0, 11)}\"",
+        "weight": str(rng.randint(100, 300)),
+        "hair_color": rng.choice(HAIR),
+        "eye_color": rng.choice(EYES),
+        "city": rng.choice(CITIES),
+    }
+
+
+def benchmark(num_persons: int):
+    print(f"\n4. Throughput at {num_persons:,} persons:")
+    rng = random.Random(11)
+    index = SuspectIndex()
+    started = time.perf_counter()
+    for start in range(0, num_persons, 10000):
+        index.extend(synthetic_person(i, rng) for i in range(start, min(start + 10000, num_persons)))
+    print(f"   Built in {time.perf_counter() - started:.1f}s, {index.stats()['bytes'] / 1e6:.1f} MB of feature columns")
+
+    profile = parse_description({"description": "Hispanic male, late 20s, 5'8, 160 lbs, black hair, brown eyes, San Jose"})
+    timings = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        top = index.score(profile, k=10, today=TODAY)
+        timings.append(time.perf_counter() - t0)
+    timings.sort()
+    p50 = timings[10]
+    print(f"   ✓ Top-10 in p50 {p50 * 1000:.1f}ms, p95 {timings[18] * 1000:.1f}ms "
+          f"({num_persons / p50 / 1e6:.1f}M records scored/s), best score {top[0][1]}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Suspect Matcher Test")
+    print("=" * 60)
+    check_parsing()
+    check_ranking()
+    check_rebuild_keeps_writes()
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
+    print("\n" + "=" * 60)
+    print("✅ Suspect matcher test complete!")
+    print("=" * 60)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Synthetic data: determinism, distributions and generation throughput
+
+Usage: python test_synthetic_data.py [num_blocks]   (default 5 blocks of each kind)
+Builds blocks in this process only; nothing is written to Mongo.
+"""
+import sys
+import time
+from collections import Counter
+from datetime import date
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import synthetic_data
+from synthetic_data import BLOCK_SIZE, KINDS, block_counts, build_block
+from crime_analytics import incident_frame
+
+END = date(2025, 6, 30)
+PERSON_BLOCKS = block_counts(3 * BLOCK_SIZE)
+VEHICLE_BLOCKS = block_counts(2 * BLOCK_SIZE)
+
+
+def build(kind: str, block: int, seed: int = 42) -> list:
+    return build_block(kind, seed, block, BLOCK_SIZE, END, 365, PERSON_BLOCKS, VEHICLE_BLOCKS)
+
+
+def check_determinism():
+    print("\n1. Determinism:")
+    for kind in KINDS:
+        first = build(kind, 1)
+        synthetic_data.person_columns.cache_clear()
+        synthetic_data.vehicle_columns.cache_clear()
+        assert build(kind, 1) == first, kind
+        assert build(kind, 1, seed=43) != first, kind
+    print("   ✓ Every kind rebuilds identically from (seed, block); another seed differs")
+    ids = [doc["id"] for block in range(3) for doc in build("citations", block)]
+    assert len(set(ids)) == len(ids)
+    print(f"   ✓ {len(ids):,} citation ids, all distinct")
+
+
+def check_distributions():
+    print("\n2. Distributions:")
+    persons = build("persons", 0)
+    last_names = Counter(p["last_name"] for p in persons)
+    smith = last_names["Smith"] / len(persons)
+    assert 0.004 < smith < 0.02, smith
+    print(f"   ✓ {len(last_names):,} surnames in {len(persons):,} persons, Smith {smith:.1%}")
+    warrants = sum(1 for p in persons if p["warrants"]) / len(persons)
+    assert 0.01 < warrants < 0.05
+    print(f"   ✓ {warrants:.1%} with warrants")
+
+    vehicles = build("vehicles", 0)
+    ca = [v["plate_number"] for v in vehicles if v["state"] == "CA"]
+    standard = [p for p in ca if len(p) == 7 and p[0].isdigit() and p[1:4].isalpha() and p[4:].isdigit()]
+    assert len(standard) > 0.9 * len(ca)
+    print(f"   ✓ {len(standard) / len(ca):.0%} of CA plates in 1ABC234 format, e.g. {', '.join(standard[:3])}")
+
+    citations = build("citations", 0)
+    hours = Counter(int(c["date_time"][11:13]) for c in citations)
+    assert hours[8] + hours[17] > 3 * (hours[3] + hours[4])
+    repeat = Counter(c["person_id"] for c in citations).most_common(1)[0][1]
+    assert 3 <= repeat <= 100, repeat
+    print(f"   ✓ Citations peak at commute hours; busiest offender has {repeat}")
+
+    reports = build("reports", 0)
+    frame = incident_frame(reports, "reports")
+    top = frame["location_key"].value_counts()
+    share = top.iloc[:10].sum() / len(frame)
+    assert share > 0.2, share
+    print(f"   ✓ Top 10 of {len(top):,} crime_analytics location clusters hold {share:.0%} of reports")
+
+
+def check_throughput(blocks: int):
+    print(f"\n3. Generation throughput ({blocks} blocks of {BLOCK_SIZE:,} per kind, one process):")
+    for kind in KINDS:
+        started = time.perf_counter()
+        for block in range(blocks):
+            build(kind, block)
+        elapsed = time.perf_counter() - started
+        print(f"   ✓ {kind:<10} {blocks * BLOCK_SIZE / elapsed:>10,.0f} records/s")
+
+
+def main(blocks: int):
+    print("=" * 60)
+    print("Synthetic Data Test")
+    print("=" * 60)
+    check_determinism()
+    check_distributions()
+    check_throughput(blocks)
+    print("\n" + "=" * 60)
+    print("✅ Synthetic data test complete!")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,75 @@
+"""
+Idempotent processing for Twilio webhooks.
+
+Twilio retries a webhook when our response times out. Without deduplication a
+retry re-runs the LLM, re-synthesizes audio and appends the caller's words to
+the conversation a second time. Each webhook is fingerprinted and the TwiML
+from the first attempt is replayed for any duplicate; a duplicate arriving
+while the first attempt is still running waits for that attempt's result.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def webhook_fingerprint(endpoint: str, call_sid: str, speech_result: Optional[str], sequence: int) -> str:
+    """Build a stable key for one webhook delivery (endpoint + CallSid + speech + turn)."""
+    raw = "\x1f".join([endpoint, call_sid or "", (speech_result or "").strip(), str(sequence)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class WebhookIdempotencyCache:
+    """Caches webhook results by fingerprint and coalesces concurrent duplicates."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, future)
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, now: float):
+        # Every entry shares the same TTL, so insertion order is expiry order
+        while self._entries:
+            expires_at, future = next(iter(self._entries.values()))
+            over_capacity = len(self._entries) > self.max_entries
+            if expires_at > now and not (over_capacity and future.done()):
+                break
+            self._entries.popitem(last=False)
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached result for key, or run handler once and cache it."""
+        now = time.monotonic()
+        self._evict(now)
+
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self.hits += 1
+            logger.info(f"Duplicate webhook {key[:12]} - replaying first attempt's result")
+            # Shield so a duplicate that gets cancelled doesn't cancel the original attempt
+            return await asyncio.shield(entry[1])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (now + self.ttl_seconds, future)
+        try:
+            result = await handler()
+        except BaseException as e:
+            # Don't cache failures - let Twilio's next retry run the handler again
+            self._entries.pop(key, None)
+            future.set_exception(e)
+            future.exception()  # mark retrieved so asyncio doesn't warn when nobody waits
+            raise
+        future.set_result(result)
+        return result
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -293,9 +293,9 @@ export default function ActiveCalls({ token, user }) {
                   </div>
                 )}
                 
-                {call.description && (
+                {call.description_excerpt && (
                   <div style={{ fontSize: '11px', marginTop: '4px', padding: '8px', background: '#0d1117', border: '1px solid #2d3748', borderRadius: '4px', color: '#d1d5db' }}>
-                    {call.description}
+                    {call.description_excerpt}{call.description_length > call.description_excerpt.length && '…'}
                   </div>
                 )}
                 
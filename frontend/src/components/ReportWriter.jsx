@@ -38,17 +38,40 @@ export default function ReportWriter({ token, user }) {
     }
 
     setGenerating(true);
+    setFormData((current) => ({ ...current, narrative: '' }));
     try {
-      const response = await axios.post(`${API}/ai/generate-report`, 
-        {
+      // Streamed as NDJSON so the narrative fills in while it is being written
+      const response = await fetch(`${API}/ai/generate-report/stream?format=ndjson`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+        body: JSON.stringify({
           incident_type: formData.incident_type,
           date_time: `${formData.incident_date} ${formData.incident_time}`,
           location: formData.location,
           details: formData.details
-        },
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
-      setFormData({...formData, narrative: response.data.narrative});
+        })
+      });
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffered += decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        buffered = lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          if (event.type === 'token') {
+            setFormData((current) => ({ ...current, narrative: current.narrative + event.delta }));
+          } else if (event.type === 'error') {
+            throw new Error(event.detail);
+          }
+        }
+      }
       toast.success('AI-generated report ready');
     } catch (error) {
       toast.error('AI generation failed');
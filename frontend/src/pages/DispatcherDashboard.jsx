@@ -121,7 +121,7 @@ export default function DispatcherDashboard({ user, token, onLogout }) {
                     </div>
                   </div>
 
-                  {call.description && (
+                  {call.description_excerpt && (
                     <div style={{ 
                       fontSize: '12px', 
                       marginTop: '12px', 
@@ -129,7 +129,7 @@ export default function DispatcherDashboard({ user, token, onLogout }) {
                       background: '#0d1117', 
                       border: '1px solid #2d3748'
                     }}>
-                      {call.description}
+                      {call.description_excerpt}{call.description_length > call.description_excerpt.length && '…'}
                     </div>
                   )}
 
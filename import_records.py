@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from record_import import CHUNK_SIZE, FORMATS, KINDS, detect_format, run_import
+from server import IMPORT_KINDS
+
+
+def default_job_id(path: Path, kind: str) -> str:
+    # Same file, same job: running the command again resumes it
+    stat = path.stat()
+    fingerprint = f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{kind}"
+    return "cli-" + hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
+
+
+def print_progress(job: dict):
+    print(f"   {job['rows_done']:>10,} rows  {job['upserted']:,} new  {job['modified']:,} updated  "
+          f"{job['invalid']:,} invalid  {job['write_errors']:,} write errors  "
+          f"{job.get('rows_per_second') or 0:,.0f} rows/s", end="\r", flush=True)
+
+
+async def import_records(kind: str, path: Path, fmt: str, job_id: str, chunk_size: int, restart: bool):
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    print(f"Importing {kind} from {path} as job {job_id}")
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        job = await run_import(db, job_id, f, IMPORT_KINDS[kind], fmt, source=str(path.resolve()),
+                               chunk_size=chunk_size, on_progress=print_progress, restart=restart)
+    print()
+    print(f"✅ {job['rows_done']:,} rows: {job['upserted']:,} new, {job['modified']:,} updated, "
+          f"{job['invalid']:,} invalid, {job['write_errors']:,} write errors")
+    for error in job["errors"][:10]:
+        print(f"❌ row {error['row']}: {error['error']}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a CSV or NDJSON extract of persons or vehicles")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--job-id", help="checkpoint to resume (default: derived from the file)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the first row")
+    args = parser.parse_args()
+    asyncio.run(import_records(args.kind, args.path, args.format or detect_format(args.path.name),
+                               args.job_id or default_job_id(args.path, args.kind), args.chunk_size, args.restart))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from db_migrations import bootstrap_database, verify_indexes
+
+
+async def migrate(verify: bool):
+    # Connect to MongoDB
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+
+    applied = await bootstrap_database(db)
+    if applied:
+        print(f"✅ Applied migrations: {applied}")
+    else:
+        print("✅ Database already up to date")
+
+    if verify:
+        failures = 0
+        for result in await verify_indexes(db):
+            mark = "✅" if result["ok"] else "❌"
+            print(f"{mark} {result['collection']} {result['query']} -> {result['used_indexes'] or 'COLLSCAN'}")
+            failures += not result["ok"]
+        if failures:
+            sys.exit(1)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply RMS database migrations and indexes")
+    parser.add_argument("--verify", action="store_true", help="explain each server.py query and check it uses its index")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.verify))